@@ -1,4 +1,14 @@
-from . import material, transform, geometry, seed, define_prop, random_all
+try:
+    import bpy  # noqa: F401
+except ImportError:
+    # outside Blender (e.g., when running the batch launcher
+    # with `python -m randomiser.batch`) only the modules that
+    # do not depend on bpy can be used
+    pass
+else:
+    from . import material, transform, geometry, mesh, seed, define_prop
+    from . import random_all
+    from .utils import change_tracking
 
 bl_info = {
     "name": "Randomisations panel",
@@ -20,8 +30,10 @@ def register():
     transform.register()
     material.register()
     geometry.register()
+    mesh.register()
     define_prop.register()
     random_all.register()
+    change_tracking.register()
 
 
 def unregister():
@@ -29,8 +41,10 @@ def unregister():
     transform.unregister()
     material.unregister()
     geometry.unregister()
+    mesh.unregister()
     define_prop.unregister()
     random_all.unregister()
+    change_tracking.unregister()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+"""
+Headless batch dataset generator.
+
+Splits a range of frames into shards and randomises (and optionally
+renders) each shard in its own background Blender process. The
+parameter logs of all shards are then merged into a single file.
+
+Example:
+    python -m randomiser.batch sample.blend
+    --frame-start 1 --frame-end 1000 --workers 8 --seed 42
+    --render --output-dir ./output
+
+Since workers use the per-frame RNG mode, the results do not depend
+on the number of workers.
+
+To re-render frames with the parameters of an existing log, without
+drawing any random numbers, pass the log with --replay:
+    python -m randomiser.batch sample.blend
+    --frame-start 10 --frame-end 20 --replay ./output/frame_params.json
+    --render --output-dir ./rerender
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from .shards import merge_param_logs, split_frame_range
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "worker.py"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m randomiser.batch",
+        description=(
+            "Randomise and render a range of frames with several "
+            "background Blender processes"
+        ),
+    )
+    parser.add_argument("blend_file", type=str, help="Path to .blend file")
+    parser.add_argument("--frame-start", type=int, default=1)
+    parser.add_argument("--frame-end", type=int, required=True)
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of Blender processes, by default the number of CPUs",
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        help=(
+            "Number of threads per Blender process, by default "
+            "the number of CPUs divided by the number of workers"
+        ),
+    )
+    parser.add_argument(
+        "--blender",
+        type=str,
+        default="blender",
+        help="Path to the Blender executable",
+    )
+    parser.add_argument(
+        "-s",
+        "--seed",
+        type=int,
+        help="Randomisation seed, by default the seed in the blend file",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        help=(
+            "Path to a parameter log (.json, .jsonl, .npy store or "
+            "directory of .npz chunks) to set the parameters from, "
+            "instead of randomising them"
+        ),
+    )
+    parser.add_argument(
+        "--render", action="store_true", help="Render every frame"
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        default=".",
+        help="Directory for renders and parameter logs",
+    )
+    parser.add_argument(
+        "-b",
+        "--basename",
+        type=str,
+        default="frame",
+        help="Basename of renders and parameter logs",
+    )
+
+    return parser.parse_args(argv)
+
+
+def get_worker_command(args, shard, log_path, n_threads):
+    """Get the command to launch a worker on a shard of frames
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        launcher arguments
+    shard : tuple
+        first and last frame of the shard
+    log_path : pathlib.Path
+        path to the shard's parameter log
+    n_threads : int
+        number of threads for the Blender process
+
+    Returns
+    -------
+    list
+        command as a list of strings
+    """
+    cmd = [
+        args.blender,
+        "--background",
+        args.blend_file,
+        "--threads",
+        str(n_threads),
+        "--python",
+        str(WORKER_SCRIPT),
+        "--",
+        "--frame-start",
+        str(shard[0]),
+        "--frame-end",
+        str(shard[1]),
+        "--log",
+        str(log_path),
+        "--output-dir",
+        args.output_dir,
+        "--basename",
+        args.basename,
+    ]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    if args.replay is not None:
+        cmd += ["--replay", str(Path(args.replay).resolve())]
+    if args.render:
+        cmd.append("--render")
+
+    return cmd
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    list_shards = split_frame_range(
+        args.frame_start, args.frame_end, args.workers
+    )
+    n_threads = args.threads or max(
+        1, (os.cpu_count() or 1) // len(list_shards)
+    )
+
+    # launch one worker per shard
+    list_log_paths = []
+    list_processes = []
+    for shard in list_shards:
+        log_path = output_dir / (
+            f"{args.basename}_params_{shard[0]}-{shard[1]}.json"
+        )
+        list_log_paths.append(log_path)
+        list_processes.append(
+            subprocess.Popen(
+                get_worker_command(args, shard, log_path, n_threads)
+            )
+        )
+        print(f"Worker launched for frames {shard[0]} to {shard[1]}")
+
+    # wait for all workers to finish
+    list_failed = [
+        shard
+        for shard, process in zip(list_shards, list_processes)
+        if process.wait() != 0
+    ]
+    if list_failed:
+        print("Workers failed for frames: ", list_failed)
+        return 1
+
+    # merge the parameter logs of all shards
+    merged_path = output_dir / f"{args.basename}_params.json"
+    merge_param_logs(list_log_paths, merged_path)
+    for log_path in list_log_paths:
+        log_path.unlink()
+    print("Parameters of all frames saved to file: ", merged_path)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import json
+
+
+# -------------------------------
+# Frame sharding
+# -------------------------------
+def split_frame_range(frame_start, frame_end, n_shards):
+    """Split a range of frames into contiguous shards of similar size
+
+    Parameters
+    ----------
+    frame_start : int
+        first frame of the range
+    frame_end : int
+        last frame of the range (included)
+    n_shards : int
+        maximum number of shards
+
+    Returns
+    -------
+    list
+        list of (first frame, last frame) tuples, one per non-empty shard
+    """
+    n_frames = frame_end - frame_start + 1
+    n_shards = max(1, min(n_shards, n_frames))
+
+    list_shards = []
+    shard_start = frame_start
+    for i in range(n_shards):
+        # the first (n_frames % n_shards) shards get one extra frame
+        shard_size = n_frames // n_shards + (i < n_frames % n_shards)
+        if shard_size > 0:
+            list_shards.append((shard_start, shard_start + shard_size - 1))
+        shard_start += shard_size
+
+    return list_shards
+
+
+# -------------------------------
+# Parameter logs
+# -------------------------------
+def merge_dicts_of_lists(list_dicts):
+    """Merge nested dictionaries by concatenating their leaf lists
+
+    Parameters
+    ----------
+    list_dicts : list
+        list of nested dictionaries with the same keys, whose leaves
+        are lists
+
+    Returns
+    -------
+    dict
+        nested dictionary with the concatenated lists as leaves
+    """
+    merged = {}
+    for dct in list_dicts:
+        for ky, val in dct.items():
+            if isinstance(val, dict):
+                merged[ky] = merge_dicts_of_lists([merged.get(ky, {}), val])
+            else:
+                merged[ky] = merged.get(ky, []) + list(val)
+    return merged
+
+
+def merge_param_logs(list_log_paths, output_path):
+    """Merge the parameter logs of several shards into a single file
+
+    Each log is a .json file with the values of the randomised
+    parameters per frame, and the list of frames under the key "frames".
+    The logs are merged in increasing frame order.
+
+    Parameters
+    ----------
+    list_log_paths : list
+        paths to the logs of each shard
+    output_path : str or pathlib.Path
+        path to the merged log
+
+    Returns
+    -------
+    dict
+        merged log
+    """
+    list_logs = []
+    for log_path in list_log_paths:
+        with open(log_path, "r") as in_file_obj:
+            list_logs.append(json.load(in_file_obj))
+
+    merged_log = merge_dicts_of_lists(
+        sorted(list_logs, key=lambda log: log["frames"][:1])
+    )
+
+    with open(output_path, "w") as out_file_obj:
+        out_file_obj.write(json.dumps(merged_log, indent=4))
+
+    return merged_log
@@ -0,0 +1,122 @@
+"""
+Batch worker, run inside Blender by the batch launcher:
+    blender --background <blend file>
+    --python <path to this script>
+    -- --frame-start <N> --frame-end <M> --log <path to log file>
+    [--seed <seed>] [--replay <path to log>]
+    [--render --output-dir <dir> --basename <name>]
+
+It randomises and (optionally) renders a range of frames, and saves the
+values of the randomised parameters per frame to a .json log.
+The randomiser is run in per-frame RNG mode, so that the values at a
+frame do not depend on the range of frames assigned to the worker.
+With --replay, the parameters are set from an existing log instead of
+being randomised.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import bpy
+
+# make the randomiser package importable from its source directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import randomiser  # noqa: E402
+from randomiser.random_all.sampling import (  # noqa: E402
+    get_targets_to_record,
+    nest_values,
+)
+from randomiser.utils import rng  # noqa: E402
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Randomise and render a range of frames"
+    )
+    parser.add_argument("--frame-start", type=int, required=True)
+    parser.add_argument("--frame-end", type=int, required=True)
+    parser.add_argument(
+        "--log",
+        type=str,
+        required=True,
+        help="Path to the .json log of parameters per frame",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Randomisation seed, by default the seed in the blend file",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        help="Path to a parameter log to set the parameters from",
+    )
+    parser.add_argument(
+        "--render", action="store_true", help="Render every frame"
+    )
+    parser.add_argument(
+        "--output-dir", type=str, default=".", help="Directory for renders"
+    )
+    parser.add_argument(
+        "--basename", type=str, default="frame", help="Basename of renders"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main():
+    # get Python args (passed after "--")
+    argv = sys.argv
+    argv = argv[argv.index("--") + 1 :] if "--" in argv else []
+    args = parse_args(argv)
+
+    # enable the randomiser if it is not installed in this Blender
+    if "randomiser" not in bpy.context.preferences.addons:
+        randomiser.register()
+
+    cs = bpy.context.scene
+    if args.seed is not None:
+        cs.seed_properties.seed = args.seed
+    cs.seed_properties.seed_toggle = True
+    cs.seed_properties.rng_mode = rng.FRAME
+    if args.replay is not None:
+        cs.rand_all_properties.replay_path = str(Path(args.replay).resolve())
+        cs.rand_all_properties.bool_replay = True
+    else:
+        # the per-frame randomisation may have been turned off in the
+        # blend file (e.g. after baking the parameters to keyframes)
+        cs.rand_all_properties.bool_replay = False
+        cs.rand_all_properties.bool_randomise_per_frame = True
+
+    # resolve the parameters to record once for all frames
+    list_targets = get_targets_to_record(bpy.context)
+
+    list_frames = list(range(args.frame_start, args.frame_end + 1))
+    list_values_per_target = [[] for _ in list_targets]
+    for frame in list_frames:
+        # the per-frame handler randomises (or replays) the scene
+        cs.frame_set(frame)
+
+        for values, target in zip(list_values_per_target, list_targets):
+            values.append(target.get_value())
+
+        if args.render:
+            cs.render.filepath = str(
+                Path(args.output_dir) / f"{args.basename}_f{frame}.png"
+            )
+            bpy.ops.render.render(write_still=True)
+
+        print(f"Frame {frame} done")
+
+    data = {"frames": list_frames}
+    data.update(nest_values(list_targets, list_values_per_target))
+    with open(args.log, "w") as out_file_obj:
+        out_file_obj.write(json.dumps(data, indent=4))
+    print("Parameters saved to file: ", args.log)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,7 @@
-import random
-from random import seed
-
 import bpy
 import numpy as np
-from bpy.app.handlers import persistent
-from mathutils import Euler, Vector
-
-from .ui import attr_get_type, get_attr_only_str, get_obj_str
-
-
-def attr_set_val(obj, path, min_val, max_val, UD_type):
-    if "." in path:
-        # gives us: ('modifiers["Subsurf"]', 'levels')
-        path_prop, path_attr = path.rsplit(".", 1)
-
-        # same as: prop = obj.modifiers["Subsurf"]
-        prop = obj.path_resolve(path_prop)
-    else:
-        prop = obj
-        # single attribute such as name, location... etc
-        path_attr = path
-
-    # same as: prop.levels = value
-
-    try:
-        getattr(prop, path_attr)
-    except Exception:
-        # print("Property does not exist")
-        pass
-
-    # print("obj = ", path_attr)
-    if UD_type == float:
-        value = random.uniform(min_val, max_val)
-        # print("1D float = ", value)
-    elif UD_type == Vector:
-        value = random.uniform(min_val, max_val)
-        # print("3D Vector float = ", value)
-    elif UD_type == Euler:
-        deg2rad = np.pi / 180
-        value = random.uniform(min_val, max_val)
-        value = value * deg2rad
-        # print("Euler = ", value)
-    else:
-        value = random.randint(min_val, max_val)
-        # print("Integer = ", value)
-
-    setattr(prop, path_attr, value)
+
+from ..utils import rng, ud_paths, ud_setters
 
 
 class CUSTOM_OT_actions(bpy.types.Operator):
@@ -81,7 +37,7 @@ class CUSTOM_OT_actions(bpy.types.Operator):
 
         if self.action == "ADD":
             item = scn.custom.add()
-            item.name = "bpy.objects.data['Cube'].location"
+            item.name = "bpy.data.objects['Cube'].location"
             item.id = len(scn.custom)
             scn.custom_index = len(scn.custom) - 1
             info = '"%s" added to list' % (item.name)
@@ -209,10 +165,12 @@ class RandomiseAllUDProps(bpy.types.Operator):
             _description_
         """
         # add list of UD props to operator self
-        # NOTE: this list should have been updated already,
-        # when drawing the panel
-
+        # NOTE: the collection is synchronised first, if the
+        # Blender data was edited since the last sync
         cs = context.scene
+        if cs.socket_props_per_UD.sync_collections():
+            print("Collection of UD props updated")
+
         self.list_subpanel_UD_props_names = [
             UD.name for UD in cs.socket_props_per_UD.collection
         ]
@@ -230,7 +188,8 @@ class RandomiseAllUDProps(bpy.types.Operator):
         """Execute the randomiser operator
 
         Randomise the selected UD props between
-        their min and max values.
+        their min and max values. The UD props of the same type
+        are drawn in one block and set with one call to their setter.
 
         Parameters
         ----------
@@ -244,14 +203,11 @@ class RandomiseAllUDProps(bpy.types.Operator):
         """
         cs = context.scene
 
-        previous_seed = cs.seed_properties.seed_previous
-        current_seed = cs.seed_properties.seed
-        seed_enabled = cs.seed_properties.seed_toggle
-        if (previous_seed != current_seed) and (seed_enabled is True):
-            seed(current_seed)
-            cs.seed_properties.seed_previous = current_seed
+        # Set the seed if it is toggled on
+        rng.reseed_if_changed(cs.seed_properties)
 
-        # For every UD prop with a subpanel
+        # group the UD props to randomise per type of attribute
+        map_attr_to_UD_props = {}
         for UD_str in self.sockets_to_randomise_per_UD:
             # get collection of socket properties for this UD prop
             # NOTE: socket properties do not include the actual socket object
@@ -259,89 +215,42 @@ class RandomiseAllUDProps(bpy.types.Operator):
                 UD_str
             ]
 
-            full_str = sockets_props_collection.name
-            attribute_only_str = get_attr_only_str(full_str)
-
-            objects_in_scene = []
-            for key in bpy.data.objects:
-                objects_in_scene.append(key.name)
-
-            if "[" in full_str:
-                obj_str = get_obj_str(full_str)
-
-                for i, obj in enumerate(objects_in_scene):
-                    if obj in obj_str:
-                        current_obj = obj
-                        idx = i
-
-                if "Camera" in current_obj:
-                    attr_type = attr_get_type(
-                        bpy.data.cameras[idx], attribute_only_str
-                    )[0]
-                else:
-                    attr_type = attr_get_type(
-                        bpy.data.objects[idx], attribute_only_str
-                    )[0]
-
-            elif "bpy.context.scene" in full_str:
-                attr_type = attr_get_type(
-                    bpy.context.scene, attribute_only_str
-                )[0]
-
-            # get min value for this UD prop
-            min_val = np.array(
-                getattr(
-                    sockets_props_collection,
-                    "min_" + cs.UD_prop_to_attr[attr_type],
-                )
-            )
+            # get the resolved UD prop (compiled once, and only
+            # compiled again if the Blender data changes)
+            UD_handle = ud_paths.get_UD_handle(sockets_props_collection.name)
+            if UD_handle is None:
+                continue
 
-            # get max value for this UD prop
-            max_val = np.array(
-                getattr(
-                    sockets_props_collection,
-                    "max_" + cs.UD_prop_to_attr[attr_type],
-                )
+            attr_str = cs.UD_prop_to_attr[UD_handle.type]
+            map_attr_to_UD_props.setdefault(attr_str, []).append(
+                (UD_handle, sockets_props_collection)
             )
 
-            if "[" in full_str:
-                if "Camera" in full_str:
-                    attr_set_val(
-                        bpy.data.cameras[idx],
-                        attribute_only_str,
-                        min_val,
-                        max_val,
-                        attr_type,
-                    )
-
-                else:
-                    attr_set_val(
-                        bpy.data.objects[idx],
-                        attribute_only_str,
-                        min_val,
-                        max_val,
-                        attr_type,
-                    )
-
-            elif "bpy.context.scene" in full_str:
-                attr_set_val(
-                    bpy.context.scene,
-                    attribute_only_str,
-                    min_val,
-                    max_val,
-                    attr_type,
+        # for every type of attribute: draw the values of all its UD props
+        # at once, and set them with the setter for that type
+        generator = rng.get_sequential_generator()
+        for attr_str, list_UD_props in map_attr_to_UD_props.items():
+            list_handles = [UD_handle for UD_handle, _ in list_UD_props]
+            min_vals, max_vals = [
+                np.concatenate(
+                    [
+                        np.atleast_1d(getattr(UD_props, m_str + attr_str))
+                        for _, UD_props in list_UD_props
+                    ]
                 )
+                for m_str in ["min_", "max_"]
+            ]
 
-        return {"FINISHED"}
-
+            values = rng.draw_block(
+                generator,
+                ud_setters.MAP_ATTR_TO_KIND[attr_str],
+                min_vals,
+                max_vals,
+                1,
+            )[0]
+            ud_setters.MAP_ATTR_TO_SETTER[attr_str](list_handles, values)
 
-# NOTE: without the persistent decorator,
-# the function is removed from the handlers' list
-# after it is first executed
-@persistent
-def randomise_UD_props_per_frame(dummy):
-    bpy.ops.node.randomise_all_ud_sockets("INVOKE_DEFAULT")
-    return
+        return {"FINISHED"}
 
 
 # ---------------------
@@ -362,8 +271,6 @@ def register():
     for cls in list_classes_to_register:
         bpy.utils.register_class(cls)
 
-    bpy.app.handlers.frame_change_pre.append(randomise_UD_props_per_frame)
-
     print("UD operators registered")
 
 
@@ -371,6 +278,4 @@ def unregister():
     for cls in list_classes_to_register:
         bpy.utils.unregister_class(cls)
 
-    bpy.app.handlers.frame_change_pre.remove(randomise_UD_props_per_frame)
-
     print("UD operators unregistered")
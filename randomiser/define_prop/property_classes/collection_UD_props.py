@@ -1,7 +1,7 @@
 import bpy
 
+from ...utils import change_tracking, ud_paths
 from ..property_classes.collection_UD_socket_properties import SocketProperties
-from ..ui import attr_get_type, get_attr_only_str, get_obj_str
 
 
 # ---------------------------------------------------
@@ -35,28 +35,18 @@ def get_update_UD_props_collection(self):
     """Getter function for the 'update_UD_props_collection'
     attribute.
 
-    Checks if the collection of UD props needs
-    to be updated, and updates it if required.
-
-    The collection will need to be updated if there
-    are UD props that have been added/deleted from the scene.
+    It only reads the dirty flags set by the change tracking handlers,
+    so it is cheap and does not modify the collection. To synchronise
+    the collection, set the attribute to True (or call
+    ColUDParentProps.sync_collections)
 
     Returns
     -------
     boolean
-        returns True if the collection is updated,
-        otherwise it returns False
+        returns True if the collection of UD props may be out of sync
+        with the Blender data, otherwise it returns False
     """
-    # compute relevant UD props sets and add them to self
-    compute_UD_props_sets(self)
-
-    # if there are UD props that exist only in the Blender
-    # data structure, or only in the collection: edit the collection
-    if self.set_UD_props_in_one_only:
-        set_update_UD_props_collection(self, True)
-        return True
-    else:
-        return False
+    return change_tracking.is_dirty(change_tracking.USER_DEFINED)
 
 
 def set_update_UD_props_collection(self, value):
@@ -71,10 +61,8 @@ def set_update_UD_props_collection(self, value):
 
     # if update value is True
     if value:
-        # if the update fn is triggered directly and not via
-        # the getter function: compute the required sets here
-        if not hasattr(self, "set_UD_props_in_one_only"):
-            compute_UD_props_sets(self)
+        # compute relevant UD props sets and add them to self
+        compute_UD_props_sets(self)
 
         # for all UD props that are in one set only
         for UD_name in self.set_UD_props_in_one_only:
@@ -92,13 +80,15 @@ def set_update_UD_props_collection(self, value):
 class ColUDParentProps(bpy.types.PropertyGroup):
     """Collection of UD props
 
-    This class has two attributes and one property
+    This class has two attributes, one property and one method
     - collection (attribute): holds the collection of UD props
     - update_UD_props_collection (attribute): helper attribute
-      to force updates on
-      the collection of UD props
+      to check if the collection of UD props is out of sync,
+      or to force updates on it
     - candidate_UD_props (property): returns the updated list of UD props
     defined in the scene
+    - sync_collections (method): synchronises the collection of UD props
+    if it is out of sync
 
     This data will be made availabe via bpy.context.scene.socket_props_per_UD
 
@@ -135,49 +125,35 @@ class ColUDParentProps(bpy.types.PropertyGroup):
             _description_
         """
 
-        # get_attr_only_strbpy.context.scene.custom
         # self is the collection of UD props
-        list_UD_props = []
-
-        objects_in_scene = []
-        for i, key in enumerate(bpy.data.objects):
-            objects_in_scene.append(key.name)
-
-        for UD in bpy.context.scene.custom:
-            if "[" in UD.name:
-                obj_str = get_obj_str(UD.name)
-
-                for i, obj in enumerate(objects_in_scene):
-                    if obj in obj_str:
-                        current_obj = obj
-                        idx = i
-
-                if "Camera" in current_obj:
-                    if (
-                        attr_get_type(
-                            bpy.data.cameras[idx], get_attr_only_str(UD.name)
-                        )[1]
-                        != "dummy"
-                    ):
-                        list_UD_props.append(UD)
-
-                else:
-                    if (
-                        attr_get_type(
-                            bpy.data.objects[idx], get_attr_only_str(UD.name)
-                        )[1]
-                        != "dummy"
-                    ):
-                        list_UD_props.append(UD)
-
-            elif (
-                attr_get_type(bpy.context.scene, get_attr_only_str(UD.name))[1]
-                != "dummy"
-            ):
-                list_UD_props.append(UD)
+        # (only those whose path points to an existing property)
+        list_UD_props = [
+            UD
+            for UD in bpy.context.scene.custom
+            if ud_paths.get_UD_handle(UD.name) is not None
+        ]
 
         return list_UD_props
 
+    def sync_collections(self):
+        """Synchronise the collection of UD props with the Blender data
+
+        The collection is only checked if the change tracking handlers
+        marked it as out of sync, so this is cheap if nothing was edited
+        since the last call.
+
+        Returns
+        -------
+        boolean
+            returns True if the collection was modified,
+            otherwise it returns False
+        """
+        if not change_tracking.pop_dirty(change_tracking.USER_DEFINED):
+            return False
+
+        set_update_UD_props_collection(self, True)
+        return bool(self.set_UD_props_in_one_only)
+
 
 # -----------------------------------------
 # Register and unregister functions
@@ -1,7 +1,7 @@
 import bpy
 
-from .. import config
 from ..material.ui import TemplatePanel
+from ..utils import ud_paths
 
 
 # ---------------------------------------------------
@@ -36,7 +36,6 @@ def draw_sockets_list_UD(
     layout,
     list_UD_props,
     sockets_props_collection,
-    attribute_only_str,
     full_str,
 ):
     # Define UI fields for every user defined property
@@ -105,32 +104,8 @@ def draw_sockets_list_UD(
 
     # if UD prop is not color type: format as a regular property
     else:
-        objects_in_scene = []
-        for key in bpy.data.objects:
-            objects_in_scene.append(key.name)
-
+        attr_type = ud_paths.get_UD_handle(full_str).type
         for m_str, col in zip(["min", "max"], [col3, col4]):
-            if "[" in sockets_props_collection.name:
-                obj_str = get_obj_str(sockets_props_collection.name)
-
-                for i, obj in enumerate(objects_in_scene):
-                    if obj in obj_str:
-                        current_obj = obj
-                        idx = i
-
-                if "Camera" in current_obj:
-                    attr_type = attr_get_type(
-                        bpy.data.cameras[idx], attribute_only_str
-                    )[0]
-                else:
-                    attr_type = attr_get_type(
-                        bpy.data.objects[idx], attribute_only_str
-                    )[0]
-            else:
-                attr_type = attr_get_type(
-                    bpy.context.scene, attribute_only_str
-                )[0]
-
             col.prop(
                 sockets_props_collection,
                 m_str + "_" + cs.UD_prop_to_attr[attr_type],
@@ -145,56 +120,6 @@ def draw_sockets_list_UD(
     )
 
 
-def get_obj_str(full_str):
-    x = full_str.split(".")
-    for i in x:
-        if "[" in i:
-            ii = i.split("[")
-            object_str = ii[1]
-            object_str = object_str[:-1]
-
-    return object_str
-
-
-def attr_get_type(obj, path):
-    if "." in path:
-        # gives us: ('modifiers["Subsurf"]', 'levels')
-        path_prop, path_attr = path.rsplit(".", 1)
-
-        # same as: prop = obj.modifiers["Subsurf"]
-        prop = obj.path_resolve(path_prop)
-    else:
-        prop = obj
-        # single attribute such as name, location... etc
-        path_attr = path
-
-    # same as: prop.levels = value
-
-    try:
-        action = getattr(prop, path_attr)
-    except Exception:
-        # print("Property does not exist")
-        action = "dummy"
-        prop = "dummy"
-        path_attr = "dummy"
-
-    return type(action), action, prop, path_attr
-
-
-def get_attr_only_str(full_str):
-    if "data" in full_str:
-        mod = 0
-    elif "[" in full_str:
-        mod = 1
-    else:
-        mod = 0
-
-    len_path = len(full_str.rsplit(".", config.MAX_NUMBER_OF_SUBPANELS)) - mod
-    list_parent_nodes_str = full_str.rsplit(".", len_path - 3)
-    attribute_only_str = full_str.replace(list_parent_nodes_str[0] + ".", "")
-    return attribute_only_str
-
-
 # ----------------------
 # Main panel
 # ---------------------
@@ -305,12 +230,12 @@ class SubPanelUDUIlist(TemplatePanel):
         )
 
         col = row.column(align=True)
-        col.operator(
-            "custom.list_action", icon="ZOOM_IN", text=""
-        ).action = "ADD"
-        col.operator(
-            "custom.list_action", icon="ZOOM_OUT", text=""
-        ).action = "REMOVE"
+        col.operator("custom.list_action", icon="ZOOM_IN", text="").action = (
+            "ADD"
+        )
+        col.operator("custom.list_action", icon="ZOOM_OUT", text="").action = (
+            "REMOVE"
+        )
 
         row = layout.row()
         col = row.column(align=True)
@@ -321,11 +246,41 @@ class SubPanelUDUIlist(TemplatePanel):
 
 
 # ------------------------------
-# Subpanel for each user defined property
+# Subpanel for the selected user defined property
 # -----------------------------
+def get_UD_selected_in_list(context):
+    """Get the name of the user defined (UD) property selected in the
+    UI list, if it is a valid property
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    str or None
+        full path of the selected UD property, or None if no valid
+        property is selected
+    """
+    cs = context.scene
+    if not (0 <= cs.custom_index < len(cs.custom)):
+        return None
+
+    full_str = cs.custom[cs.custom_index].name
+    if full_str not in cs.socket_props_per_UD.collection:
+        return None
+
+    # the path must point to an existing property
+    if ud_paths.get_UD_handle(full_str) is None:
+        return None
+
+    return full_str
+
+
 class SubPanelRandomUD(TemplatePanel):
-    """Parent class for the user defined properties
-    subpanels
+    """Panel showing the min/max bounds of the user defined
+    property selected in the UI list
 
     Parameters
     ----------
@@ -342,7 +297,7 @@ class SubPanelRandomUD(TemplatePanel):
     bl_idname = "UD_PROPS_PT_subpanel"
     bl_parent_id = "UD_PROPS_PT_mainpanel"
     bl_label = ""  # title of the panel displayed to the user
-    bl_options = {"DEFAULT_CLOSED"}
+    bl_options = {"HIDE_HEADER"}
     # NOTE: other bl_options in the link below
     # https://docs.blender.org/api/master/bpy.types.Panel.html#bpy.types.Panel.bl_options
 
@@ -350,10 +305,8 @@ class SubPanelRandomUD(TemplatePanel):
     def poll(cls, context):
         """Determine whether the UD props subpanel can be displayed.
 
-        To display a subpanel, its index must be lower than the
-        total number of UD props defined in the scene and
-        the property must be a valid property i.e. not a dummy
-        property
+        To display the subpanel, the property selected in the UI list
+        must be a valid property i.e. not a dummy property
 
         Parameters
         ----------
@@ -367,70 +320,12 @@ class SubPanelRandomUD(TemplatePanel):
         """
         cs = context.scene
 
-        # force an update on the UD props collection first
-        if cs.socket_props_per_UD.update_UD_props_collection:
+        # synchronise the UD props collection first
+        # (only if the Blender data was edited since the last sync)
+        if cs.socket_props_per_UD.sync_collections():
             print("Collection of UD props updated")
 
-        if cls.subpanel_UD_idx < len(cs.socket_props_per_UD.collection):
-            sockets_props_collection = cs.socket_props_per_UD.collection[
-                cls.subpanel_UD_idx
-            ]
-
-            full_str = sockets_props_collection.name
-            attribute_only_str = get_attr_only_str(full_str)
-
-            objects_in_scene = []
-            for key in bpy.data.objects:
-                objects_in_scene.append(key.name)
-
-            if "[" in full_str:
-                obj_str = get_obj_str(full_str)
-
-                for i, obj in enumerate(objects_in_scene):
-                    if obj in obj_str:
-                        current_obj = obj
-                        idx = i
-
-                if "Camera" in current_obj:
-                    action = attr_get_type(
-                        bpy.data.cameras[idx],
-                        attribute_only_str,
-                    )[1]
-
-                else:
-                    action = attr_get_type(
-                        bpy.data.objects[idx],
-                        attribute_only_str,
-                    )[1]
-
-            elif "bpy.context.scene" in full_str:
-                action = attr_get_type(bpy.context.scene, attribute_only_str)[
-                    1
-                ]
-
-        else:
-            action = "dummy"
-
-        return action != "dummy"
-
-    def draw_header(self, context):
-        """Define header for the UD subpanel
-
-        The header shows the name of the associated user defined
-        property
-        Parameters
-        ----------
-        context : _type_
-            _description_
-        """
-        cs = context.scene
-
-        # get this subpanel's UD prop
-        cs.socket_props_per_UD.collection[self.subpanel_UD_idx]
-
-        layout = self.layout
-        layout.use_property_split = True
-        layout.use_property_decorate = False
+        return get_UD_selected_in_list(context) is not None
 
     def draw(self, context):
         """Define the content to display in the UD prop subpanel
@@ -442,74 +337,17 @@ class SubPanelRandomUD(TemplatePanel):
         """
         cs = context.scene
 
-        # get this subpanel's UD prop
-        cs.socket_props_per_UD.collection[self.subpanel_UD_idx]
-
-        # get (updated) collection of chosen prop for this subpanel
-        sockets_props_collection = cs.socket_props_per_UD.collection[
-            self.subpanel_UD_idx
-        ]
-
-        # Get list of UD props to randomise for this subpanel's UD prop
-        full_str = sockets_props_collection.name
-        attribute_only_str = get_attr_only_str(full_str)
-
-        # list_all_UD_props = []
-        # for UD_str in bpy.context.scene.custom:
-        #     objects_in_scene = []
-        #     for key in bpy.data.objects:
-        #         objects_in_scene.append(key.name)
-
-        #     if "[" in UD_str.name:
-        #         obj_str = get_obj_str(UD_str.name)
-
-        #         for i, obj in enumerate(objects_in_scene):
-        #             if obj in obj_str:
-        #                 current_obj = obj
-        #                 idx = i
-
-        #         if "Camera" in current_obj:
-        #             if (
-        #                 attr_get_type(
-        #                     bpy.data.cameras[idx],
-        #                     get_attr_only_str(UD_str.name),
-        #                 )[1]
-        #                 != "dummy"
-        #             ):
-        #                 list_all_UD_props.append(UD_str)
-
-        #         else:
-        #             if (
-        #                 attr_get_type(
-        #                     bpy.data.objects[idx],
-        #                     get_attr_only_str(UD_str.name),
-        #                 )[1]
-        #                 != "dummy"
-        #             ):
-        #                 list_all_UD_props.append(UD_str)
-
-        #     elif (
-        #         attr_get_type(
-        #             bpy.context.scene, get_attr_only_str(UD_str.name)
-        #         )[1]
-        #         != "dummy"
-        #     ):
-        #         list_all_UD_props.append(UD_str)
-
-        # list_current_UD_props = list_all_UD_props[
-        #     bpy.context.scene.custom_index
-        # ].name
-
-        list_current_UD_props = sockets_props_collection.name
+        # get collection of the prop selected in the UI list
+        full_str = get_UD_selected_in_list(context)
+        sockets_props_collection = cs.socket_props_per_UD.collection[full_str]
 
         # Draw UD props to randomise including their
         # min/max boundaries
         draw_sockets_list_UD(
             cs,
             self.layout,
-            list_current_UD_props,
+            full_str,
             sockets_props_collection,
-            attribute_only_str,
             full_str,
         )
 
@@ -573,39 +411,16 @@ class SubPanelRandomUDOperator(TemplatePanel):
 # -----------------------
 # Classes to register
 # ---------------------
-
-# add Main panel to the list of classes to register
+# NOTE: to render the subpanel with the operator as the last panel
+# we add it as the last one to the list
 list_classes_to_register = [
     MainPanelRandomUD,
     CUSTOM_UL_items,
+    SubPanelUDUIlist,
+    SubPanelRandomUD,
+    SubPanelRandomUDOperator,
 ]
 
-# Define (dynamically) a subpanel class for each UD prop
-# and add them to the list of classes to register
-# NOTE: because we don't know the number of UD props that will be
-# defined a priori, we define n=MAX_NUMBER_OF_SUBPANELS classes and
-# assign an index to each of them. We will only display the subpanels
-# whose index is lower than the total number of UD props defined in the scene.
-for i in range(config.MAX_NUMBER_OF_SUBPANELS):
-    subpanel_class_i = type(
-        f"UD_PT_subpanel_{i}",
-        (SubPanelRandomUD,),
-        {
-            "bl_idname": f"UD_PT_subpanel_{i}",
-            "subpanel_UD_idx": i,
-        },
-    )
-
-    # append to list of classes to register
-    list_classes_to_register.append(subpanel_class_i)  # type: ignore
-
-
-# add Subpanel with operator to the list
-# NOTE: to render it as the last panel
-# we add it as the last one to the list
-list_classes_to_register.append(SubPanelUDUIlist)
-list_classes_to_register.append(SubPanelRandomUDOperator)
-
 
 # -----------------------------------------
 # Register and unregister functions
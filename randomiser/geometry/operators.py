@@ -1,12 +1,14 @@
+import datetime
+import json
 import random
-from random import seed
 
 import bpy
 import numpy as np
-from bpy.app.handlers import persistent
 
-from .. import config
+from ..random_all.sampling import get_socket_key
+from ..utils import modifier_inputs, node_rewrite, rng, socket_ids
 from ..utils import node_groups as ng
+from ..utils.list_props_to_randomise import geom_list_to_rand
 
 
 # --------------------------------------------
@@ -81,9 +83,11 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
             _description_
         """
         # add list of GNGs to operator self
-        # NOTE: this list should have been updated already,
-        # when drawing the panel
+        # NOTE: the collections are synchronised first, if the
+        # Blender data was edited since the last sync
         cs = context.scene
+        if cs.socket_props_per_gng.sync_collections():
+            print("Collection of Geometry Node Groups updated")
         self.list_subpanel_gng_names = [
             gng.name for gng in cs.socket_props_per_gng.collection
         ]
@@ -92,11 +96,6 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
         for gng_str in self.list_subpanel_gng_names:
             # get collection of socket properties for this GNG
             # ATT socket properties do not include the actual socket object
-            if cs.socket_props_per_gng.collection[
-                gng_str
-            ].update_sockets_collection:
-                print("Collection of geometry sockets updated")
-
             sockets_props_collection = cs.socket_props_per_gng.collection[
                 gng_str
             ].collection
@@ -110,16 +109,22 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
             # modify socket props to set toggle to False
             self.sockets_to_randomise_per_gng[gng_str] = []
             for sckt in candidate_sockets:
+                # sockets replaced by Random Value nodes are randomised
+                # in the graph, not from Python
+                if node_rewrite.is_rewritten(sckt):
+                    continue
+
                 # get socket identifier string
-                sckt_id = sckt.node.name + "_" + sckt.name
+                sckt_id = socket_ids.get_geometry_socket_id(sckt)
+                sckt_props = socket_ids.get_socket_props(
+                    ("GEOMETRY", gng_str), sockets_props_collection, sckt_id
+                )
 
                 # if this socket is selected to randomise but it is unlinked:
                 # set randomisation toggle to False
-                if (not sckt.is_linked) and (
-                    sockets_props_collection[sckt_id].bool_randomise
-                ):
+                if (not sckt.is_linked) and (sckt_props.bool_randomise):
                     setattr(
-                        sockets_props_collection[sckt_id],
+                        sckt_props,
                         "bool_randomise",
                         False,
                     )
@@ -131,7 +136,7 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
                 # after modifying randomisation toggle
                 # save list of sockets to randomise to dict,
                 # with key = material
-                if sockets_props_collection[sckt_id].bool_randomise:
+                if sckt_props.bool_randomise:
                     self.sockets_to_randomise_per_gng[gng_str].append(sckt)
 
     def invoke(self, context, event):
@@ -144,7 +149,8 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
         """Execute the randomiser operator
 
         Randomise the selected output sockets between
-        their min and max values.
+        their min and max values. If toggled on, the modifier inputs
+        are also randomised, with different values per object.
 
         Parameters
         ----------
@@ -162,12 +168,7 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
         cs = context.scene
 
         # Set the seed if it is toggled on
-        previous_seed = cs.seed_properties.seed_previous
-        current_seed = cs.seed_properties.seed
-        seed_enabled = cs.seed_properties.seed_toggle
-        if (previous_seed != current_seed) and (seed_enabled is True):
-            seed(current_seed)
-            cs.seed_properties.seed_previous = current_seed
+        rng.reseed_if_changed(cs.seed_properties)
 
         # For every GNG with a subpanel
         for gng_str in self.list_subpanel_gng_names:
@@ -179,12 +180,16 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
 
             # Loop through the sockets to randomise
             for sckt in self.sockets_to_randomise_per_gng[gng_str]:
-                socket_id = sckt.node.name + "_" + sckt.name
+                sckt_props = socket_ids.get_socket_props(
+                    ("GEOMETRY", gng_str),
+                    sockets_props_collection,
+                    socket_ids.get_geometry_socket_id(sckt),
+                )
 
                 # get min value for this socket
                 min_val = np.array(
                     getattr(
-                        sockets_props_collection[socket_id],
+                        sckt_props,
                         "min_" + cs.socket_type_to_attr[type(sckt)],
                     )
                 )
@@ -192,7 +197,7 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
                 # get max value for this socket
                 max_val = np.array(
                     getattr(
-                        sockets_props_collection[socket_id],
+                        sckt_props,
                         "max_" + cs.socket_type_to_attr[type(sckt)],
                     )
                 )
@@ -230,23 +235,70 @@ class RandomiseAllGeometryNodes(bpy.types.Operator):
                     # assign randomised socket value
                     sckt.default_value = random.uniform(min_val, max_val)
 
+        # randomise the inputs of the modifiers, per object
+        if cs.socket_props_per_gng.bool_per_object_inputs:
+            modifier_inputs.randomise_modifier_inputs(
+                cs, rng.get_sequential_generator()
+            )
+
         self.testing = True
 
         return {"FINISHED"}
 
 
-# NOTE: without the persistent decorator,
-# the function is removed from the handlers' list
-# after it is first executed
-@persistent
-def randomise_geometry_nodes_per_frame(dummy):
-    bpy.ops.node.randomise_all_geometry_sockets("INVOKE_DEFAULT")
-    return
-
-
 # -------------------------------
 # Operator: view graph per GNG
 # -------------------------------
+def is_gng_viewable(context, gng_name):
+    """Determine whether the graph of a geometry node group (GNG) can
+    be shown for the active object.
+
+    The graph can be shown if:
+    - the GNG is of geometry type,
+    and either:
+    - the GNG is linked to a modifier of the currently active object, or
+    - the GNG is an inner node and its root parent is a geometry node
+      group linked to a modifier of the currently active object.
+
+    An inner node is a geometry node group defined inside
+    another geometry node group. The path of nodes to an inner
+    node is the list of group nodes that leads to the inner node.
+    Its root parent is the only parent node group in the path of nodes
+    without a parent.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    gng_name : str
+        name of the geometry node group
+
+    Returns
+    -------
+    bool
+        True if the graph of the GNG can be shown
+    """
+    cob = context.object
+    if (cob is None) or (gng_name not in bpy.data.node_groups):
+        return False
+    if bpy.data.node_groups[gng_name].type != "GEOMETRY":
+        return False
+
+    # get list of GNGs linked to modifiers of the active object
+    list_gngs_in_modifiers = ng.get_gngs_linked_to_modifiers(cob)
+
+    # get list of (inner) GNGs whose root parent is a modfier-linked
+    # GNG
+    map_node_group_to_root_node_group = ng.get_map_inner_ngs_given_roots(
+        list_gngs_in_modifiers,
+    )
+
+    # define condition to enable the operator
+    return (gng_name in [gr.name for gr in list_gngs_in_modifiers]) or (
+        gng_name in [gr.name for gr in map_node_group_to_root_node_group]
+    )
+
+
 class ViewNodeGraphOneGNG(bpy.types.Operator):
     """Show node graph for the relevant
     Geometry Node Group
@@ -262,34 +314,21 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
         _description_
     """
 
-    bl_idname = (
-        "gng.view_graph"  # this is appended to bpy.ops.
-        # NOTE: it will be overwritten for each instance of
-        # the operator
-    )
+    bl_idname = "node.view_graph_for_gng"  # appended to bpy.ops.
     bl_label = "View node graph for this Geometry node group"
     bl_options = {"REGISTER", "UNDO"}
 
+    # name of the geometry node group whose graph to show
+    gng_name_prop = bpy.props.StringProperty()
+    gng_name: gng_name_prop  # type: ignore
+
     @classmethod
     def poll(cls, context):
         """Determine whether the operator can be executed.
 
-        This operator can only run if:
-        - its geometry node group is of geometry type,
-        and either:
-        - the associated geometry node group is linked to a modifier
-          of the currently active object, or
-        - the associated geometry node group is an inner node and its
-          root parent is a geometry node group linked to a modifier
-          of the currently active object.
-
-        An inner node is a geometry node group defined inside
-        another geometry node group. The path of nodes to an inner
-        node is the list of group nodes that leads to the inner node.
-        Its root parent is the only parent node group in the path of nodes
-        without a parent.
-
-        If the operator can't be executed, the button will appear as disabled.
+        This operator can only run if there is an active object. Whether
+        the graph of the selected geometry node group can be shown is
+        checked with is_gng_viewable.
 
         Parameters
         ----------
@@ -301,68 +340,7 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
         _type_
             _description_
         """
-
-        cs = context.scene
-        cob = context.object
-
-        # get list of all GNGs
-        list_gngs = [
-            gr.name for gr in bpy.data.node_groups if gr.type == "GEOMETRY"
-        ]
-
-        # get geometry node group (GNG) of this subpanel
-        subpanel_gng = cs.socket_props_per_gng.collection[cls.subpanel_gng_idx]
-
-        # get list of GNGs linked to modifiers of the active object
-        list_gngs_in_modifiers = ng.get_gngs_linked_to_modifiers(cob)
-        list_gngs_in_modifiers_names = [
-            ng.name for ng in list_gngs_in_modifiers
-        ]
-
-        # get list of (inner) GNGs whose root parent is a modfier-linked
-        # GNG
-        map_node_group_to_root_node_group = ng.get_map_inner_ngs_given_roots(
-            list_gngs_in_modifiers,
-        )
-
-        # define condition to enable the operator
-        display_operator = (subpanel_gng.name in list_gngs) and (
-            (subpanel_gng.name in list_gngs_in_modifiers_names)
-            or (
-                subpanel_gng.name
-                in [gr.name for gr in map_node_group_to_root_node_group.keys()]
-            )
-        )
-
-        return display_operator
-
-    def invoke(self, context, event):
-        """Initialise parmeters before executing the operator
-
-        The invoke() function runs before executing the operator.
-        Here, we add the subpanel's geometry node group name to
-        the operator self
-
-        Parameters
-        ----------
-        context : bpy_types.Context
-            the context from which the operator is executed
-        event : _type_
-            _description_
-
-        Returns
-        -------
-        _type_
-            _description_
-        """
-
-        cs = context.scene
-        subpanel_gng = cs.socket_props_per_gng.collection[
-            self.subpanel_gng_idx
-        ]
-        self.subpanel_gng_name = subpanel_gng.name
-
-        return self.execute(context)
+        return context.object is not None
 
     def execute(self, context):
         """Execute the 'view graph' operator.
@@ -399,12 +377,15 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
             _description_
         """
 
+        # the GNG must be in Blender's data structure
+        if self.gng_name not in bpy.data.node_groups:
+            self.report({"ERROR"}, f"Node group {self.gng_name} not found")
+            return {"CANCELLED"}
+
         cob = context.object
 
         # find the modifier linked to this GNG, if exists
-        subpanel_modifier = ng.get_modifier_linked_to_gng(
-            self.subpanel_gng_name, cob
-        )
+        subpanel_modifier = ng.get_modifier_linked_to_gng(self.gng_name, cob)
 
         # get dict of inner GNGs
         # the dict maps inner GNGs to a tuple made of its root parent GNG
@@ -421,23 +402,21 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
             bpy.ops.object.modifier_set_active(modifier=subpanel_modifier.name)
 
             # ensure graph is at top level
-            ng.set_ngs_graph_to_top_level(
-                bpy.data.node_groups[self.subpanel_gng_name]
-            )
+            ng.set_ngs_graph_to_top_level(bpy.data.node_groups[self.gng_name])
 
         # if there is no modifier linked to this GNG,
         # but it is an inner GNG whose root parent is a modifier-linked GNG:
         # set the modifier as active and navigate the graph to the
         # inner GNG
         elif not subpanel_modifier and (
-            self.subpanel_gng_name
+            self.gng_name
             in [gr.name for gr in map_inner_node_groups_to_root_parent.keys()]
         ):
             # find the modifier linked to the (root) parent and set as active
             # NOTE: if the root parent is not linked to a modifier,
             # the operator will show as disabled
             root_parent_node_group = map_inner_node_groups_to_root_parent[
-                bpy.data.node_groups[self.subpanel_gng_name]
+                bpy.data.node_groups[self.gng_name]
             ][0]
 
             root_parent_modifier = ng.get_modifier_linked_to_gng(
@@ -451,7 +430,7 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
             # compute the path to this subpanel's GNG
             # from the parent root GNG (both ends inclusive)
             path_to_gng = ng.get_path_to_ng(
-                bpy.data.node_groups[self.subpanel_gng_name]
+                bpy.data.node_groups[self.gng_name]
             )
 
             # ensure we are at the top level in the graph
@@ -495,9 +474,146 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
             new_modifier = bpy.context.object.modifiers.active
 
             # assign the subpanel's GNGto this modifier
-            new_modifier.node_group = bpy.data.node_groups[
-                self.subpanel_gng_name
-            ]
+            new_modifier.node_group = bpy.data.node_groups[self.gng_name]
+
+        return {"FINISHED"}
+
+
+# -------------------------------------------
+# Operators: in-graph randomisation
+# -------------------------------------------
+def rewrite_gngs_in_graph(context):
+    """Replace the sockets selected for randomisation in all geometry
+    node groups (GNGs) by seeded Random Value nodes
+
+    Each Random Value node uses the socket's min/max values, the scene
+    frame as ID and the scene seed (plus an offset per socket) as seed.
+    The values are then drawn by Blender when evaluating the geometry
+    nodes, with no Python code run per frame.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        record of each rewritten socket, with the same parameter
+        identifier as in the output parameters
+    """
+    cs = context.scene
+    sockets_to_randomise_per_gng = geom_list_to_rand(cs)
+
+    list_records = []
+    for gng_str, list_sockets in sockets_to_randomise_per_gng.items():
+        sockets_props_collection = cs.socket_props_per_gng.collection[
+            gng_str
+        ].collection
+        for sckt in list_sockets:
+            if type(sckt) not in node_rewrite.MAP_SOCKET_TYPE_TO_DATA_TYPE:
+                print(
+                    f"Socket {sckt.node.name} from {gng_str} has no",
+                    "Random Value equivalent: not rewritten",
+                )
+                continue
+
+            sckt_props = socket_ids.get_socket_props(
+                ("GEOMETRY", gng_str),
+                sockets_props_collection,
+                socket_ids.get_geometry_socket_id(sckt),
+            )
+            attr_str = cs.socket_type_to_attr[type(sckt)]
+            list_records.append(
+                node_rewrite.rewrite_socket(
+                    sckt,
+                    getattr(sckt_props, "min_" + attr_str),
+                    getattr(sckt_props, "max_" + attr_str),
+                    "geometry/" + get_socket_key(gng_str, sckt),
+                    cs,
+                )
+            )
+
+    return list_records
+
+
+class RewriteGeometryInGraph(bpy.types.Operator):
+    """Randomise the selected sockets inside the geometry node groups,
+    with seeded Random Value nodes
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "node.rewrite_geometry_sockets_in_graph"
+    bl_label = "Randomise selected sockets in the graph"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.socket_props_per_gng.collection) > 0
+
+    def execute(self, context):
+        """Execute the rewrite operator
+
+        The rewritten sockets are saved to a timestamped .json file,
+        with their bounds and seed offsets.
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        _type_
+            _description_
+        """
+        list_records = rewrite_gngs_in_graph(context)
+
+        ts_str = str(datetime.datetime.now().timestamp())
+        path_to_file = "in_graph_randomisation" + ts_str + ".json"
+        with open(path_to_file, "w") as out_file_obj:
+            out_file_obj.write(json.dumps(list_records, indent=4))
+
+        print(f"{len(list_records)} sockets randomised in the graph")
+        print("Rewritten sockets saved to file: ", path_to_file)
+
+        return {"FINISHED"}
+
+
+class RevertGeometryInGraph(bpy.types.Operator):
+    """Set the sockets randomised in the graph back to their input nodes
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "node.revert_geometry_sockets_in_graph"
+    bl_label = "Revert sockets randomised in the graph"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        n_reverted = sum(
+            node_rewrite.revert_node_tree(gng)
+            for gng in bpy.data.node_groups
+            if gng.type == "GEOMETRY"
+        )
+        print(f"{n_reverted} sockets reverted to their input nodes")
 
         return {"FINISHED"}
 
@@ -505,22 +621,12 @@ class ViewNodeGraphOneGNG(bpy.types.Operator):
 # ---------------------
 # Classes to register
 # ---------------------
-list_classes_to_register = [RandomiseAllGeometryNodes]
-
-for i in range(config.MAX_NUMBER_OF_SUBPANELS):
-    operator_i = type(
-        f"ViewNodeGraphOneGNG_subpanel_{i}",
-        (
-            ViewNodeGraphOneGNG,
-            bpy.types.Operator,
-        ),
-        {
-            "bl_idname": f"node.view_graph_for_gng_{i}",
-            "bl_label": "",
-            "subpanel_gng_idx": i,
-        },
-    )
-    list_classes_to_register.append(operator_i)  # type: ignore
+list_classes_to_register = [
+    RandomiseAllGeometryNodes,
+    ViewNodeGraphOneGNG,
+    RewriteGeometryInGraph,
+    RevertGeometryInGraph,
+]
 
 
 # -----------------------------------------
@@ -530,10 +636,6 @@ def register():
     for cls in list_classes_to_register:
         bpy.utils.register_class(cls)
 
-    bpy.app.handlers.frame_change_pre.append(
-        randomise_geometry_nodes_per_frame
-    )
-
     print("geometry operators registered")
 
 
@@ -541,8 +643,4 @@ def unregister():
     for cls in list_classes_to_register:
         bpy.utils.unregister_class(cls)
 
-    bpy.app.handlers.frame_change_pre.remove(
-        randomise_geometry_nodes_per_frame
-    )
-
     print("geometry operators unregistered")
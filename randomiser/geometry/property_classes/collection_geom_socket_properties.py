@@ -3,6 +3,7 @@ import re
 import bpy
 
 from ...material.property_classes.socket_properties import SocketProperties
+from ...utils import change_tracking, modifier_inputs, rng, socket_ids
 from ...utils import nodes2rand as nr
 
 
@@ -27,7 +28,8 @@ def compute_geom_sockets_sets(self):
 
     # set of sockets in graph for this GNG
     list_sckt_names_in_graph = [
-        sck.node.name + "_" + sck.name for sck in self.candidate_sockets
+        socket_ids.get_geometry_socket_id(sck)
+        for sck in self.candidate_sockets
     ]
     self.set_sckt_names_in_graph = set(list_sckt_names_in_graph)
 
@@ -43,26 +45,18 @@ def get_update_collection(self):
     """Getter function for the update_sockets_collection attribute
     of the collection of socket properties class (ColSocketProperties)
 
-    It will run when the property value is 'get' and
-    it will update the collection of socket properties if required
+    It only reads the dirty flags set by the change tracking handlers,
+    so it is cheap and does not modify the collection. To synchronise
+    the collection, set the attribute to True (or call
+    ColGeomNodeGroups.sync_collections)
 
     Returns
     -------
     boolean
-        returns True if the collection of socket properties is updated,
-        otherwise it returns False
+        returns True if the collection of socket properties may be
+        out of sync with the GNG's graph, otherwise it returns False
     """
-    # compute the different sets of sockets and add them to self
-    compute_geom_sockets_sets(self)
-
-    # if there is a difference between
-    # sets of sockets in graph and in the collection:
-    # edit the set of sockets in the collection
-    if self.set_of_sckt_names_in_one_only:
-        set_update_collection(self, True)
-        return True
-    else:
-        return False
+    return change_tracking.is_dirty(change_tracking.GEOMETRY, self.name)
 
 
 def set_update_collection(self, value):
@@ -89,10 +83,16 @@ def set_update_collection(self, value):
     """
 
     if value:
-        # if the update function is triggered directly and not via
-        # the getter function: compute the sets here
-        if not hasattr(self, "set_of_sckt_names_in_one_only"):
-            compute_geom_sockets_sets(self)
+        # compute the different sets of sockets and add them to self
+        compute_geom_sockets_sets(self)
+
+        # map socket names to sockets in the graph
+        # NOTE: my definition of socket name
+        # (node.name + _ + socket.name)
+        map_sckt_name_to_sckt = {
+            socket_ids.get_geometry_socket_id(s): s
+            for s in self.candidate_sockets
+        }
 
         # update the sockets that are only in either
         # the collection set or the graph
@@ -111,15 +111,7 @@ def set_update_collection(self, value):
 
                 # ---------------------------------------------
                 # get socket object for this socket name
-                # NOTE: my definition of socket name
-                # (node.name + _ + socket.name)
-                for s in self.candidate_sockets:
-                    # build socket id from scratch
-                    socket_id = s.node.name + "_" + s.name
-
-                    if socket_id == sckt_name:
-                        sckt = s
-                        break
+                sckt = map_sckt_name_to_sckt[sckt_name]
 
                 # for this socket type, get the name of the attribute
                 # holding the min/max properties
@@ -169,6 +161,64 @@ def set_update_collection(self, value):
                             (ini_min_max_values[m_str],) * n_dim,
                         )
 
+        # the positions of the socket properties in the collection
+        # may have changed
+        socket_ids.invalidate_socket_props_index(("GEOMETRY", self.name))
+
+        # update the properties of the inputs randomised per object
+        update_modifier_inputs_collection(self)
+
+
+def update_modifier_inputs_collection(self):
+    """Update the collection of properties of the GNG's inputs that are
+    randomised per object (see utils.modifier_inputs)
+
+    The properties of inputs removed from the GNG's interface are
+    removed, and inputs added to it get their initial min/max values
+    from the interface (false and true for booleans). The set of input
+    identifiers added or removed is saved in self.
+
+    Parameters
+    ----------
+    self : ColGeomSocketProperties
+        collection of socket properties of a GNG
+    """
+    map_id_to_input = {
+        in_socket.identifier: (in_socket, kind, attr_str)
+        for in_socket, kind, _, attr_str in (
+            modifier_inputs.get_gng_inputs_to_randomise(
+                bpy.data.node_groups[self.name]
+            )
+        )
+    }
+    set_ids_in_collection = set(inp_p.name for inp_p in self.modifier_inputs)
+    self.set_of_input_ids_in_one_only = (
+        set_ids_in_collection.symmetric_difference(map_id_to_input)
+    )
+
+    for input_id in self.set_of_input_ids_in_one_only:
+        # if the input exists only in the collection: remove it
+        if input_id in set_ids_in_collection:
+            self.modifier_inputs.remove(self.modifier_inputs.find(input_id))
+            continue
+
+        # if the input exists only in the interface: add it
+        in_socket, kind, attr_str = map_id_to_input[input_id]
+        input_prop = self.modifier_inputs.add()
+        input_prop.name = input_id
+        input_prop.bool_randomise = True
+        if kind == rng.CHOICE:
+            min_max_values = (False, True)
+        else:
+            min_max_values = (in_socket.min_value, in_socket.max_value)
+        for m_str, m_val in zip(["min", "max"], min_max_values):
+            m_attr_str = m_str + "_" + attr_str
+            setattr(
+                input_prop,
+                m_attr_str,
+                (m_val,) * len(getattr(input_prop, m_attr_str)),
+            )
+
 
 def get_input_json(self):
     """Getter function for the update_sockets_collection attribute
@@ -248,6 +298,12 @@ class ColGeomSocketProperties(bpy.types.PropertyGroup):
         type=SocketProperties
     )
 
+    # collection of properties of the GNG's inputs randomised per object
+    # (one per input identifier)
+    modifier_inputs: bpy.props.CollectionProperty(  # type: ignore
+        type=SocketProperties
+    )
+
     input_json: bpy.props.BoolProperty(  # type: ignore
         default=False,
     )
@@ -289,6 +345,24 @@ class ColGeomSocketProperties(bpy.types.PropertyGroup):
         This is becase these sockets cannot be randomised between
         min and max values
 
+        The list is cached, and only recomputed when the structure of
+        the node group changes.
+
+        Returns
+        -------
+        list
+            list of sockets in the input nodes in the graph
+        """
+        return nr.get_cached_candidate_sockets(
+            ("GEOMETRY", self.name),
+            [bpy.data.node_groups[self.name]],
+            self.get_candidate_sockets,
+        )
+
+    def get_candidate_sockets(self):
+        """Compute the candidate sockets for this GNG, without
+        using the cache
+
         Returns
         -------
         list
@@ -1,7 +1,11 @@
 import bpy
 
 from ... import config
-from .collection_geom_socket_properties import ColGeomSocketProperties
+from ...utils import change_tracking, modifier_inputs
+from .collection_geom_socket_properties import (
+    ColGeomSocketProperties,
+    set_update_collection,
+)
 
 
 # ---------------------------------------------------
@@ -35,28 +39,18 @@ def get_update_node_groups_collection(self):
     """Getter function for the 'update_gngs_collection'
     attribute.
 
-    Checks if the collection of GNGs needs
-    to be updated, and updates it if required.
-
-    The collection will need to be updated if there
-    are GNGs that have been added/deleted from the scene.
+    It only reads the dirty flags set by the change tracking handlers,
+    so it is cheap and does not modify the collection. To synchronise
+    the collection, set the attribute to True (or call
+    ColGeomNodeGroups.sync_collections)
 
     Returns
     -------
     boolean
-        returns True if the collection is updated,
-        otherwise it returns False
+        returns True if the collection of GNGs may be out of sync
+        with the Blender data, otherwise it returns False
     """
-    # compute relevant GNG sets and add them to self
-    compute_node_groups_sets(self)
-
-    # if there are node groups that exist only in the Blender
-    # data structure, or only in the collection: edit the collection
-    if self.set_node_groups_in_one_only:
-        set_update_node_groups_collection(self, True)
-        return True
-    else:
-        return False
+    return change_tracking.is_dirty(change_tracking.GEOMETRY)
 
 
 def set_update_node_groups_collection(self, value):
@@ -71,10 +65,8 @@ def set_update_node_groups_collection(self, value):
 
     # if update value is True
     if value:
-        # if the update fn is triggered directly and not via
-        # the getter function: compute the required sets here
-        if not hasattr(self, "set_node_groups_in_one_only"):
-            compute_node_groups_sets(self)
+        # compute relevant GNG sets and add them to self
+        compute_node_groups_sets(self)
 
         # for all node groups that are in one set only
         for gr_name in self.set_node_groups_in_one_only:
@@ -91,12 +83,17 @@ def set_update_node_groups_collection(self, value):
 class ColGeomNodeGroups(bpy.types.PropertyGroup):
     """Collection of Geometry Node Groups
 
-    This class has two attributes and one property
+    This class has four attributes, one property and one method
     - collection (attribute): holds the collection of GNGs
-    - update_gngs_collection (attribute): helper attribute to force updates on
-      the collection of GNGs
+    - update_gngs_collection (attribute): helper attribute to check if the
+      collection of GNGs is out of sync, or to force updates on it
+    - active_idx (attribute): index of the GNG selected in the UI list
+    - bool_per_object_inputs (attribute): whether the inputs of geometry
+      nodes modifiers are randomised per object
     - candidate_gngs (property): returns the updated list of geometry node
       groups defined in the scene
+    - sync_collections (method): synchronises the collections of GNGs and
+      socket properties that are out of sync
 
     This data will be made availabe via bpy.context.scene.socket_props_per_gng
 
@@ -123,11 +120,26 @@ class ColGeomNodeGroups(bpy.types.PropertyGroup):
         set=set_update_node_groups_collection,
     )
 
+    # index of the GNG selected in the UI list
+    active_idx: bpy.props.IntProperty(default=0)  # type: ignore
+
+    # randomise the inputs of geometry nodes modifiers per object
+    bool_per_object_inputs_prop = bpy.props.BoolProperty(
+        name="Randomise modifier inputs per object",
+        description=(
+            "Randomise the modifier inputs whose name starts with the "
+            "random keyword, with different values for every object"
+        ),
+        default=False,
+    )
+    bool_per_object_inputs: bool_per_object_inputs_prop  # type: ignore
+
     # candidate geometry node groups
     @property
     def candidate_gngs(self):  # getter method
         """Return list of geometry node groups
-        with nodes that start with the random keyword inside them
+        with nodes that start with the random keyword inside them,
+        or with inputs that start with it in their interface
 
         Returns
         -------
@@ -148,10 +160,46 @@ class ColGeomNodeGroups(bpy.types.PropertyGroup):
                         for ni in nd.nodes
                     ]
                 )
+                # or inputs to randomise per object
+                or modifier_inputs.get_gng_inputs_to_randomise(nd)
             )
         ]
         return list_node_groups
 
+    def sync_collections(self):
+        """Synchronise the collection of GNGs, and the collection of
+        socket properties of each GNG, with the Blender data
+
+        Only the collections marked as out of sync by the change
+        tracking handlers are checked, so this is cheap if nothing
+        was edited since the last call.
+
+        Returns
+        -------
+        boolean
+            returns True if any collection was modified,
+            otherwise it returns False
+        """
+        dirty_names = change_tracking.pop_dirty(change_tracking.GEOMETRY)
+        if not dirty_names:
+            return False
+
+        set_update_node_groups_collection(self, True)
+        updated = bool(self.set_node_groups_in_one_only)
+
+        # GNGs just added to the collection are also synchronised
+        for gng in self.collection:
+            if (
+                None in dirty_names
+                or gng.name in dirty_names
+                or gng.name not in self.set_node_groups_in_collection
+            ):
+                set_update_collection(gng, True)
+                updated |= bool(gng.set_of_sckt_names_in_one_only)
+                updated |= bool(gng.set_of_input_ids_in_one_only)
+
+        return updated
+
 
 # -----------------------------------------
 # Register and unregister functions
@@ -1,7 +1,123 @@
 import bpy
 
-from .. import config
 from ..material.ui import TemplatePanel, draw_sockets_list
+from ..utils import input_bounds, modifier_inputs, rng
+from .operators import is_gng_viewable
+
+
+# ----------------------
+# UI list of GNGs
+# ---------------------
+class NODE_UL_gngs(bpy.types.UIList):
+    """List of geometry node groups (GNGs) with nodes to randomise
+
+    Each item is a button that shows the GNG's graph. The button is
+    disabled if the graph cannot be shown for the active object.
+    Only the visible rows of the list are drawn, so the cost of
+    drawing the panel does not depend on the number of GNGs.
+    The list can be filtered by name.
+    """
+
+    def draw_item(
+        self,
+        context,
+        layout,
+        data,
+        item,
+        icon,
+        active_data,
+        active_propname,
+        index,
+    ):
+        row = layout.row(align=True)
+        row.label(text="", icon="GEOMETRY_NODES")
+        # view graph button with the GNG name
+        sub = row.row(align=True)
+        sub.enabled = is_gng_viewable(context, item.name)
+        sub.operator(
+            "node.view_graph_for_gng",
+            text=item.name,
+            emboss=False,
+        ).gng_name = item.name
+
+
+# ----------------------
+# Modifier inputs
+# ---------------------
+def draw_modifier_inputs_list(layout, gng_props):
+    """Draw the min/max boundaries and randomisation toggle of the
+    inputs of a geometry node group (GNG) randomised per object
+
+    Inputs whose boundaries are still at the default limits of their
+    type are highlighted, since they are not randomised.
+
+    Parameters
+    ----------
+    layout : bpy.types.UILayout
+        layout to draw in
+    gng_props : ColGeomSocketProperties
+        collection of socket properties of the GNG
+    """
+    # inputs with properties (synchronised when drawing the main panel)
+    list_inputs = []
+    for (
+        in_socket,
+        kind,
+        _,
+        attr_str,
+    ) in modifier_inputs.get_gng_inputs_to_randomise(
+        bpy.data.node_groups[gng_props.name]
+    ):
+        input_props = gng_props.modifier_inputs.get(in_socket.identifier)
+        if input_props is not None:
+            list_inputs.append((in_socket, kind, attr_str, input_props))
+
+    for i_n, (in_socket, kind, attr_str, input_props) in enumerate(
+        list_inputs
+    ):
+        # if first input: add labels for min and max
+        if i_n == 0:
+            layout.separator(factor=1.0)
+            row_split = layout.row().split()
+            col1 = row_split.column(align=True)
+            col2 = row_split.column(align=True)
+            col3 = row_split.column(align=True)
+            col4 = row_split.column(align=True)
+
+            col1.label(text="Modifier inputs")
+            col2.alignment = "CENTER"
+            col2.label(text="min")
+            col3.alignment = "CENTER"
+            col3.label(text="max")
+
+        # split row in 4 columns
+        row = layout.row()
+        row.alert = input_bounds.is_unbounded(
+            kind,
+            getattr(input_props, "min_" + attr_str),
+            getattr(input_props, "max_" + attr_str),
+        )
+        row_split = row.split()
+        col1 = row_split.column(align=True)
+        col2 = row_split.column(align=True)
+        col3 = row_split.column(align=True)
+        col4 = row_split.column(align=True)
+
+        # input name
+        col1.alignment = "RIGHT"
+        col1.label(text=in_socket.name)
+
+        # min and max columns
+        # (if input is Boolean: add non-editable labels)
+        for m_str, col in zip(["min", "max"], [col2, col3]):
+            if kind == rng.CHOICE:
+                m_val = getattr(input_props, m_str + "_" + attr_str)
+                col.label(text=str(list(m_val)[0]))
+            else:
+                col.prop(input_props, m_str + "_" + attr_str, icon_only=True)
+
+        # randomisation toggle
+        col4.prop(input_props, "bool_randomise", icon_only=True)
 
 
 # ----------------------
@@ -51,6 +167,13 @@ class MainPanelRandomGeometryNodes(TemplatePanel):
         context : _type_
             _description_
         """
+        cs = context.scene
+
+        # synchronise the collections of GNGs and sockets first
+        # (only if the Blender data was edited since the last sync)
+        if cs.socket_props_per_gng.sync_collections():
+            print("Collection of Geometry Node Groups updated")
+
         column = self.layout.column(align=True)
         column.label(
             text=(
@@ -58,14 +181,23 @@ class MainPanelRandomGeometryNodes(TemplatePanel):
                 "on the Geometry Node Editor"
             )
         )
+        column.template_list(
+            "NODE_UL_gngs",
+            "",
+            cs.socket_props_per_gng,
+            "collection",
+            cs.socket_props_per_gng,
+            "active_idx",
+            rows=4,
+        )
 
 
 # ------------------------------
-# Subpanel for each node group
+# Subpanel for the selected node group
 # -----------------------------
 class SubPanelRandomGeometryNodes(TemplatePanel):
-    """Parent class for the geometry node groups' (GNG)
-    subpanels
+    """Panel showing the sockets to randomise of the geometry node
+    group (GNG) selected in the list of GNGs
 
     Parameters
     ----------
@@ -82,7 +214,7 @@ class SubPanelRandomGeometryNodes(TemplatePanel):
     bl_idname = "NODE_GEOMETRY_PT_subpanel"
     bl_parent_id = "NODE_GEOMETRY_PT_mainpanel"
     bl_label = ""  # title of the panel displayed to the user
-    bl_options = {"DEFAULT_CLOSED"}
+    bl_options = {"HIDE_HEADER"}
     # NOTE: other bl_options in the link below
     # https://docs.blender.org/api/master/bpy.types.Panel.html#bpy.types.Panel.bl_options
 
@@ -90,8 +222,7 @@ class SubPanelRandomGeometryNodes(TemplatePanel):
     def poll(cls, context):
         """Determine whether the GNG subpanel can be displayed.
 
-        To display a subpanels, its index must be lower than the
-        total number of GNGs defined in the scene
+        The subpanel is displayed if a GNG is selected in the list
 
         Parameters
         ----------
@@ -104,40 +235,10 @@ class SubPanelRandomGeometryNodes(TemplatePanel):
             _description_
         """
         cs = context.scene
-
-        # force an update on the group nodes collection first
-        if cs.socket_props_per_gng.update_gngs_collection:
-            print("Collection of Geometry Node Groups updated")
-
-        return cls.subpanel_gng_idx < len(cs.socket_props_per_gng.collection)
-
-    def draw_header(self, context):
-        """Define header for the GNG subpanel
-
-        The header shows the name of the associated geometry node group
-        (GNG) inside a button. The button is linked to the view-graph
-        operator.
-
-        Parameters
-        ----------
-        context : _type_
-            _description_
-        """
-        cs = context.scene
-
-        # get this subpanel's GNG
-        subpanel_gng = cs.socket_props_per_gng.collection[
-            self.subpanel_gng_idx
-        ]
-
-        # add view graph operator to layout
-        layout = self.layout
-        layout.use_property_split = True
-        layout.use_property_decorate = False
-        layout.operator(
-            f"node.view_graph_for_gng_{self.subpanel_gng_idx}",
-            text=subpanel_gng.name,
-            emboss=True,
+        return (context.object is not None) and (
+            0
+            <= cs.socket_props_per_gng.active_idx
+            < len(cs.socket_props_per_gng.collection)
         )
 
     def draw(self, context):
@@ -150,31 +251,22 @@ class SubPanelRandomGeometryNodes(TemplatePanel):
         """
         cs = context.scene
 
-        # get this subpanel's GNG
+        # get the GNG selected in the list
         subpanel_gng = cs.socket_props_per_gng.collection[
-            self.subpanel_gng_idx
+            cs.socket_props_per_gng.active_idx
         ]
 
-        # force an update in the sockets for this GNG
-        if cs.socket_props_per_gng.collection[
-            subpanel_gng.name
-        ].update_sockets_collection:
-            print("Collection of Geometry Node Groups updated")
-
-        # get (updated) collection of socket props for this GNG
-        sockets_props_collection = cs.socket_props_per_gng.collection[
-            subpanel_gng.name
-        ].collection
-
-        # Get list of input nodes to randomise for this subpanel's GNG
-        list_parent_nodes_str = [
-            sckt.name.split("_")[0] for sckt in sockets_props_collection
-        ]
+        # get collection of socket props for this GNG
+        # (synchronised when drawing the main panel)
+        sockets_props_collection = subpanel_gng.collection
 
-        list_input_nodes = [
-            bpy.data.node_groups[subpanel_gng.name].nodes[nd_str]
-            for nd_str in list_parent_nodes_str
-        ]
+        # Get list of input nodes to randomise for this GNG
+        list_input_nodes = list(
+            {
+                sckt.node.name: sckt.node
+                for sckt in subpanel_gng.candidate_sockets
+            }.values()
+        )
 
         # Draw sockets to randomise per input node, including their
         # current value and min/max boundaries
@@ -185,6 +277,11 @@ class SubPanelRandomGeometryNodes(TemplatePanel):
             sockets_props_collection,
         )
 
+        # Draw the inputs randomised per object, with their
+        # min/max boundaries
+        if cs.socket_props_per_gng.bool_per_object_inputs:
+            draw_modifier_inputs_list(self.layout, subpanel_gng)
+
 
 # -------------------------------------------
 # Subpanel for the 'randomise-all' operator
@@ -236,46 +333,38 @@ class SubPanelRandomGeometryOperator(TemplatePanel):
             _description_
         """
         column = self.layout.column(align=True)
+        column.prop(
+            context.scene.socket_props_per_gng, "bool_per_object_inputs"
+        )
         column.operator(
             "node.randomise_all_geometry_sockets",
             text="Randomise",
         )
 
+        # randomise the selected sockets in the graph instead
+        row = self.layout.row(align=True)
+        row.operator(
+            "node.rewrite_geometry_sockets_in_graph",
+            text="Randomise in Graph",
+        )
+        row.operator(
+            "node.revert_geometry_sockets_in_graph",
+            text="Revert",
+        )
+
 
 # -----------------------
 # Classes to register
 # ---------------------
-
-# add Main panel to the list of classes to register
+# NOTE: to render the subpanel with the operator as the last panel
+# we add it as the last one to the list
 list_classes_to_register = [
+    NODE_UL_gngs,
     MainPanelRandomGeometryNodes,
+    SubPanelRandomGeometryNodes,
+    SubPanelRandomGeometryOperator,
 ]
 
-# Define (dynamically) a subpanel class for each Geometry Node Group (GNGs)
-# and add them to the list of classes to register
-# NOTE: because we don't know the number of GNGs that will be
-# defined a priori, we define n=MAX_NUMBER_OF_SUBPANELS classes and
-# assign an index to each of them. We will only display the subpanels
-# whose index is lower than the total number of GNGs defined in the scene.
-for i in range(config.MAX_NUMBER_OF_SUBPANELS):
-    # define subpanel class for GNG i
-    subpanel_class_i = type(
-        f"NODE_GEOMETRY_PT_subpanel_{i}",
-        (SubPanelRandomGeometryNodes,),
-        {
-            "bl_idname": f"NODE_GEOMETRY_PT_subpanel_{i}",
-            "subpanel_gng_idx": i,
-        },
-    )
-    # append to list of classes to register
-    list_classes_to_register.append(subpanel_class_i)  # type: ignore
-
-
-# add Subpanel with operator to the list
-# NOTE: to render it as the last panel
-# we add it as the last one to the list
-list_classes_to_register.append(SubPanelRandomGeometryOperator)
-
 
 # -----------------------------------------
 # Register and unregister functions
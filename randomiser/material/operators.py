@@ -1,11 +1,12 @@
-from random import seed, uniform
+from random import uniform
 
 import bpy
 import numpy as np
-from bpy.app.handlers import persistent
 
-from .. import config
+from ..random_all.sampling import get_socket_key
 from ..utils import node_groups as ng
+from ..utils import node_rewrite, object_attributes, rng, socket_ids
+from ..utils.list_props_to_randomise import mat_list_to_rand
 
 
 # --------------------------------------------
@@ -46,7 +47,7 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
         The invoke() function runs before executing the operator.
         Here, we
         - add the list of input nodes and collection of socket properties to
-          the operator self,
+          the operator self, with each socket listed once,
         - unselect the randomisation toggle of the sockets of input nodes if
           they are not linked to any other node
 
@@ -63,65 +64,14 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
             _description_
         """
 
-        # add list of materials to operator self
-        # (this list should have been updated already, when drawing the panel)
-        cs = context.scene
-        self.list_subpanel_material_names = [
-            mat.name
-            for mat in cs.socket_props_per_material.collection
-            # for mat in cs.socket_props_per_material.candidate_materials
-        ]
-
-        # for every material: save sockets to randomise
-        self.sockets_to_randomise_per_material = {}
-        for mat_str in self.list_subpanel_material_names:
-            # get collection of socket properties for this material
-            # ATT socket properties do not include the actual socket object
-            if cs.socket_props_per_material.collection[
-                mat_str
-            ].update_sockets_collection:
-                print("Collection of material sockets updated")
-
-            sockets_props_collection = cs.socket_props_per_material.collection[
-                mat_str
-            ].collection
-
-            # get candidate sockets for this material
-            candidate_sockets = cs.socket_props_per_material.collection[
-                mat_str
-            ].candidate_sockets
-
-            # if socket unlinked and randomisation toggle is True:
-            # modify socket props to set toggle to False
-            self.sockets_to_randomise_per_material[mat_str] = []
-            for sckt in candidate_sockets:
-                # get socket identifier sting
-                sckt_id = sckt.node.name + "_" + sckt.name
-                if sckt.node.id_data.name in bpy.data.node_groups:
-                    sckt_id = sckt.node.id_data.name + "_" + sckt_id
-
-                # if this socket is selected to randomise but it is unlinked:
-                # set randomisation toggle to False
-                if (not sckt.is_linked) and (
-                    sockets_props_collection[sckt_id].bool_randomise
-                ):
-                    setattr(
-                        sockets_props_collection[sckt_id],
-                        "bool_randomise",
-                        False,
-                    )
-                    print(
-                        f"Socket {sckt_id} from {mat_str} is unlinked:",
-                        "randomisation toggle set to False",
-                    )
-
-                # after modifying randomisation toggle
-                # save list of sockets to randomise to dict,
-                # with key = material
-                if sockets_props_collection[sckt_id].bool_randomise:
-                    self.sockets_to_randomise_per_material[mat_str].append(
-                        sckt
-                    )
+        # add list of materials and sockets to randomise per material
+        # to operator self (each socket is listed once, under the
+        # material owning it, even if it is inside a node group shared
+        # by several materials)
+        (
+            self.list_subpanel_material_names,
+            self.sockets_to_randomise_per_material,
+        ) = mat_list_to_rand(context.scene)
 
     def invoke(self, context, event):
         self.testing = False
@@ -151,12 +101,7 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
         cs = context.scene
 
         # Set the seed if it is toggled on
-        previous_seed = cs.seed_properties.seed_previous
-        current_seed = cs.seed_properties.seed
-        seed_enabled = cs.seed_properties.seed_toggle
-        if (previous_seed != current_seed) and (seed_enabled is True):
-            seed(current_seed)
-            cs.seed_properties.seed_previous = current_seed
+        rng.reseed_if_changed(cs.seed_properties)
 
         # For every material with a subpanel
         for mat_str in self.list_subpanel_material_names:
@@ -168,14 +113,16 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
 
             # Loop through the sockets to randomise
             for sckt in self.sockets_to_randomise_per_material[mat_str]:
-                socket_id = sckt.node.name + "_" + sckt.name
-                if sckt.node.id_data.name in bpy.data.node_groups:
-                    socket_id = sckt.node.id_data.name + "_" + socket_id
+                sckt_props = socket_ids.get_socket_props(
+                    ("MATERIAL", mat_str),
+                    sockets_props_collection,
+                    socket_ids.get_material_socket_id(sckt),
+                )
 
                 # min value for this socket
                 min_val = np.array(
                     getattr(
-                        sockets_props_collection[socket_id],
+                        sckt_props,
                         "min_" + cs.socket_type_to_attr[type(sckt)],
                     )
                 )
@@ -183,7 +130,7 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
                 # max value for this socket
                 max_val = np.array(
                     getattr(
-                        sockets_props_collection[socket_id],
+                        sckt_props,
                         "max_" + cs.socket_type_to_attr[type(sckt)],
                     )
                 )
@@ -207,20 +154,16 @@ class RandomiseAllMaterialNodes(bpy.types.Operator):
                 # assign randomised socket value
                 sckt.default_value = uniform(min_val, max_val)
 
+        # randomise the sockets replaced by object attributes, per object
+        object_attributes.randomise_object_attributes(
+            cs, rng.get_sequential_generator()
+        )
+
         self.testing = True
 
         return {"FINISHED"}
 
 
-# Without persistent, the function is removed from the handlers' list
-#  once executed
-@persistent
-def randomise_material_nodes_per_frame(dummy):
-    bpy.ops.node.randomise_all_material_sockets("INVOKE_DEFAULT")
-
-    return
-
-
 # -------------------------------
 # Operator: view graph for material
 # -------------------------------
@@ -239,19 +182,20 @@ class ViewNodeGraphOneMaterial(bpy.types.Operator):
     """
 
     # metadata
-    bl_idname = (
-        "node.view_graph"  # this is appended to bpy.ops.
-        # NOTE: it will be overwritten
-    )
+    bl_idname = "node.view_graph_for_material"  # appended to bpy.ops.
     bl_label = "View node graph for this material"
     bl_options = {"REGISTER", "UNDO"}
 
+    # name of the material whose graph to show
+    material_name_prop = bpy.props.StringProperty()
+    material_name: material_name_prop  # type: ignore
+
     @classmethod
     def poll(cls, context):
         """Determine whether the operator can be executed
 
-        The name of the subpanel must be a material in Blender's data
-        structure
+        There must be an active object, to show the material in
+        one of its slots.
 
         If the operator can't be executed, the button will appear as disabled.
 
@@ -266,47 +210,7 @@ class ViewNodeGraphOneMaterial(bpy.types.Operator):
             _description_
         """
         # used to check if the operator can run.
-        cs = context.scene
-        subpanel_material = cs.socket_props_per_material.collection[
-            cls.subpanel_material_idx
-        ]
-
-        # e.g: cls.subpanel_material_name = subpanel_material.name
-        return subpanel_material.name in [
-            mat.name for mat in bpy.data.materials
-        ]
-
-    def invoke(self, context, event):
-        """Initialise parmeters before executing
-
-        The invoke() function runs before executing the operator.
-        Here, we
-        - add the list of input nodes and collection of socket properties to
-          the operator self,
-        - unselect the randomisation toggle of the sockets of input nodes if
-          they are not linked to any other node
-
-        Parameters
-        ----------
-        context : bpy_types.Context
-            the context from which the operator is executed
-        event : _type_
-            _description_
-
-        Returns
-        -------
-        _type_
-            _description_
-        """
-        # add list of socket properties to operator self
-        # (this list should have been updated already, when drawing the panel)
-        cs = context.scene
-        subpanel_material = cs.socket_props_per_material.collection[
-            self.subpanel_material_idx
-        ]
-        self.subpanel_material_name = subpanel_material.name
-
-        return self.execute(context)
+        return context.object is not None
 
     def execute(self, context):
         """Execute 'view graph' operator
@@ -331,12 +235,17 @@ class ViewNodeGraphOneMaterial(bpy.types.Operator):
         _type_
             _description_
         """
+        # the material must be in Blender's data structure
+        if self.material_name not in bpy.data.materials:
+            self.report({"ERROR"}, f"Material {self.material_name} not found")
+            return {"CANCELLED"}
+
         cob = context.object
 
         # get the subpanel's material slot index
         # returns -1 if there is no slot for that material
         slot_idx_for_subpanel_material = cob.material_slots.find(
-            self.subpanel_material_name
+            self.material_name
         )
 
         # change active slot shown in graph
@@ -351,17 +260,147 @@ class ViewNodeGraphOneMaterial(bpy.types.Operator):
 
         # check if the subpanel's material is the active one
         # (when I switch slot the material switches too)
-        if (
-            bpy.data.materials[self.subpanel_material_name]
-            != cob.active_material
-        ):
-            cob.active_material = bpy.data.materials[
-                self.subpanel_material_name
-            ]
+        if bpy.data.materials[self.material_name] != cob.active_material:
+            cob.active_material = bpy.data.materials[self.material_name]
 
         # ensure we are at the top level in the graph
-        ng.set_ngs_graph_to_top_level(
-            bpy.data.materials[self.subpanel_material_name]
+        ng.set_ngs_graph_to_top_level(bpy.data.materials[self.material_name])
+
+        return {"FINISHED"}
+
+
+# -------------------------------
+# Operators: randomise per object
+# -------------------------------
+def rewrite_materials_per_object(context):
+    """Replace the sockets selected for randomisation in all materials
+    by Attribute nodes reading an object attribute
+
+    Each object using a material can then have its own value for each
+    of these sockets, stored as a custom property of the object.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        names of the object attributes, with the same parameter
+        identifier as in the output parameters
+    """
+    cs = context.scene
+    _, sockets_to_randomise_per_material = mat_list_to_rand(cs)
+
+    list_attribute_names = []
+    for mat_str, list_sockets in sockets_to_randomise_per_material.items():
+        for sckt in list_sockets:
+            if (
+                type(sckt)
+                not in node_rewrite.MAP_SOCKET_TYPE_TO_ATTRIBUTE_OUTPUT
+            ):
+                print(
+                    f"Socket {sckt.node.name} from {mat_str} has no",
+                    "Attribute equivalent: not rewritten",
+                )
+                continue
+
+            attribute_name = node_rewrite.get_attribute_name(
+                "materials/" + get_socket_key(mat_str, sckt)
+            )
+            node_rewrite.rewrite_socket_to_attribute(sckt, attribute_name)
+            list_attribute_names.append(attribute_name)
+
+    return list_attribute_names
+
+
+class RewriteMaterialsPerObject(bpy.types.Operator):
+    """Randomise the selected sockets per object, with Attribute nodes
+    reading a custom property of each object
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "node.rewrite_material_sockets_per_object"
+    bl_label = "Randomise selected sockets per object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.socket_props_per_material.collection) > 0
+
+    def execute(self, context):
+        """Execute the rewrite operator
+
+        The object attributes are randomised once after the rewrite,
+        so that every object using the materials has a value for them.
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        _type_
+            _description_
+        """
+        list_attribute_names = rewrite_materials_per_object(context)
+
+        rng.reseed_if_changed(context.scene.seed_properties)
+        object_attributes.randomise_object_attributes(
+            context.scene, rng.get_sequential_generator()
+        )
+
+        print(f"{len(list_attribute_names)} sockets randomised per object")
+
+        return {"FINISHED"}
+
+
+class RevertMaterialsPerObject(bpy.types.Operator):
+    """Set the sockets randomised per object back to their input nodes
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "node.revert_material_sockets_per_object"
+    bl_label = "Revert sockets randomised per object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        # sockets may be inside node groups used by the materials
+        list_node_trees = [
+            mat.node_tree for mat in bpy.data.materials if mat.use_nodes
+        ] + [ngrp for ngrp in bpy.data.node_groups if ngrp.type == "SHADER"]
+        n_reverted = sum(
+            node_rewrite.revert_node_tree(node_tree)
+            for node_tree in list_node_trees
+        )
+
+        # the objects' attributes are not read anymore
+        n_removed = object_attributes.remove_object_attributes(
+            bpy.data.objects
+        )
+        print(
+            f"{n_reverted} sockets reverted to their input nodes,",
+            f"{n_removed} object attributes removed",
         )
 
         return {"FINISHED"}
@@ -370,23 +409,12 @@ class ViewNodeGraphOneMaterial(bpy.types.Operator):
 # ---------------------
 # Classes to register
 # ---------------------
-list_classes_to_register = [RandomiseAllMaterialNodes]
-
-
-for i in range(config.MAX_NUMBER_OF_SUBPANELS):
-    operator_i = type(
-        f"ViewNodeGraphOneMaterial_subpanel_{i}",
-        (
-            ViewNodeGraphOneMaterial,
-            bpy.types.Operator,
-        ),
-        {
-            "bl_idname": f"node.view_graph_for_material_{i}",
-            "bl_label": "",
-            "subpanel_material_idx": i,
-        },
-    )
-    list_classes_to_register.append(operator_i)  # type: ignore
+list_classes_to_register = [
+    RandomiseAllMaterialNodes,
+    ViewNodeGraphOneMaterial,
+    RewriteMaterialsPerObject,
+    RevertMaterialsPerObject,
+]
 
 
 # -----------------------------------------
@@ -396,10 +424,6 @@ def register():
     for cls in list_classes_to_register:
         bpy.utils.register_class(cls)
 
-    bpy.app.handlers.frame_change_pre.append(
-        randomise_material_nodes_per_frame
-    )
-
     print("material operators registered")
 
 
@@ -407,8 +431,4 @@ def unregister():
     for cls in list_classes_to_register:
         bpy.utils.unregister_class(cls)
 
-    bpy.app.handlers.frame_change_pre.remove(
-        randomise_material_nodes_per_frame
-    )
-
     print("material operators unregistered")
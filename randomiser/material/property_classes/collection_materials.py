@@ -1,6 +1,10 @@
 import bpy
 
-from .collection_socket_properties import ColSocketProperties
+from ...utils import change_tracking
+from .collection_socket_properties import (
+    ColSocketProperties,
+    set_update_collection,
+)
 
 # -----------------------------------------------------------------
 # Setter / getter methods for update_materials_collection attribute
@@ -28,25 +32,27 @@ def compute_materials_sets(self):
 
 
 def get_update_materials_collection(self):
-    # for mat in self.candidate_materials:
+    """Get function for the update_materials_collection attribute
 
-    compute_materials_sets(self)
+    It only reads the dirty flags set by the change tracking handlers,
+    so it is cheap and does not modify the collection. To synchronise
+    the collection, set the attribute to True (or call
+    ColMaterials.sync_collections)
 
-    # if there are materials in one set only
-    if self.set_material_names_in_one_only:
-        set_update_materials_collection(self, True)
-        return True
-    else:
-        return False
+    Returns
+    -------
+    boolean
+        returns True if the collection of materials may be out of sync
+        with the Blender data, otherwise it returns False
+    """
+    return change_tracking.is_dirty(change_tracking.MATERIALS)
 
 
 def set_update_materials_collection(self, value):
     # if update value is set to True
     if value:
-        # if the update fn is triggered directly and not via
-        # getter fn: compute sets
-        if not hasattr(self, "set_material_names_in_one_only"):
-            compute_materials_sets(self)
+        # compute the different sets of materials
+        compute_materials_sets(self)
 
         # for all materials that are in one set only
         for mat_name in self.set_material_names_in_one_only:
@@ -78,6 +84,9 @@ class ColMaterials(bpy.types.PropertyGroup):
         set=set_update_materials_collection,
     )
 
+    # index of the material selected in the UI list
+    active_idx: bpy.props.IntProperty(default=0)  # type: ignore
+
     # candidate materials
     # (i.e.,materials with 'Use nodes' enabled in GUI)
     @property
@@ -87,6 +96,38 @@ class ColMaterials(bpy.types.PropertyGroup):
         return list_materials
 
     # ----------------------------
+    def sync_collections(self):
+        """Synchronise the collection of materials, and the collection
+        of socket properties of each material, with the Blender data
+
+        Only the collections marked as out of sync by the change
+        tracking handlers are checked, so this is cheap if nothing
+        was edited since the last call.
+
+        Returns
+        -------
+        boolean
+            returns True if any collection was modified,
+            otherwise it returns False
+        """
+        dirty_names = change_tracking.pop_dirty(change_tracking.MATERIALS)
+        if not dirty_names:
+            return False
+
+        set_update_materials_collection(self, True)
+        updated = bool(self.set_material_names_in_one_only)
+
+        # materials just added to the collection are also synchronised
+        for mat in self.collection:
+            if (
+                None in dirty_names
+                or mat.name in dirty_names
+                or mat.name not in self.set_material_names_in_collection
+            ):
+                set_update_collection(mat, True)
+                updated |= bool(mat.set_of_sckt_names_in_one_only)
+
+        return updated
 
 
 def register():
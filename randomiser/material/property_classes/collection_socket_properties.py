@@ -2,7 +2,7 @@ import re
 
 import bpy
 
-from ...utils import nodes2rand
+from ...utils import change_tracking, node_groups, nodes2rand, socket_ids
 from .socket_properties import SocketProperties
 
 
@@ -16,18 +16,12 @@ def compute_sockets_sets(self):
     )
 
     # set of sockets in graph *for this material* !
-    list_sckt_names_in_graph = []
-    for sck in self.candidate_sockets:
-        # if socket comes from a node inside a group
-        if sck.node.id_data.name in bpy.data.node_groups:
-            list_sckt_names_in_graph.append(
-                sck.node.id_data.name + "_" + sck.node.name + "_" + sck.name
-            )
-        # if socket comes from an independent node
-        else:
-            list_sckt_names_in_graph.append(sck.node.name + "_" + sck.name)
-
-    self.set_sckt_names_in_graph = set(list_sckt_names_in_graph)
+    # (if the socket comes from a node inside a group, its name is
+    # prefixed with the group name)
+    self.set_sckt_names_in_graph = set(
+        socket_ids.get_material_socket_id(sck)
+        for sck in self.candidate_sockets
+    )
 
     # set of sockets that are just in one of the two groups
     self.set_of_sckt_names_in_one_only = (
@@ -41,27 +35,18 @@ def get_update_collection(self):
     """Get function for the update_sockets_collection attribute
     of the class ColSocketProperties
 
-    It will run when the property value is 'get' and
-    it will update the collection of socket properties if required
+    It only reads the dirty flags set by the change tracking handlers,
+    so it is cheap and does not modify the collection. To synchronise
+    the collection, set the attribute to True (or call
+    ColMaterials.sync_collections)
 
     Returns
     -------
     boolean
-        returns True if the collection of socket properties is updated,
-        otherwise it returns False
+        returns True if the collection of socket properties may be
+        out of sync with the material's graph, otherwise it returns False
     """
-    # compute the different sets of sockets
-    compute_sockets_sets(self)
-
-    # if there is a difference between
-    # sets of sockets in graph and in collection:
-    # edit the set of sockets in collection
-    # for this material with the latest data
-    if self.set_of_sckt_names_in_one_only:
-        set_update_collection(self, True)
-        return True  # if returns True, it has been updated
-    else:
-        return False  # if returns False, it hasn't
+    return change_tracking.is_dirty(change_tracking.MATERIALS, self.name)
 
 
 def set_update_collection(self, value):
@@ -88,10 +73,16 @@ def set_update_collection(self, value):
     """
 
     if value:
-        # if the update fn is triggered directly and not via
-        # getter fn: compute sets
-        if not hasattr(self, "set_of_sckt_names_in_one_only"):
-            compute_sockets_sets(self)
+        # compute the different sets of sockets
+        compute_sockets_sets(self)
+
+        # map socket names to sockets in the graph
+        # NOTE: my definition of socket name
+        # (node.name + _ + socket.name)
+        map_sckt_name_to_sckt = {
+            socket_ids.get_material_socket_id(s): s
+            for s in self.candidate_sockets
+        }
 
         # update sockets that are only in either
         # the collection set or the graph set
@@ -110,17 +101,7 @@ def set_update_collection(self, value):
 
                 # ---------------------------
                 # get socket object for this socket name
-                # NOTE: my definition of socket name
-                # (node.name + _ + socket.name)
-                for s in self.candidate_sockets:
-                    # build socket id from scratch
-                    socket_id = s.node.name + "_" + s.name
-                    if s.node.id_data.name in bpy.data.node_groups:
-                        socket_id = s.node.id_data.name + "_" + socket_id
-
-                    if socket_id == sckt_name:
-                        sckt = s
-                        break
+                sckt = map_sckt_name_to_sckt[sckt_name]
 
                 # add min/max values
                 # for this socket type, get the name of the attribute
@@ -149,6 +130,10 @@ def set_update_collection(self, value):
                         (ini_min_max_values[m_str],) * n_dim,
                     )
 
+        # the positions of the socket properties in the collection
+        # may have changed
+        socket_ids.invalidate_socket_props_index(("MATERIAL", self.name))
+
 
 # -----------------------
 # ColSocketProperties
@@ -191,8 +176,29 @@ class ColSocketProperties(bpy.types.PropertyGroup):
         (i.e., no input sockets).
 
         It returns a list of sockets that are candidates for
-        the randomisation.
+        the randomisation. The list is cached, and only recomputed
+        when the structure of the material's node graph changes.
+
+        Returns
+        -------
+        list
+            list of sockets in the input nodes in the graph
+        """
+        # the sockets are only recomputed if the material's node tree
+        # or any node group in it changed
+        material_node_tree = bpy.data.materials[self.name].node_tree
+        return nodes2rand.get_cached_candidate_sockets(
+            ("MATERIAL", self.name),
+            [material_node_tree]
+            + list(
+                node_groups.get_ngs_in_subtree(material_node_tree).values()
+            ),
+            self.get_candidate_sockets,
+        )
 
+    def get_candidate_sockets(self):
+        """Compute the candidate sockets for this material, without
+        using the cache
 
         Returns
         -------
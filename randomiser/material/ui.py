@@ -1,11 +1,5 @@
-"""
-Solution to show all materials in subpanels inspired on this SO answer:
-https://blender.stackexchange.com/questions/185693/how-can-i-control-the-number-of-sub-panel-instances-from-an-intproperty
-
-"""
 import bpy
 
-from .. import config
 from ..utils import nodes2rand
 
 
@@ -18,6 +12,39 @@ class TemplatePanel(bpy.types.Panel):
     bl_category = "Randomiser"  # this shows up as the tab name
 
 
+# ----------------------
+# UI list of materials
+# ---------------------
+class NODE_UL_materials(bpy.types.UIList):
+    """List of materials with nodes to randomise
+
+    Each item is a button that shows the material's graph.
+    Only the visible rows of the list are drawn, so the cost of
+    drawing the panel does not depend on the number of materials.
+    The list can be filtered by name.
+    """
+
+    def draw_item(
+        self,
+        context,
+        layout,
+        data,
+        item,
+        icon,
+        active_data,
+        active_propname,
+        index,
+    ):
+        row = layout.row(align=True)
+        row.label(text="", icon="MATERIAL")
+        # view graph button with the material name
+        row.operator(
+            "node.view_graph_for_material",
+            text=item.name,
+            emboss=False,
+        ).material_name = item.name
+
+
 # ----------------------
 # Main panel
 # ---------------------
@@ -26,6 +53,13 @@ class MainPanelRandomMaterialNodes(TemplatePanel):  # , bpy.types.Panel):
     bl_label = "Randomise MATERIAL"
 
     def draw(self, context):
+        cs = context.scene
+
+        # synchronise the collections of materials and sockets first
+        # (only if the Blender data was edited since the last sync)
+        if cs.socket_props_per_material.sync_collections():
+            print("Collection of materials updated")
+
         column = self.layout.column(align=True)
         column.label(
             text=(
@@ -33,6 +67,15 @@ class MainPanelRandomMaterialNodes(TemplatePanel):  # , bpy.types.Panel):
                 "to display its graph on the Shader Editor"
             )
         )
+        column.template_list(
+            "NODE_UL_materials",
+            "",
+            cs.socket_props_per_material,
+            "collection",
+            cs.socket_props_per_material,
+            "active_idx",
+            rows=4,
+        )
 
 
 # ---------------------------------------------------
@@ -154,93 +197,51 @@ def draw_sockets_list(
             )
 
 
-# ------------------------------
-# Subpanel for each material
-# -----------------------------
+# --------------------------------------
+# Subpanel for the selected material
+# --------------------------------------
 class SubPanelRandomMaterialNodes(TemplatePanel, bpy.types.Panel):
     """Class defining the panel for randomising
     material node properties
 
+    It shows the sockets to randomise of the material selected
+    in the list of materials, with the nodes inside each
+    group node in a separate box.
     """
 
     bl_idname = "NODE_MATERIAL_PT_subpanel"
     bl_parent_id = "NODE_MATERIAL_PT_mainpanel"
     bl_label = ""  # title of the panel displayed to the user
-    bl_options = {"DEFAULT_CLOSED"}
+    bl_options = {"HIDE_HEADER"}
     # https://docs.blender.org/api/master/bpy.types.Panel.html#bpy.types.Panel.bl_options
 
     @classmethod
     def poll(cls, context):
         cs = context.scene
 
-        # force an update on the materials collection first
-        # the '.update_collection' attribute
-        # triggers the get function that checks if an update is
-        # required. If it is, the collection of sockets is updated
-        # and returns TRUE
-        if cs.socket_props_per_material.update_materials_collection:
-            print("Collection of materials updated")
-
-        # only display subpanels for which this is true
-        return cls.subpanel_material_idx < len(
-            cs.socket_props_per_material.collection
-        )
-
-    def draw_header(self, context):
-        cs = context.scene
-        # TODO: maybe a dict? can order of materials change?
-        subpanel_material = cs.socket_props_per_material.collection[
-            self.subpanel_material_idx
-        ]
-
-        layout = self.layout
-        layout.use_property_split = True
-        layout.use_property_decorate = False  # No animation.
-
-        # For now: view graph button on top of material name
-        layout.operator(
-            f"node.view_graph_for_material_{self.subpanel_material_idx}",
-            text=subpanel_material.name,
-            emboss=True,
+        # only display if a material is selected in the list
+        return (
+            0
+            <= cs.socket_props_per_material.active_idx
+            < len(cs.socket_props_per_material.collection)
         )
 
     def draw(self, context):
-        # get name of the material for this subpanel
+        # get name of the material selected in the list
         cs = context.scene
         subpanel_material = cs.socket_props_per_material.collection[
-            self.subpanel_material_idx
+            cs.socket_props_per_material.active_idx
         ]
 
-        # then force an update in the sockets per material
-        # subpanel_material_name = subpanel_material.name
-        if cs.socket_props_per_material.collection[
-            subpanel_material.name
-        ].update_sockets_collection:
-            print("Collection of sockets updated")
-
-        # get (updated) collection of socket properties
-        # for the current material
-        sockets_props_collection = cs.socket_props_per_material.collection[
-            subpanel_material.name
-        ].collection
+        # get collection of socket properties for the current material
+        # (synchronised when drawing the main panel)
+        sockets_props_collection = subpanel_material.collection
 
         # Get list of input nodes to randomise
-        # for this subpanel's material
+        # for this material, outside of groups
         list_input_nodes = nodes2rand.get_material_nodes_to_randomise_indep(
             subpanel_material.name
         )
-
-        # TODO
-        # get nodes from sockets instead?
-        # list_parent_nodes_str = [
-        #     sckt.name.split('_')[0] for sckt in sockets_props_collection
-        # ]
-
-        # list_input_nodes = [
-        #     bpy.data.node_groups[subpanel_gng.name].nodes[nd_str]
-        #     for nd_str in list_parent_nodes_str
-        # ]
-
         draw_sockets_list(
             cs,
             self.layout,
@@ -248,109 +249,29 @@ class SubPanelRandomMaterialNodes(TemplatePanel, bpy.types.Panel):
             sockets_props_collection,
         )
 
-
-# -----------------------------------
-# Subsubpanel for node groups
-# ----------------------------------
-class SubSubPanelGroupNodes(TemplatePanel, bpy.types.Panel):
-    """Class defining the panel for randomising
-    material node properties
-
-    """
-
-    bl_idname = "NODE_MATERIAL_PT_subsubpanel"
-    bl_parent_id = "NODE_MATERIAL_PT_subpanel"  # use bl_idname
-    bl_label = ""
-    bl_options = {"DEFAULT_CLOSED"}
-
-    @classmethod
-    def poll(cls, context):
-        # force an update on the materials collection first
-        # the '.update_collection' attribute
-        # triggers the get function that checks if an update is
-        # required. If it is, the collection of sockets is updated
-        # and returns TRUE
-        # TODO: is this required here? (I am already updating when the parent
-        # subpanel is drawn)
-        cs = context.scene
-        if cs.socket_props_per_material.update_materials_collection:
-            print("Collection of materials updated")
-
-        # get material of parent subpanel and add to class
-        cls.subpanel_material_str = cs.socket_props_per_material.collection[
-            cls.subpanel_material_idx  # can I access this here?
-        ].name
-
-        # get list of *group nodes names* for this material and add to class
-        # exclude groups with no nodes to randomise inside!
-        # TODO: is it better to add to cls somewhere else? (not sure where...)
-        cls.list_nodes2rand_in_groups = (
+        # Get list of input nodes to randomise inside groups,
+        # and draw them in one box per group node
+        # (only show group nodes if they have nodes to randomise)
+        list_nodes2rand_in_groups = (
             nodes2rand.get_material_nodes_to_randomise_group(
-                cls.subpanel_material_str
+                subpanel_material.name
             )
         )
-
-        # list of group nodes names with nodes to randomise
-        # (only show group nodes in panel if they have nodes to randomise)
-        list_group_nodes_names_this_material = sorted(
-            list(set([k.id_data.name for k in cls.list_nodes2rand_in_groups]))
-        )
-
-        # add group node name to subsubpanel class
-        if cls.subsubpanel_group_node_idx < len(
-            list_group_nodes_names_this_material
+        for group_node_name in sorted(
+            set(nd.id_data.name for nd in list_nodes2rand_in_groups)
         ):
-            cls.group_node_name = list_group_nodes_names_this_material[
-                cls.subsubpanel_group_node_idx
-            ]
-
-        # only display this sub-subpanel if its index is < total group nodes
-        # for this material
-        return cls.subsubpanel_group_node_idx < len(
-            list_group_nodes_names_this_material
-        )
-
-    def draw_header(self, context):
-        layout = self.layout
-        layout.use_property_split = True
-        layout.use_property_decorate = False  # No animation.
-
-        # show name of the group node
-        layout.label(text=self.group_node_name)
-
-    def draw(self, context):
-        # get name of the material for this subpanel
-        cs = context.scene
-
-        # then force an update in the sockets per material
-        # TODO: do I need this? it should update when drawing the subpanel
-        if cs.socket_props_per_material.collection[
-            self.subpanel_material_str
-        ].update_sockets_collection:
-            print("Collection of sockets updated")
-
-        # get (updated) collection of socket properties
-        # for the current material
-        sockets_props_collection = cs.socket_props_per_material.collection[
-            self.subpanel_material_str
-        ].collection
-
-        # Get list of input nodes to randomise
-        # for this subpanel's material
-        # only nodes inside groups!
-        # keep only nodes inside this group!
-        list_input_nodes = [
-            nd
-            for nd in self.list_nodes2rand_in_groups
-            if nd.id_data.name == self.group_node_name
-        ]
-
-        draw_sockets_list(
-            cs,
-            self.layout,
-            list_input_nodes,
-            sockets_props_collection,
-        )
+            box = self.layout.box()
+            box.label(text=group_node_name, icon="NODETREE")
+            draw_sockets_list(
+                cs,
+                box,
+                [
+                    nd
+                    for nd in list_nodes2rand_in_groups
+                    if nd.id_data.name == group_node_name
+                ],
+                sockets_props_collection,
+            )
 
 
 # -------------------------------------------
@@ -373,64 +294,30 @@ class SubPanelRandomMaterialOperator(TemplatePanel, bpy.types.Panel):
             text="Randomise",
         )
 
+        # randomise the selected sockets per object instead
+        row = self.layout.row(align=True)
+        row.operator(
+            "node.rewrite_material_sockets_per_object",
+            text="Randomise per Object",
+        )
+        row.operator(
+            "node.revert_material_sockets_per_object",
+            text="Revert",
+        )
+
 
 # -----------------------
 # Classes to register
 # ---------------------
-
-# Main panel
+# NOTE: the subpanel with the operator is added as the last one
+# to the list, to render it at the bottom
 list_classes_to_register = [
+    NODE_UL_materials,
     MainPanelRandomMaterialNodes,
+    SubPanelRandomMaterialNodes,
+    SubPanelRandomMaterialOperator,
 ]
 
-# Subpanels per material, and subsubpanels per group node.
-# Define a subpanel class for each material (defined dynamically)
-# NOTE: because we don't know the number of materials that will be
-# defiend a priori, we define n=MAX_NUMBER_OF_SUBPANELS classes and
-# assign an index to each of them. We will only display the subpanels
-# whose index is < len(list_of_materials). We apply the same startegy
-# for the subsubpanels
-for i in range(config.MAX_NUMBER_OF_SUBPANELS):
-    # define subpanel class for material i
-    subpanel_class_i = type(
-        f"NODE_MATERIAL_PT_subpanel_{i}",
-        (
-            SubPanelRandomMaterialNodes,
-            bpy.types.Panel,
-        ),  # parent classes (Q FOR REVIEW: is Panel req?)
-        {
-            "bl_idname": f"NODE_MATERIAL_PT_subpanel_{i}",
-            "subpanel_material_idx": i,
-        },
-    )
-    # append to list of classes to register
-    list_classes_to_register.append(subpanel_class_i)  # type: ignore
-
-    # define n=MAX_NUMBER_OF_SUBSUBPANELS subsubpanel classes
-    # for each material i
-    for k in range(config.MAX_NUMBER_OF_SUBSUBPANELS):
-        subsubpanel_class_k = type(
-            f"NODE_MATERIAL_PT_subpanel_{i}_subsubpanel_{k}",
-            (
-                SubSubPanelGroupNodes,
-                bpy.types.Panel,
-            ),
-            {
-                "bl_idname": f"NODE_MATERIAL_PT_subsubpanel_{i}_{k}",
-                "bl_parent_id": f"NODE_MATERIAL_PT_subpanel_{i}",
-                "subpanel_material_idx": i,
-                "subsubpanel_group_node_idx": k,
-            },
-        )
-
-        # append to list of classes to register
-        list_classes_to_register.append(subsubpanel_class_k)  # type: ignore
-
-# Subpanel with operator
-# NOTE: we need to add it as the last one to the list,
-# to render it at the bottom
-list_classes_to_register.append(SubPanelRandomMaterialOperator)
-
 
 # -----------------------------------------
 # Register and unregister functions
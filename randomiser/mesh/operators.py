@@ -0,0 +1,387 @@
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from ..transform.properties import SELECTED
+from ..utils import mesh_noise, rng
+from .properties import ATTRIBUTE, POSITION, UV
+
+# Field read and written with foreach_get/foreach_set, and number of
+# components, per type of mesh attribute
+MAP_ATTR_TYPE_TO_FIELD = {
+    "FLOAT": ("value", 1),
+    "FLOAT2": ("vector", 2),
+    "FLOAT_VECTOR": ("vector", 3),
+}
+
+
+def get_mesh_layer(mesh, data_layer, attribute_name=""):
+    """Get the data of a mesh layer to read and write in bulk
+
+    Parameters
+    ----------
+    mesh : bpy.types.Mesh
+        mesh to randomise
+    data_layer : str
+        POSITION, UV or ATTRIBUTE
+    attribute_name : str, optional
+        name of the attribute, if data_layer is ATTRIBUTE
+
+    Returns
+    -------
+    tuple or None
+        collection of items, name of the field of each item and number
+        of components, or None if the mesh does not have the layer
+    """
+    if data_layer == POSITION:
+        return mesh.vertices, "co", 3
+
+    elif data_layer == UV:
+        if mesh.uv_layers.active is None:
+            return None
+        return mesh.uv_layers.active.data, "uv", 2
+
+    elif data_layer == ATTRIBUTE:
+        attribute = mesh.attributes.get(attribute_name)
+        if (attribute is None) or (
+            attribute.data_type not in MAP_ATTR_TYPE_TO_FIELD
+        ):
+            return None
+        return attribute.data, *MAP_ATTR_TYPE_TO_FIELD[attribute.data_type]
+
+    return None
+
+
+def get_meshes(context):
+    """Get the meshes to randomise, each only once
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        meshes of the selected objects or of the objects in
+        the selected collection
+    """
+    props = context.scene.randomise_mesh_props
+    if props.target_mode == SELECTED:
+        objects = [obj for obj in context.scene.objects if obj.select_get()]
+    elif props.target_collection is not None:
+        objects = props.target_collection.all_objects
+    else:
+        objects = []
+
+    # objects may share a mesh
+    map_name_to_mesh = {
+        obj.data.name: obj.data for obj in objects if obj.type == "MESH"
+    }
+    return list(map_name_to_mesh.values())
+
+
+# --------------------------------------------------
+# Noise buffers
+# --------------------------------------------------
+# Buffers per (mesh, data layer, attribute), reused every time
+# the layer is randomised. The base values are read when the buffers
+# are allocated, and again if the layer was edited since it was last
+# randomised, so the noise is always added to the original values
+# rather than accumulated over frames
+_map_layer_to_buffers = {}
+
+
+def get_buffers(mesh, data_layer, attribute_name=""):
+    """Get the noise buffers of a mesh layer
+
+    The buffers are allocated, and the original values read into them,
+    the first time the layer is randomised or if its size changed. If
+    the layer's values are not the ones last written by the randomiser
+    (e.g. if the user edited the mesh), they become its original values.
+
+    Parameters
+    ----------
+    mesh : bpy.types.Mesh
+        mesh to randomise
+    data_layer : str
+        POSITION, UV or ATTRIBUTE
+    attribute_name : str, optional
+        name of the attribute, if data_layer is ATTRIBUTE
+
+    Returns
+    -------
+    tuple or None
+        buffers, collection of items and name of their field,
+        or None if the mesh does not have the layer
+    """
+    layer = get_mesh_layer(mesh, data_layer, attribute_name)
+    if layer is None:
+        return None
+    items, field, n_components = layer
+
+    layer_key = (mesh.name, data_layer, attribute_name)
+    buffers = _map_layer_to_buffers.get(layer_key)
+    if (buffers is None) or (not buffers.matches(len(items), n_components)):
+        buffers = mesh_noise.NoiseBuffers(len(items), n_components)
+        items.foreach_get(field, buffers.base.ravel())
+        _map_layer_to_buffers[layer_key] = buffers
+    elif buffers.has_output:
+        # the noise buffer is overwritten when drawing, so it is
+        # used to read the current values
+        items.foreach_get(field, buffers.noise.ravel())
+        buffers.rebase_if_edited(buffers.noise)
+
+    return buffers, items, field
+
+
+def randomise_mesh_layer(
+    mesh, generator, data_layer, attribute_name, amplitude, distribution
+):
+    """Add noise to the original values of a mesh layer
+
+    Parameters
+    ----------
+    mesh : bpy.types.Mesh
+        mesh to randomise
+    generator : numpy.random.Generator
+        random number generator
+    data_layer : str
+        POSITION, UV or ATTRIBUTE
+    attribute_name : str
+        name of the attribute, if data_layer is ATTRIBUTE
+    amplitude : array_like
+        amplitude of the noise per component (3 values; only the first
+        ones are used for layers with fewer components)
+    distribution : str
+        UNIFORM or NORMAL (as defined in utils.mesh_noise)
+    """
+    layer_buffers = get_buffers(mesh, data_layer, attribute_name)
+    if layer_buffers is None:
+        return
+    buffers, items, field = layer_buffers
+
+    out = mesh_noise.add_noise(
+        generator,
+        buffers,
+        np.asarray(amplitude)[: buffers.shape[1]],
+        distribution,
+    )
+    items.foreach_set(field, out.ravel())
+    mesh.update()
+
+
+def restore_mesh_layer(mesh, data_layer, attribute_name=""):
+    """Set a mesh layer back to its original values
+
+    If the layer was edited since it was last randomised, the edited
+    values are kept.
+
+    Parameters
+    ----------
+    mesh : bpy.types.Mesh
+        mesh to restore
+    data_layer : str
+        POSITION, UV or ATTRIBUTE
+    attribute_name : str, optional
+        name of the attribute, if data_layer is ATTRIBUTE
+    """
+    layer_key = (mesh.name, data_layer, attribute_name)
+    if layer_key not in _map_layer_to_buffers:
+        return
+
+    # get_buffers takes any edited values as the original ones
+    layer_buffers = get_buffers(mesh, data_layer, attribute_name)
+    del _map_layer_to_buffers[layer_key]
+    if layer_buffers is None:
+        return
+
+    buffers, items, field = layer_buffers
+    items.foreach_set(field, buffers.base.ravel())
+    mesh.update()
+
+
+def restore_mesh(mesh):
+    """Set all the randomised layers of a mesh back to their
+    original values
+
+    Parameters
+    ----------
+    mesh : bpy.types.Mesh
+        mesh to restore
+    """
+    list_layer_keys = [
+        layer_key
+        for layer_key in _map_layer_to_buffers
+        if layer_key[0] == mesh.name
+    ]
+    for _, data_layer, attribute_name in list_layer_keys:
+        restore_mesh_layer(mesh, data_layer, attribute_name)
+
+
+def randomise_meshes(context):
+    """Add noise to the selected layer of all the meshes to randomise
+
+    In SEQUENTIAL mode, the noise is drawn with the sequential
+    generator. In FRAME mode, the noise of each mesh is drawn from
+    its own stream for the scene seed and the current frame.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    """
+    props = context.scene.randomise_mesh_props
+    seed_props = context.scene.seed_properties
+    for mesh in get_meshes(context):
+        if seed_props.rng_mode == rng.FRAME:
+            generator = rng.get_frame_generator(
+                rng.get_param_key(
+                    seed_props.seed,
+                    f"mesh/{mesh.name}/{props.data_layer}"
+                    f"/{props.attribute_name}",
+                ),
+                context.scene.frame_current,
+            )
+        else:
+            generator = rng.get_sequential_generator()
+
+        randomise_mesh_layer(
+            mesh,
+            generator,
+            props.data_layer,
+            props.attribute_name,
+            props.amplitude,
+            props.distribution,
+        )
+
+
+# after loading a file, the buffers may hold the values
+# of meshes with the same names in the previous file
+@persistent
+def clear_buffers(dummy):
+    _map_layer_to_buffers.clear()
+
+
+# -------------------------------
+# Operators
+# -------------------------------
+class ApplyRandomMesh(bpy.types.Operator):
+    # docstring shows as a tooltip for menu items and buttons.
+    """Add noise to the vertex positions, UV map or an attribute
+    of the selected meshes
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "object.apply_random_mesh"  # appended to bpy.ops.
+    bl_label = "Apply random noise to meshes"
+
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        # check the context here
+        return context.object is not None
+
+    def execute(self, context):
+        """Execute the randomiser operator
+
+        Add noise to the original values of the selected layer
+        of every mesh to randomise.
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        _type_
+            _description_
+        """
+        # Set the seed if it is toggled on
+        if context.scene.seed_properties.rng_mode == rng.SEQUENTIAL:
+            rng.reseed_if_changed(context.scene.seed_properties)
+
+        randomise_meshes(context)
+
+        return {"FINISHED"}
+
+
+class RestoreMesh(bpy.types.Operator):
+    # docstring shows as a tooltip for menu items and buttons.
+    """Set the randomised layers of the meshes back to their original
+    values
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "object.restore_random_mesh"  # appended to bpy.ops.
+    bl_label = "Restore original mesh values"
+
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        # check the context here
+        return context.object is not None
+
+    def execute(self, context):
+        # all the layers randomised, not only the one selected now
+        for mesh in get_meshes(context):
+            restore_mesh(mesh)
+
+        return {"FINISHED"}
+
+
+# ---------------------
+# Classes to register
+# ---------------------
+list_classes_to_register = [
+    ApplyRandomMesh,
+    RestoreMesh,
+]
+
+
+# -----------------------------------------
+# Register and unregister functions
+# ------------------------------------------
+def register():
+    """This is run when the add-on is enabled"""
+
+    for cls in list_classes_to_register:
+        bpy.utils.register_class(cls)
+
+    bpy.app.handlers.load_post.append(clear_buffers)
+
+    print("mesh operators registered")
+
+
+def unregister():
+    """
+    This is run when the add-on is disabled / Blender closes
+    """
+    for cls in list_classes_to_register:
+        bpy.utils.unregister_class(cls)
+
+    bpy.app.handlers.load_post.remove(clear_buffers)
+    _map_layer_to_buffers.clear()
+
+    print("mesh operators unregistered")
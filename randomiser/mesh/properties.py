@@ -0,0 +1,132 @@
+import bpy
+
+from ..transform.properties import COLLECTION, SELECTED
+from ..utils import mesh_noise
+
+# -------------------------------
+# Mesh data layers to randomise
+# -------------------------------
+# - POSITION: vertex positions
+# - UV: coordinates of the active UV map (per face corner)
+# - ATTRIBUTE: a float, 2D vector or 3D vector attribute, by name
+POSITION = "POSITION"
+UV = "UV"
+ATTRIBUTE = "ATTRIBUTE"
+
+
+# ---------------------------
+# Properties
+class PropertiesRandomMesh(bpy.types.PropertyGroup):
+    """
+    Class holding the set of properties
+    for the mesh noise:
+    - objects whose meshes are randomised (the selected objects or
+      the objects in a collection)
+    - mesh data layer to randomise, and name of the attribute
+    - distribution and amplitude per component of the noise
+
+    """
+
+    # Objects whose meshes are randomised
+    target_mode_prop = bpy.props.EnumProperty(
+        name="Objects",
+        items=(
+            (
+                SELECTED,
+                "Selected",
+                "Randomise the meshes of the selected objects",
+            ),
+            (
+                COLLECTION,
+                "Collection",
+                "Randomise the meshes of the objects in a collection",
+            ),
+        ),
+        default=SELECTED,
+    )
+    target_mode: target_mode_prop  # type: ignore
+
+    target_collection_prop = bpy.props.PointerProperty(
+        name="Collection", type=bpy.types.Collection
+    )
+    target_collection: target_collection_prop  # type: ignore
+
+    # Mesh data layer
+    data_layer_prop = bpy.props.EnumProperty(
+        name="Data",
+        items=(
+            (POSITION, "Vertex positions", "Add noise to vertex positions"),
+            (UV, "UV map", "Add noise to the active UV map"),
+            (
+                ATTRIBUTE,
+                "Attribute",
+                "Add noise to a float or vector attribute",
+            ),
+        ),
+        default=POSITION,
+    )
+    data_layer: data_layer_prop  # type: ignore
+
+    attribute_name_prop = bpy.props.StringProperty(
+        name="Attribute", default=""
+    )
+    attribute_name: attribute_name_prop  # type: ignore
+
+    # Noise
+    distribution_prop = bpy.props.EnumProperty(
+        name="Noise",
+        items=(
+            (
+                mesh_noise.UNIFORM,
+                "Uniform",
+                "Noise between -amplitude and +amplitude",
+            ),
+            (
+                mesh_noise.NORMAL,
+                "Normal",
+                "Gaussian noise with the amplitude as standard deviation",
+            ),
+        ),
+        default=mesh_noise.UNIFORM,
+    )
+    distribution: distribution_prop  # type: ignore
+
+    # amplitude per component (only the first ones are used
+    # for layers with fewer than 3 components)
+    amplitude_prop = bpy.props.FloatVectorProperty(
+        name="Amplitude", size=3, min=0.0, default=(0.01, 0.01, 0.01)
+    )
+    amplitude: amplitude_prop  # type: ignore
+
+
+# ------------------------------------
+# Register / unregister classes
+# ------------------------------------
+list_classes_to_register = [
+    PropertiesRandomMesh,
+]
+
+
+def register():
+    """This is run when the add-on is enabled"""
+
+    for cls in list_classes_to_register:
+        bpy.utils.register_class(cls)
+
+        bpy.types.Scene.randomise_mesh_props = bpy.props.PointerProperty(
+            type=PropertiesRandomMesh
+        )
+
+    print("mesh properties registered")
+
+
+def unregister():
+    """
+    This is run when the add-on is disabled / Blender closes
+    """
+    for cls in list_classes_to_register:
+        bpy.utils.unregister_class(cls)
+
+    del bpy.types.Scene.randomise_mesh_props
+
+    print("mesh properties unregistered")
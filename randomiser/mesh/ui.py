@@ -0,0 +1,77 @@
+import bpy
+
+from ..transform.properties import COLLECTION
+from .properties import ATTRIBUTE
+
+
+# -------
+# Panel
+# -------
+class PanelRandomMesh(bpy.types.Panel):
+    """Class defining the panel for adding noise
+    to the vertex positions, UV map or attributes of meshes
+
+    """
+
+    bl_idname = "NODE_MESH_PT_random_mesh"
+    bl_label = "Randomise MESH"
+    # title of the panel / label displayed to the user
+    bl_space_type = "NODE_EDITOR"
+    bl_region_type = "UI"
+    bl_category = "Randomiser"
+
+    @classmethod
+    def poll(self, context):
+        return context.object is not None
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.randomise_mesh_props
+
+        # Objects whose meshes are randomised
+        col = layout.column()
+        col.prop(props, "target_mode")
+        if props.target_mode == COLLECTION:
+            col.prop(props, "target_collection")
+
+        # Mesh data layer
+        col = layout.column()
+        col.prop(props, "data_layer")
+        if props.data_layer == ATTRIBUTE:
+            col.prop(props, "attribute_name")
+
+        # Noise
+        col = layout.column()
+        col.prop(props, "distribution")
+        col.prop(props, "amplitude")
+
+        # Randomise and restore buttons
+        row = layout.row(align=True)
+        row.operator("object.apply_random_mesh", text="Randomise")
+        row.operator("object.restore_random_mesh", text="Restore")
+
+
+# --------------------------------------------------
+# Register and unregister functions:
+list_classes_to_register = [
+    PanelRandomMesh,
+]
+
+
+def register():
+    """This is run when the add-on is enabled"""
+
+    for cls in list_classes_to_register:
+        bpy.utils.register_class(cls)
+
+    print("mesh UI registered")
+
+
+def unregister():
+    """
+    This is run when the add-on is disabled / Blender closes
+    """
+    for cls in list_classes_to_register:
+        bpy.utils.unregister_class(cls)
+
+    print("mesh UI unregistered")
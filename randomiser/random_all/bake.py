@@ -0,0 +1,264 @@
+import bpy
+import numpy as np
+
+from ..utils import rng
+from . import plan
+from .param_table import build_param_table
+
+# Value of the CONSTANT interpolation, as set with foreach_set
+CONSTANT_INTERPOLATION = (
+    bpy.types.Keyframe.bl_rna.properties["interpolation"]
+    .enum_items["CONSTANT"]
+    .value
+)
+
+# Rotation modes that ignore the Euler rotation, and the property holding
+# the rotation in each of them
+MAP_ROTATION_MODE_TO_ATTR = {
+    "QUATERNION": "rotation_quaternion",
+    "AXIS_ANGLE": "rotation_axis_angle",
+}
+
+
+# -------------------------------
+# F-curves
+# -------------------------------
+def get_fcurve(id_data, data_path, index):
+    """Get the F-curve animating a property, creating it if needed
+
+    Parameters
+    ----------
+    id_data : bpy.types.ID
+        data-block holding the property (an object, a node tree...)
+    data_path : str
+        path to the property from the data-block
+    index : int
+        index of the component of the property
+
+    Returns
+    -------
+    bpy.types.FCurve
+        F-curve of the property
+    """
+    anim_data = id_data.animation_data or id_data.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new(name=id_data.name + "Action")
+
+    fcurves = anim_data.action.fcurves
+    return fcurves.find(data_path, index=index) or fcurves.new(
+        data_path, index=index
+    )
+
+
+def set_fcurve_keyframes(fcurve, frames, values):
+    """Replace the keyframes of an F-curve with one keyframe per frame
+
+    All the keyframes are added and filled in bulk, with constant
+    interpolation so that each value is held until the next frame.
+
+    Parameters
+    ----------
+    fcurve : bpy.types.FCurve
+        F-curve to fill
+    frames : numpy.ndarray
+        frame numbers
+    values : numpy.ndarray
+        value at each frame
+    """
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.clear()
+    keyframe_points.add(len(frames))
+
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    keyframe_points.foreach_set("co", co.ravel())
+    keyframe_points.foreach_set(
+        "interpolation",
+        np.full(len(frames), CONSTANT_INTERPOLATION, dtype=np.int32),
+    )
+    fcurve.update()
+
+
+def get_keyframe_values(target, values):
+    """Convert the values of a parameter to the property's units
+
+    Parameters
+    ----------
+    target : ParamTarget
+        parameter
+    values : numpy.ndarray
+        values of the parameter in the recorded units, of shape
+        (number of frames, number of components)
+
+    Returns
+    -------
+    numpy.ndarray
+        values to key, of the same shape
+    """
+    if target.scale is not None:
+        values = values / target.scale
+
+    if target.kind == rng.INTEGER:
+        values = np.rint(values)
+    elif target.kind == rng.CHOICE:
+        values = (values != 0).astype(float)
+
+    return values
+
+
+def convert_euler_rotations(values, rotation_mode):
+    """Convert XYZ Euler rotations to a quaternion or axis angle
+    rotation mode
+
+    The rotations are converted as when the per-frame handler sets the
+    Euler rotation of an object in that mode (see
+    transform.operators.set_transform_array).
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        XYZ Euler rotations in radians, of shape (number of frames, 3)
+    rotation_mode : str
+        "QUATERNION" or "AXIS_ANGLE"
+
+    Returns
+    -------
+    numpy.ndarray
+        quaternions (w, x, y, z) or axis angles (angle, x, y, z),
+        of shape (number of frames, 4)
+    """
+    cos_half, sin_half = np.cos(values / 2), np.sin(values / 2)
+    (cx, cy, cz), (sx, sy, sz) = cos_half.T, sin_half.T
+    quaternions = np.stack(
+        [
+            cx * cy * cz + sx * sy * sz,
+            sx * cy * cz - cx * sy * sz,
+            cx * sy * cz + sx * cy * sz,
+            cx * cy * sz - sx * sy * cz,
+        ],
+        axis=1,
+    )
+    if rotation_mode == "QUATERNION":
+        return quaternions
+
+    # the axis of a null rotation is Y, as in Blender
+    angles = 2 * np.arccos(np.clip(quaternions[:, 0], -1, 1))
+    sin_half_angles = np.sin(angles / 2)
+    axes = np.tile([0.0, 1.0, 0.0], (len(values), 1))
+    nonzero = sin_half_angles > 1e-6
+    axes[nonzero] = quaternions[nonzero, 1:] / sin_half_angles[nonzero, None]
+    return np.column_stack([angles, axes])
+
+
+def can_bake(target):
+    """Check if the keyframes of a parameter reproduce the values set by
+    the per-frame handler
+
+    A single component of the Euler rotation of an object in quaternion
+    or axis angle mode cannot be converted to that mode on its own.
+
+    Parameters
+    ----------
+    target : ParamTarget
+        parameter
+
+    Returns
+    -------
+    bool
+        True if the parameter can be baked
+    """
+    return not (
+        target.attr == "rotation_euler"
+        and target.index is not None
+        and getattr(target.owner, "rotation_mode", None)
+        in MAP_ROTATION_MODE_TO_ATTR
+    )
+
+
+def bake_target(target, frames, values):
+    """Key the values of a parameter at a range of frames
+
+    The Euler rotations of objects in quaternion or axis angle mode are
+    converted and keyed on the property of their rotation mode, as set
+    by the per-frame handler.
+
+    Parameters
+    ----------
+    target : ParamTarget
+        parameter
+    frames : numpy.ndarray
+        frame numbers
+    values : numpy.ndarray
+        values of the parameter in the recorded units, of shape
+        (number of frames, number of components)
+
+    Returns
+    -------
+    int
+        number of F-curves filled
+    """
+    attr = target.attr
+    values = get_keyframe_values(target, values)
+
+    rotation_mode = getattr(target.owner, "rotation_mode", None)
+    if attr == "rotation_euler" and rotation_mode in MAP_ROTATION_MODE_TO_ATTR:
+        attr = MAP_ROTATION_MODE_TO_ATTR[rotation_mode]
+        values = convert_euler_rotations(values, rotation_mode)
+    data_path = target.owner.path_from_id(attr)
+
+    # a single component of an array, or all its components
+    if target.index is not None:
+        list_indices = [target.index]
+    else:
+        list_indices = range(values.shape[1])
+
+    for col, index in enumerate(list_indices):
+        set_fcurve_keyframes(
+            get_fcurve(target.owner.id_data, data_path, index),
+            frames,
+            values[:, col],
+        )
+    return len(list_indices)
+
+
+def bake_enabled_sections(context, tot_frame_no):
+    """Sample the parameters of the enabled sections for a number of
+    frames and key them on their properties
+
+    The values are sampled with build_param_table, so only in per-frame
+    RNG mode they are the same as those drawn by the per-frame handler
+    (in sequential mode, the table draws one block per section and kind
+    for all the frames). Once baked, the animation is played and
+    rendered without running any Python code per frame.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    tot_frame_no : int
+        number of frames to bake, starting from frame 0
+
+    Returns
+    -------
+    tuple
+        number of F-curves filled, and list of identifiers of the
+        parameters that could not be baked (see can_bake)
+    """
+    table = build_param_table(context, tot_frame_no)
+    frames = np.arange(table.frame_start, table.frame_start + tot_frame_no)
+
+    rand_all_props = context.scene.rand_all_properties
+    n_fcurves = 0
+    list_skipped = []
+    for target, slc in zip(table.list_targets, table.list_slices):
+        if not getattr(
+            rand_all_props, plan.MAP_SECTION_TO_TOGGLE[target.section]
+        ):
+            continue
+        if not can_bake(target):
+            list_skipped.append(target.param_id)
+            continue
+        n_fcurves += bake_target(target, frames, table.values[:, slc])
+
+    return n_fcurves, list_skipped
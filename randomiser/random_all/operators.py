@@ -1,14 +1,11 @@
 import datetime
 import json
-from random import seed
 
 import bpy
-import numpy as np
 from bpy.app.handlers import persistent
 
-from ..define_prop.ui import attr_get_type, get_attr_only_str, get_obj_str
-from ..transform.operators import get_transform_inputs, randomise_selected
-from ..utils import nodes2rand
+from ..utils import param_log, param_store, rng
+from . import bake, plan, replay, sampling
 
 
 # -------------------------------
@@ -42,7 +39,8 @@ class ApplyRandomAll(bpy.types.Operator):
     def execute(self, context):
         """Execute the randomiser operator
 
-        Randomise all the panels
+        Randomise once all the panels enabled in the
+        randomise all panel, in a fixed order.
 
         Parameters
         ----------
@@ -55,42 +53,7 @@ class ApplyRandomAll(bpy.types.Operator):
             _description_
         """
 
-        (
-            loc,
-            loc_x_range,
-            loc_y_range,
-            loc_z_range,
-            rot,
-            rot_x_range,
-            rot_y_range,
-            rot_z_range,
-            delta_on,
-            rand_posx,
-            rand_posy,
-            rand_posz,
-            rand_rotx,
-            rand_roty,
-            rand_rotz,
-        ) = get_transform_inputs(context)
-
-        randomise_selected(
-            context,
-            loc,
-            loc_x_range,
-            loc_y_range,
-            loc_z_range,
-            rot,
-            rot_x_range,
-            rot_y_range,
-            rot_z_range,
-            delta_on,
-            rand_posx,
-            rand_posy,
-            rand_posz,
-            rand_rotx,
-            rand_roty,
-            rand_rotz,
-        )
+        plan.randomise_enabled_sections(context)
 
         return {"FINISHED"}
 
@@ -98,7 +61,7 @@ class ApplyRandomAll(bpy.types.Operator):
 # -------------------------------
 class ApplySaveParams(bpy.types.Operator):
     # docstring shows as a tooltip for menu items and buttons.
-    """Save parameter outputs in .json
+    """Save parameter outputs in .json, .jsonl or .npz chunks
 
     Parameters
     ----------
@@ -124,9 +87,13 @@ class ApplySaveParams(bpy.types.Operator):
     def execute(self, context):
         """Execute the save param operator
 
-        Randomise camera transforms, materials and geometry
-        for selected number of frames and save output parameters
-        in .json
+        Randomise camera transforms, materials, geometry and user
+        defined properties for the selected number of frames and save
+        the output parameters in the selected output format.
+
+        Every frame is visited once: all panels are randomised once per
+        frame, as done by the per-frame handler, and all selected
+        parameters are then recorded.
 
         Parameters
         ----------
@@ -141,349 +108,25 @@ class ApplySaveParams(bpy.types.Operator):
 
         ### ALL
         if bpy.data.scenes["Scene"].seed_properties.seed_toggle:  # = True
-            seed(bpy.data.scenes["Scene"].seed_properties.seed)
+            rng.reseed(bpy.data.scenes["Scene"].seed_properties.seed)
         tot_frame_no = bpy.context.scene.rand_all_properties.tot_frame_no
 
-        ### TRANSFORMS
-        bpy.data.scenes["Scene"].frame_current = 0
-
-        (
-            loc,
-            loc_x_range,
-            loc_y_range,
-            loc_z_range,
-            rot,
-            rot_x_range,
-            rot_y_range,
-            rot_z_range,
-            delta_on,
-            rand_posx,
-            rand_posy,
-            rand_posz,
-            rand_rotx,
-            rand_roty,
-            rand_rotz,
-        ) = get_transform_inputs(context)
-
-        x_pos_vals = []
-        y_pos_vals = []
-        z_pos_vals = []
-
-        x_rot_vals = []
-        y_rot_vals = []
-        z_rot_vals = []
-
-        if bpy.context.scene.randomise_camera_props.bool_delta:
-            loc_value_str = "delta_location"
-            value_str = "delta_rotation_euler"
-        else:
-            loc_value_str = "location"
-            value_str = "rotation_euler"
-
-        rad2deg = 180 / np.pi
-        if rand_posx:
-            print("bool on")
-        all_transform_dict = {}
-        tmp_values_loc = {}
-        tmp_values_rot = {}
-        for idx in range(tot_frame_no):
-            bpy.app.handlers.frame_change_pre[0]("dummy")
-            bpy.data.scenes["Scene"].frame_current = idx
-
-            if rand_posx:
-                x_pos_vals.append(
-                    getattr(bpy.context.scene.camera, loc_value_str)[0]
-                )
-                tmp_values_loc["x_pos_vals"] = x_pos_vals
-
-            if rand_posy:
-                y_pos_vals.append(
-                    getattr(bpy.context.scene.camera, loc_value_str)[1]
-                )
-                tmp_values_loc["y_pos_vals"] = y_pos_vals
-
-            if rand_posz:
-                z_pos_vals.append(
-                    getattr(bpy.context.scene.camera, loc_value_str)[2]
-                )
-                tmp_values_loc["z_pos_vals"] = z_pos_vals
-
-            if rand_rotx:
-                x_rot_vals.append(
-                    getattr(bpy.context.scene.camera, value_str)[0] * rad2deg
-                )
-                tmp_values_rot["x_rot_vals"] = x_rot_vals
-
-            if rand_roty:
-                y_rot_vals.append(
-                    getattr(bpy.context.scene.camera, value_str)[1] * rad2deg
-                )
-                tmp_values_rot["y_rot_vals"] = y_rot_vals
-
-            if rand_rotz:
-                z_rot_vals.append(
-                    getattr(bpy.context.scene.camera, value_str)[2] * rad2deg
-                )
-                tmp_values_rot["z_rot_vals"] = z_rot_vals
-
-        if tmp_values_loc:
-            all_transform_dict[loc_value_str] = tmp_values_loc
-
-        if tmp_values_rot:
-            all_transform_dict[value_str] = tmp_values_rot
-
-        ### GEOMETRY
-        bpy.data.scenes["Scene"].frame_current = 0
-
-        all_geom_dict = {}
-        cs = bpy.context.scene
-        for gng_idx in range(len(cs.socket_props_per_gng.collection)):
-            # get this subpanel's GNG
-            subpanel_gng = cs.socket_props_per_gng.collection[gng_idx]
-            tmp_GNG = subpanel_gng.name
-
-            sockets_props_collection = cs.socket_props_per_gng.collection[
-                subpanel_gng.name
-            ].collection
-
-            list_parent_nodes_str = [
-                sckt.name.split("_")[0] for sckt in sockets_props_collection
-            ]
-            list_input_nodes = [
-                bpy.data.node_groups[subpanel_gng.name].nodes[nd_str]
-                for nd_str in list_parent_nodes_str
-            ]
-
-            list_input_nodes_sorted = sorted(
-                list_input_nodes, key=lambda x: x.name
-            )
-            for i_n, nd in enumerate(list_input_nodes_sorted):
-                # add sockets for this node in the subseq rows
-                for sckt in nd.outputs:
-                    tmp_values = []
-                    for idx in range(tot_frame_no):
-                        bpy.app.handlers.frame_change_pre[0]("dummy")
-                        bpy.data.scenes["Scene"].frame_current = idx
-                        bpy.ops.node.randomise_all_geometry_sockets(
-                            "INVOKE_DEFAULT"
-                        )  # issue
-                        # w/ this being called so often -
-                        # might need moved to diff for loop?
-                        tmp_values.append(
-                            getattr(
-                                sckt,
-                                "default_value",
-                            )
-                        )
-
-                    tmp_sck = nd.name
-                    GNG_sck_values_str = tmp_GNG + tmp_sck
-                    GNG_sck_values_str = "Values " + GNG_sck_values_str
-                    all_geom_dict[GNG_sck_values_str] = tmp_values
-
-        ### MATERIALS
-        bpy.data.scenes["Scene"].frame_current = 0
-        all_mat_dict = {}
-        cs = bpy.context.scene
-        for mat_idx in range(len(cs.socket_props_per_material.collection)):
-            # get this subpanel's GNG
-            subpanel_material = cs.socket_props_per_material.collection[
-                mat_idx
-            ]
-            tmp_mat = subpanel_material.name
-
-            list_input_nodes = (
-                nodes2rand.get_material_nodes_to_randomise_indep(
-                    subpanel_material.name
-                )
-            )
-
-            list_nodes2rand_in_groups = (
-                nodes2rand.get_material_nodes_to_randomise_group(
-                    subpanel_material.name
-                )
-            )
+        rand_all_props = context.scene.rand_all_properties
+        if rand_all_props.output_format != param_log.JSON:
+            try:
+                save_params_streaming(context, tot_frame_no)
+            except ValueError as e:
+                self.report({"ERROR"}, str(e))
+                return {"CANCELLED"}
+            return {"FINISHED"}
 
-            list_input_nodes_all = (
-                nodes2rand.get_material_nodes_to_randomise_all(
-                    subpanel_material.name
-                )
-            )
-
-            list_input_nodes_sorted = sorted(
-                list_input_nodes_all, key=lambda x: x.name
-            )
-            for i_n, nd in enumerate(list_input_nodes_sorted):
-                # add sockets for this node in the subseq rows
-                for sckt in nd.outputs:
-                    test_attr = getattr(
-                        sckt,
-                        "default_value",
-                    )
-
-                    if "NodeSocketColor" not in str(test_attr):
-                        tmp_values = []
-                        for idx in range(tot_frame_no):
-                            bpy.app.handlers.frame_change_pre[0]("dummy")
-                            bpy.data.scenes["Scene"].frame_current = idx
-                            bpy.ops.node.randomise_all_material_sockets(
-                                "INVOKE_DEFAULT"
-                            )  # issue
-                            # w/ this being called so often -
-                            # might need moved to diff for loop?
-
-                            tmp_values.append(
-                                getattr(
-                                    sckt,
-                                    "default_value",
-                                )
-                            )
-
-                        tmp_sck = nd.name
-                        if (
-                            list_input_nodes_sorted[i_n]
-                            in list_nodes2rand_in_groups
-                        ):
-                            for ng in bpy.data.node_groups:
-                                MAT_sck_values_str = (
-                                    tmp_mat + ng.name + tmp_sck
-                                )
-
-                        else:
-                            MAT_sck_values_str = tmp_mat + tmp_sck
-
-                        MAT_sck_values_str = "Values " + MAT_sck_values_str
-                        all_mat_dict[MAT_sck_values_str] = tmp_values
-
-        ### UD props
-        bpy.data.scenes["Scene"].frame_current = 0
-
-        all_UD_props_dict = {}
-        cs = bpy.context.scene
-
-        list_subpanel_UD_props_names = [
-            UD.name for UD in cs.socket_props_per_UD.collection
-        ]
-        # for every UD prop: save name of UD prop
-        sockets_to_randomise_per_UD = []
-        for UD_str in list_subpanel_UD_props_names:
-            sckt = cs.socket_props_per_UD.collection[UD_str].name
-            if cs.socket_props_per_UD.collection[UD_str].bool_randomise:
-                sockets_to_randomise_per_UD.append(sckt)
-
-        for UD_str in sockets_to_randomise_per_UD:
-            # get collection of socket properties for this UD prop
-            # NOTE: socket properties do not include the actual socket object
-            sockets_props_collection = cs.socket_props_per_UD.collection[
-                UD_str
-            ]
-            # for UD_idx in range(len(sockets_to_randomise_per_UD)):
-            #     # get this subpanel's GNG
-            #     subpanel_UD = cs.socket_props_per_UD.collection[UD_idx]
-            #     tmp_GNG = subpanel_UD.name
-
-            #     sockets_props_collection = cs.socket_props_per_UD.collection[
-            #         subpanel_UD.name
-            #     ]
-
-            full_str = sockets_props_collection.name
-            attribute_only_str = get_attr_only_str(full_str)
-
-            list_all_UD_props = []
-            list_all_attr_str = []
-
-            objects_in_scene = []
-            for key in bpy.data.objects:
-                objects_in_scene.append(key.name)
-
-            if "[" in full_str:
-                obj_str = get_obj_str(full_str)
-
-                for i, obj in enumerate(objects_in_scene):
-                    if obj in obj_str:
-                        current_obj = obj
-                        idx = i
-
-                if "Camera" in current_obj:
-                    if (
-                        attr_get_type(
-                            bpy.data.cameras[idx],
-                            get_attr_only_str(full_str),
-                        )[1]
-                        != "dummy"
-                    ):
-                        list_all_UD_props.append(full_str)
-                        list_all_attr_str.append(attribute_only_str)
-
-                else:
-                    if (
-                        attr_get_type(
-                            bpy.data.objects[idx],
-                            get_attr_only_str(full_str),
-                        )[1]
-                        != "dummy"
-                    ):
-                        list_all_UD_props.append(full_str)
-                        list_all_attr_str.append(attribute_only_str)
-
-            elif (
-                attr_get_type(bpy.context.scene, get_attr_only_str(full_str))[
-                    1
-                ]
-                != "dummy"
-            ):
-                list_all_UD_props.append(full_str)
-                list_all_attr_str.append(attribute_only_str)
-
-            list_UD_props_sorted = list_all_UD_props
-            for i_n, nd in enumerate(list_UD_props_sorted):
-                tmp_values = []
-                for frm in range(tot_frame_no):
-                    bpy.app.handlers.frame_change_pre[0]("dummy")
-                    bpy.data.scenes["Scene"].frame_current = frm
-                    bpy.ops.node.randomise_all_ud_sockets("INVOKE_DEFAULT")
-
-                    if "[" in nd:
-                        if "Camera" in nd:
-                            tmp_values.append(
-                                attr_get_type(
-                                    bpy.data.cameras[idx],
-                                    list_all_attr_str[i_n],
-                                )[1]
-                            )
-
-                        else:
-                            tmp_values.append(
-                                attr_get_type(
-                                    bpy.data.objects[idx],
-                                    list_all_attr_str[i_n],
-                                )[1]
-                            )
-
-                    elif "bpy.context.scene" in nd:
-                        tmp_values.append(
-                            attr_get_type(
-                                bpy.context.scene,
-                                list_all_attr_str[i_n],
-                            )[1]
-                        )
-
-                    all_UD_props_dict[nd] = tmp_values
-
-        data = {
-            # "location_str": loc_value_str,
-            # "loc_x": x_pos_vals,
-            # "loc_y": y_pos_vals,
-            # "loc_z": z_pos_vals,
-            # "rotation_str": value_str,
-            # "rot_x": x_rot_vals,
-            # "rot_y": y_rot_vals,
-            # "rot_z": z_rot_vals,
-            "camera_transforms": all_transform_dict,
-            "geometry": all_geom_dict,
-            "materials": all_mat_dict,
-            "user_defined_props": all_UD_props_dict,
-        }
+        data = sampling.sample_frames(
+            context,
+            tot_frame_no,
+            randomise_frame_fn=lambda: plan.randomise_enabled_sections(
+                context
+            ),
+        )
 
         ct = datetime.datetime.now()
         ts = ct.timestamp()
@@ -506,10 +149,252 @@ class ApplySaveParams(bpy.types.Operator):
         return {"FINISHED"}
 
 
+def save_params_streaming(context, tot_frame_no):
+    """Randomise and save the parameters frame by frame
+
+    Each frame is written to the output as soon as it is produced
+    (JSONL and memory-mapped store) or in chunks of frames (NPZ), so
+    memory use does not grow with the number of frames. In per-frame
+    RNG mode, if the output path already holds a log, the frames already
+    in it are skipped.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    tot_frame_no : int
+        number of frames to sample, starting from frame 0
+
+    Raises
+    ------
+    ValueError
+        if the existing log cannot be resumed with the parameters of
+        the current run (checked before sampling any frame)
+    """
+    rand_all_props = context.scene.rand_all_properties
+    output_format = rand_all_props.output_format
+
+    # output path
+    if rand_all_props.output_path:
+        path_to_file = bpy.path.abspath(rand_all_props.output_path)
+    else:
+        ts_str = str(datetime.datetime.now().timestamp())
+        path_to_file = "output_randomisations_per_frame" + ts_str
+        if output_format == param_log.JSONL:
+            path_to_file = path_to_file + ".jsonl"
+        elif output_format == param_log.STORE:
+            path_to_file = path_to_file + ".npy"
+
+    # only in per-frame RNG mode the values at a frame do not depend
+    # on the frames sampled before, so a partial run can be resumed
+    resume = context.scene.seed_properties.rng_mode == rng.FRAME
+
+    list_targets = sampling.get_targets_to_record(context)
+    list_param_ids = [target.param_id for target in list_targets]
+    if output_format == param_log.JSONL:
+        writer = param_log.JSONLParamWriter(
+            path_to_file, list_param_ids, resume=resume
+        )
+    elif output_format == param_log.STORE:
+        writer = param_store.ParamStoreWriter(
+            path_to_file,
+            list_param_ids,
+            [target.n_dims for target in list_targets],
+            [target.kind for target in list_targets],
+            tot_frame_no,
+            resume=resume,
+        )
+    else:
+        writer = param_log.NPZParamWriter(
+            path_to_file,
+            list_param_ids,
+            [target.n_dims for target in list_targets],
+            chunk_size=rand_all_props.chunk_size,
+            resume=resume,
+        )
+
+    first_frame = 0 if writer.last_frame is None else writer.last_frame + 1
+    if first_frame > 0:
+        print("Resuming from frame ", first_frame)
+
+    with writer:
+        for frame, list_values in sampling.iter_frames(
+            context,
+            list_targets,
+            range(first_frame, tot_frame_no),
+            randomise_frame_fn=lambda: plan.randomise_enabled_sections(
+                context
+            ),
+        ):
+            writer.write_frame(frame, list_values)
+
+    print("Outputs parameters saved to: ", path_to_file)
+    print("Total number of frames saved = ", tot_frame_no)
+
+
+# -------------------------------
+class ApplyReplayParams(bpy.types.Operator):
+    # docstring shows as a tooltip for menu items and buttons.
+    """Set the parameters at the current frame from a parameter log
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "camera.replay_param_log"  # appended to bpy.ops.
+    bl_label = "Replay parameters from log"
+
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        # check the context here
+        return bool(context.scene.rand_all_properties.replay_path)
+
+    def execute(self, context):
+        """Execute the replay operator
+
+        Set the parameters of all the panels enabled in the randomise
+        all panel to their values at the current frame in the replay
+        log. No random numbers are drawn.
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        _type_
+            _description_
+        """
+        path_to_file = bpy.path.abspath(
+            context.scene.rand_all_properties.replay_path
+        )
+        frame = context.scene.frame_current
+        try:
+            n_set = replay.replay_enabled_sections(
+                context, path_to_file, frame
+            )
+        except (OSError, KeyError, ValueError) as e:
+            self.report(
+                {"ERROR"}, f"Cannot replay frame {frame} from log: {e}"
+            )
+            return {"CANCELLED"}
+
+        print(f"Frame {frame} replayed ({n_set} parameters set)")
+
+        return {"FINISHED"}
+
+
+# -------------------------------
+class ApplyBakeParams(bpy.types.Operator):
+    # docstring shows as a tooltip for menu items and buttons.
+    """Key the randomised parameters at every frame, so that
+    the animation can be rendered without the per-frame handler
+
+    Parameters
+    ----------
+    bpy : _type_
+        _description_
+
+    Returns
+    -------
+    _type_
+        _description_
+    """
+
+    bl_idname = "camera.bake_param_keyframes"  # appended to bpy.ops.
+    bl_label = "Bake randomised parameters to keyframes"
+
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        # check the context here
+        return context.object is not None
+
+    def execute(self, context):
+        """Execute the bake operator
+
+        Sample the parameters of all the panels enabled in the randomise
+        all panel for the selected number of frames, and key them with
+        constant interpolation. The per-frame randomisation is turned
+        off, since it would overwrite the baked values. Parameters that
+        cannot be baked are reported, and so is baking in sequential
+        RNG mode, whose values differ from those drawn at every frame.
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        _type_
+            _description_
+        """
+        rand_all_props = context.scene.rand_all_properties
+        tot_frame_no = rand_all_props.tot_frame_no
+        n_fcurves, list_skipped = bake.bake_enabled_sections(
+            context, tot_frame_no
+        )
+        rand_all_props.bool_randomise_per_frame = False
+
+        print(f"{tot_frame_no} frames baked to {n_fcurves} F-curves")
+        print("Randomisation at every frame turned off")
+
+        if list_skipped:
+            self.report(
+                {"WARNING"},
+                "Rotation components of objects in quaternion or axis "
+                f"angle mode not baked: {', '.join(list_skipped)}",
+            )
+        if context.scene.seed_properties.rng_mode == rng.SEQUENTIAL:
+            self.report(
+                {"WARNING"},
+                "Baked in sequential RNG mode: the values differ from "
+                "those drawn at every frame with the same seed "
+                "(use per-frame RNG mode to match them)",
+            )
+
+        return {"FINISHED"}
+
+
+# -------------------------------
+# Per-frame handler
+# -------------------------------
+# NOTE: this is the only handler randomising the panels at every frame.
+# It applies the cached randomisation plan, rather than running
+# the panels' operators.
+# Without the persistent decorator, the function is removed
+# from the handlers' list after it is first executed
 @persistent
 def randomise_all_per_frame(dummy):
-    bpy.ops.camera.randomise_all("INVOKE_DEFAULT")
-
+    rand_all_props = bpy.context.scene.rand_all_properties
+    if rand_all_props.bool_replay and rand_all_props.replay_path:
+        # set the parameters from the log rather than drawing them
+        frame = bpy.context.scene.frame_current
+        try:
+            replay.replay_enabled_sections(
+                bpy.context,
+                bpy.path.abspath(rand_all_props.replay_path),
+                frame,
+            )
+        except KeyError:
+            print(f"Frame {frame} not in replay log, parameters unchanged")
+        except (OSError, ValueError) as e:
+            # e.g. a moved or malformed log: report it and keep playing
+            print(f"Cannot replay frame {frame} from log: {e}")
+    elif rand_all_props.bool_randomise_per_frame:
+        plan.randomise_enabled_sections(bpy.context)
     return
 
 
@@ -519,6 +404,8 @@ def randomise_all_per_frame(dummy):
 list_classes_to_register = [
     ApplyRandomAll,
     ApplySaveParams,
+    ApplyReplayParams,
+    ApplyBakeParams,
 ]
 
 
@@ -0,0 +1,191 @@
+import numpy as np
+
+from ..utils import rng
+from .sampling import get_targets_to_record, nest_values
+
+
+# -------------------------------
+# Table of parameters
+# -------------------------------
+class ParamTable:
+    """Table of randomised parameter values, with one row per frame
+
+    The table is generated without modifying the Blender scene. Its rows
+    can be applied to the scene lazily, one frame at a time.
+
+    Parameters
+    ----------
+    list_targets : list
+        list of ParamTarget objects, one per parameter
+    values : numpy.ndarray
+        array of shape (number of frames, number of columns); a parameter
+        with n components spans n consecutive columns
+    frame_start : int, optional
+        frame number of the first row, by default 0
+    """
+
+    def __init__(self, list_targets, values, frame_start=0):
+        self.list_targets = list_targets
+        self.values = values
+        self.frame_start = frame_start
+
+        # slice of columns per target
+        self.list_slices = []
+        col = 0
+        for target in list_targets:
+            self.list_slices.append(slice(col, col + target.n_dims))
+            col += target.n_dims
+
+    @property
+    def n_frames(self):
+        """Number of frames in the table"""
+        return self.values.shape[0]
+
+    def get_frame(self, frame):
+        """Get the values of all parameters at one frame
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+
+        Returns
+        -------
+        list
+            value of each parameter, in the same order as list_targets
+            (scalars for parameters with one component, lists otherwise)
+        """
+        row = self.values[frame - self.frame_start]
+        return [
+            row[slc].item() if target.n_dims == 1 else row[slc].tolist()
+            for target, slc in zip(self.list_targets, self.list_slices)
+        ]
+
+    def apply_frame(self, frame):
+        """Set the parameters in the scene to their values at one frame
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+        """
+        for target, value in zip(self.list_targets, self.get_frame(frame)):
+            target.set_value(value)
+
+    def to_dict(self):
+        """Get the table as a dictionary of parameter values per frame
+
+        Returns
+        -------
+        dict
+            dictionary with the same layout as the output .json file
+        """
+        list_values_per_target = []
+        for target, slc in zip(self.list_targets, self.list_slices):
+            col_values = self.values[:, slc]
+            if target.n_dims == 1:
+                list_values_per_target.append(col_values[:, 0].tolist())
+            else:
+                list_values_per_target.append(col_values.tolist())
+
+        return nest_values(self.list_targets, list_values_per_target)
+
+
+# -------------------------------
+# Table generation
+# -------------------------------
+def get_scene_generator(context):
+    """Get a NumPy generator seeded as set in the seed panel
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    numpy.random.Generator
+        generator seeded with the scene seed if the seed toggle is on,
+        unseeded otherwise
+    """
+    seed_props = context.scene.seed_properties
+    return rng.get_generator(
+        seed_props.seed if seed_props.seed_toggle else None
+    )
+
+
+def build_param_table(context, tot_frame_no, generator=None, frame_start=0):
+    """Sample the selected parameters for a number of frames
+
+    The min/max bounds of all the parameters selected for randomisation
+    are read from the panels' properties. No value is written to the scene.
+
+    In SEQUENTIAL mode, parameters are grouped in blocks per section and
+    kind, and each block is drawn with a single call to the generator.
+    In FRAME mode, each parameter is drawn from its own streams for the
+    scene seed and each frame, so that the table for a range of frames
+    holds the same values as the corresponding rows of a longer table.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    tot_frame_no : int
+        number of frames (rows) to sample
+    generator : numpy.random.Generator, optional
+        random number generator used in SEQUENTIAL mode, by default
+        the one returned by get_scene_generator
+    frame_start : int, optional
+        frame number of the first row, by default 0
+
+    Returns
+    -------
+    ParamTable
+        table of parameter values
+    """
+    list_targets = get_targets_to_record(context)
+    table = ParamTable(
+        list_targets,
+        np.empty(
+            (tot_frame_no, sum(t.n_dims for t in list_targets)),
+            dtype=float,
+        ),
+        frame_start=frame_start,
+    )
+
+    seed_props = context.scene.seed_properties
+    if seed_props.rng_mode == rng.FRAME:
+        frames = range(frame_start, frame_start + tot_frame_no)
+        for target, slc in zip(list_targets, table.list_slices):
+            table.values[:, slc] = rng.draw_at_frames(
+                rng.get_param_key(seed_props.seed, target.param_id),
+                target.kind,
+                target.min_val,
+                target.max_val,
+                frames,
+            )
+        return table
+
+    if generator is None:
+        generator = get_scene_generator(context)
+
+    # group the columns of the table in blocks per section and kind
+    blocks = {}
+    for target, slc in zip(list_targets, table.list_slices):
+        blocks.setdefault((target.section, target.kind), []).append(
+            (target, slc)
+        )
+
+    for (_, kind), list_target_slc in blocks.items():
+        cols = np.concatenate(
+            [np.arange(slc.start, slc.stop) for _, slc in list_target_slc]
+        )
+        table.values[:, cols] = rng.draw_block(
+            generator,
+            kind,
+            np.concatenate([t.min_val for t, _ in list_target_slc]),
+            np.concatenate([t.max_val for t, _ in list_target_slc]),
+            tot_frame_no,
+        )
+
+    return table
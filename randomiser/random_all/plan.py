@@ -0,0 +1,259 @@
+import numpy as np
+
+from ..mesh.operators import randomise_meshes
+from ..utils import change_tracking, rng
+from .sampling import (
+    get_geometry_targets,
+    get_material_targets,
+    get_transform_targets,
+    get_UD_targets,
+    sync_collections,
+)
+
+# Functions to get the parameters to randomise, per section.
+# Sections are randomised in this order
+MAP_SECTION_TO_TARGETS_FN = {
+    "camera_transforms": get_transform_targets,
+    "materials": get_material_targets,
+    "geometry": get_geometry_targets,
+    "user_defined_props": get_UD_targets,
+}
+
+# Toggles in the randomise all properties that enable each section
+MAP_SECTION_TO_TOGGLE = {
+    "camera_transforms": "bool_rand_camera_transforms",
+    "materials": "bool_rand_materials",
+    "geometry": "bool_rand_geometry",
+    "user_defined_props": "bool_rand_UD",
+}
+
+
+# -------------------------------
+# Randomisation plan
+# -------------------------------
+def set_block_values(list_targets, values, cols):
+    """Set the values of a block of parameters
+
+    If the parameters have a setter for their type (e.g. user-defined
+    properties), the whole block is set with a single call to it.
+    Otherwise each parameter is set on its own.
+
+    Parameters
+    ----------
+    list_targets : list
+        parameters in the block, all of the same kind and setter
+    values : numpy.ndarray
+        values of all the components of the parameters in the block
+    cols : numpy.ndarray
+        start of each parameter's components in values, followed by
+        the total number of components
+    """
+    setter = list_targets[0].setter
+    if setter is not None:
+        setter(list_targets, values)
+    else:
+        for target, start, end in zip(list_targets, cols[:-1], cols[1:]):
+            target.set_value(values[start:end])
+
+
+class RandomisationPlan:
+    """Precompiled list of the parameters to randomise per section
+
+    The plan holds the resolved Blender data to modify and the min/max
+    bounds of every parameter, grouped in blocks of the same kind. Once
+    built, randomising a section only requires one call to the generator
+    per block and setting the values. Parameters are grouped by kind and
+    by setter, so that blocks of user-defined properties of the same
+    type are also set at once.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    """
+
+    def __init__(self, context):
+        self.scene_name = context.scene.name
+        self.version = change_tracking.get_version()
+
+        # Philox keys per (seed, parameter), computed when first needed
+        self.param_keys = {}
+
+        self.blocks_per_section = {}
+        for section, get_targets in MAP_SECTION_TO_TARGETS_FN.items():
+            blocks = {}
+            for target in get_targets(context):
+                blocks.setdefault((target.kind, target.setter), []).append(
+                    target
+                )
+
+            self.blocks_per_section[section] = [
+                (
+                    kind,
+                    list_targets,
+                    np.concatenate([t.min_val for t in list_targets]),
+                    np.concatenate([t.max_val for t in list_targets]),
+                    np.cumsum([0] + [t.n_dims for t in list_targets]),
+                )
+                for (kind, _), list_targets in blocks.items()
+            ]
+
+    def is_valid(self, context):
+        """Check if the plan is up to date with the scene
+
+        Parameters
+        ----------
+        context : _type_
+            _description_
+
+        Returns
+        -------
+        bool
+            False if the tracked data changed since the plan was built
+        """
+        return (self.scene_name == context.scene.name) and (
+            self.version == change_tracking.get_version()
+        )
+
+    def randomise(self, section, generator):
+        """Randomise once the parameters of a section
+
+        Parameters
+        ----------
+        section : str
+            section to randomise (one of the keys in
+            MAP_SECTION_TO_TARGETS_FN)
+        generator : numpy.random.Generator
+            random number generator
+        """
+        for (
+            kind,
+            list_targets,
+            min_val,
+            max_val,
+            cols,
+        ) in self.blocks_per_section[section]:
+            row = rng.draw_block(generator, kind, min_val, max_val, 1)[0]
+            set_block_values(list_targets, row, cols)
+
+    def get_param_key(self, seed, target):
+        """Get the Philox key of a parameter, caching it in the plan
+
+        Parameters
+        ----------
+        seed : int
+            seed set by the user
+        target : ParamTarget
+            parameter
+
+        Returns
+        -------
+        numpy.ndarray
+            Philox key of the parameter
+        """
+        if (seed, target.param_id) not in self.param_keys:
+            self.param_keys[(seed, target.param_id)] = rng.get_param_key(
+                seed, target.param_id
+            )
+        return self.param_keys[(seed, target.param_id)]
+
+    def randomise_frame(self, section, seed, frame):
+        """Randomise the parameters of a section with the values
+        for one frame
+
+        Each parameter is drawn from its own stream, which only depends
+        on the seed, the frame and the parameter. The values at a frame
+        are therefore the same regardless of the frames visited before.
+
+        Parameters
+        ----------
+        section : str
+            section to randomise (one of the keys in
+            MAP_SECTION_TO_TARGETS_FN)
+        seed : int
+            seed set by the user
+        frame : int
+            frame number
+        """
+        for kind, list_targets, _, _, cols in self.blocks_per_section[section]:
+            row = np.concatenate(
+                [
+                    rng.draw_at_frames(
+                        self.get_param_key(seed, target),
+                        kind,
+                        target.min_val,
+                        target.max_val,
+                        [frame],
+                    )[0]
+                    for target in list_targets
+                ]
+            )
+            set_block_values(list_targets, row, cols)
+
+
+# plan cached across frames
+_plan = None
+
+
+def get_plan(context):
+    """Get the randomisation plan, rebuilding it only if the tracked
+    data changed since it was last built
+
+    The collections are synchronised before rebuilding the plan, so that
+    building it does not modify them.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    RandomisationPlan
+        plan for the current scene
+    """
+    global _plan
+    if (_plan is None) or (not _plan.is_valid(context)):
+        # synchronise the collections before resolving the parameters
+        sync_collections(context)
+        _plan = RandomisationPlan(context)
+
+    return _plan
+
+
+def randomise_enabled_sections(context):
+    """Randomise once every enabled section, in a fixed order
+
+    In SEQUENTIAL mode, the seed is set if it is toggled on and has
+    changed, and the parameters are sampled with the sequential
+    generator. In FRAME mode, the parameters are sampled from the
+    streams for the scene seed and the current frame. Each enabled
+    section is randomised exactly once, in the order of
+    MAP_SECTION_TO_TARGETS_FN. If enabled, the mesh noise is added
+    last (it is not part of the plan, since its values are not recorded).
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    """
+    seed_props = context.scene.seed_properties
+    if seed_props.rng_mode == rng.SEQUENTIAL:
+        rng.reseed_if_changed(seed_props)
+
+    rand_all_props = context.scene.rand_all_properties
+    randomisation_plan = get_plan(context)
+    generator = rng.get_sequential_generator()
+    for section in MAP_SECTION_TO_TARGETS_FN:
+        if not getattr(rand_all_props, MAP_SECTION_TO_TOGGLE[section]):
+            continue
+
+        if seed_props.rng_mode == rng.FRAME:
+            randomisation_plan.randomise_frame(
+                section, seed_props.seed, context.scene.frame_current
+            )
+        else:
+            randomisation_plan.randomise(section, generator)
+
+    if rand_all_props.bool_rand_mesh:
+        randomise_meshes(context)
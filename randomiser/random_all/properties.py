@@ -1,5 +1,7 @@
 import bpy
 
+from ..utils import param_log
+
 
 # ---------------------------
 # Properties
@@ -15,6 +17,115 @@ class PropertiesRandomAll(bpy.types.PropertyGroup):
     )
     tot_frame_no: tot_frame_no_prop  # type: ignore
 
+    # ---------------------
+    # output parameters
+    output_format_prop = bpy.props.EnumProperty(
+        name="Output format",
+        items=(
+            (
+                param_log.JSON,
+                "JSON",
+                "Single .json file, written after the last frame",
+            ),
+            (
+                param_log.JSONL,
+                "JSON Lines",
+                "One line per frame, written as frames are produced",
+            ),
+            (
+                param_log.NPZ,
+                "NumPy chunks",
+                "Directory of columnar .npz chunks of frames",
+            ),
+            (
+                param_log.STORE,
+                "Memory-mapped store",
+                "Binary .npy store with one row per frame",
+            ),
+        ),
+        default=param_log.JSON,
+    )
+    output_format: output_format_prop  # type: ignore
+
+    output_path_prop = bpy.props.StringProperty(
+        name="Output path",
+        description=(
+            "Path to the output file or directory. If empty, a timestamped "
+            "name is used. Partial runs are resumed if the RNG mode is "
+            "per frame"
+        ),
+        default="",
+        subtype="FILE_PATH",
+    )
+    output_path: output_path_prop  # type: ignore
+
+    chunk_size_prop = bpy.props.IntProperty(
+        name="Frames per chunk", default=1000, min=1
+    )
+    chunk_size: chunk_size_prop  # type: ignore
+
+    # ---------------------
+    # replay from a parameter log
+    replay_path_prop = bpy.props.StringProperty(
+        name="Replay log",
+        description=(
+            "Path to a parameter log (.json, .jsonl, .npy store or "
+            "directory of .npz chunks) to set the parameters from"
+        ),
+        default="",
+        subtype="FILE_PATH",
+    )
+    replay_path: replay_path_prop  # type: ignore
+
+    bool_replay_prop = bpy.props.BoolProperty(
+        name="Replay log at every frame",
+        description=(
+            "Set the parameters at every frame from the replay log, "
+            "instead of randomising them"
+        ),
+        default=False,
+    )
+    bool_replay: bool_replay_prop  # type: ignore
+
+    # ---------------------
+    # per-frame randomisation toggles
+    bool_randomise_per_frame_prop = bpy.props.BoolProperty(
+        name="Randomise at every frame", default=True
+    )
+    bool_randomise_per_frame: bool_randomise_per_frame_prop  # type: ignore
+
+    bool_rand_camera_transforms_prop = bpy.props.BoolProperty(
+        name="Camera transforms", default=True
+    )
+    bool_rand_camera_transforms: (  # type: ignore
+        bool_rand_camera_transforms_prop
+    )
+
+    bool_rand_materials_prop = bpy.props.BoolProperty(
+        name="Materials", default=True
+    )
+    bool_rand_materials: bool_rand_materials_prop  # type: ignore
+
+    bool_rand_geometry_prop = bpy.props.BoolProperty(
+        name="Geometry", default=True
+    )
+    bool_rand_geometry: bool_rand_geometry_prop  # type: ignore
+
+    bool_rand_UD_prop = bpy.props.BoolProperty(
+        name="User defined properties", default=True
+    )
+    bool_rand_UD: bool_rand_UD_prop  # type: ignore
+
+    bool_rand_mesh_prop = bpy.props.BoolProperty(
+        name="Mesh noise",
+        description=(
+            "Add noise to the meshes set in the mesh panel. The noise "
+            "is not saved in the output parameters"
+        ),
+        default=False,
+    )
+    bool_rand_mesh: bool_rand_mesh_prop  # type: ignore
+
 
 # ------------------------------------
 # Register / unregister classes
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from ..utils import param_log
+from . import plan
+
+# reader of the last log replayed, with its path and modification time
+_reader = None
+_reader_id = None
+
+
+def get_log_reader(path):
+    """Get a reader for a parameter log, reopening it only if the path
+    or the log's modification time changed
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the log (.json, .jsonl, .npy store or directory of
+        .npz chunks)
+
+    Returns
+    -------
+    _type_
+        reader with a get_frame(frame) method
+    """
+    global _reader, _reader_id
+    path = Path(path)
+    reader_id = (str(path.resolve()), path.stat().st_mtime_ns)
+    if (_reader is None) or (_reader_id != reader_id):
+        _reader = param_log.open_param_log(path)
+        _reader_id = reader_id
+        print("Parameter log opened for replay: ", path)
+
+    return _reader
+
+
+def replay_enabled_sections(context, path, frame):
+    """Set the parameters of every enabled section to their values
+    at one frame in a parameter log
+
+    No random numbers are drawn. Parameters are matched to the log by
+    their identifier, so the log may be in any of the output formats.
+    Parameters selected for randomisation but missing from the log
+    are left unchanged.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    path : str or pathlib.Path
+        path to the log
+    frame : int
+        frame number
+
+    Returns
+    -------
+    int
+        number of parameters set
+    """
+    frame_values = get_log_reader(path).get_frame(frame)
+
+    rand_all_props = context.scene.rand_all_properties
+    randomisation_plan = plan.get_plan(context)
+    n_set = 0
+    for section in plan.MAP_SECTION_TO_TARGETS_FN:
+        if not getattr(rand_all_props, plan.MAP_SECTION_TO_TOGGLE[section]):
+            continue
+
+        for _, list_targets, *_ in randomisation_plan.blocks_per_section[
+            section
+        ]:
+            for target in list_targets:
+                if target.param_id in frame_values:
+                    target.set_value(frame_values[target.param_id])
+                    n_set += 1
+
+    return n_set
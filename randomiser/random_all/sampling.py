@@ -0,0 +1,734 @@
+import bpy
+import numpy as np
+
+from ..transform.operators import (
+    get_transform_attrs,
+    get_transform_bounds,
+    get_transform_inputs,
+    get_transform_objects,
+    set_transform_targets,
+)
+from ..transform.properties import CAMERA
+from ..utils import (
+    modifier_inputs,
+    object_attributes,
+    rng,
+    socket_ids,
+    ud_paths,
+    ud_setters,
+)
+from ..utils.list_props_to_randomise import (
+    geom_list_to_rand,
+    mat_list_to_rand,
+)
+
+# Top-level keys of the dictionary of output parameters
+SECTIONS = (
+    "camera_transforms",
+    "geometry",
+    "materials",
+    "user_defined_props",
+)
+
+
+# -------------------------------
+# Parameters to record
+# -------------------------------
+class ParamTarget:
+    """A randomised parameter whose value is recorded at every frame
+
+    Parameters
+    ----------
+    section : str
+        top-level key of the output dictionary the parameter is saved
+        under (one of SECTIONS)
+    keys : tuple
+        keys of the parameter inside its section
+    owner : _type_
+        Blender data holding the parameter (e.g. a socket or an object)
+    attr : str
+        name of the owner's attribute holding the parameter, or path
+        of a custom property of the owner (e.g. '["Input_2"]' for an
+        input of a geometry nodes modifier)
+    index : int, optional
+        index of the component to record if the attribute is an array,
+        by default None (the full attribute is recorded)
+    scale : float, optional
+        factor applied to the value before recording it, by default None
+    kind : str, optional
+        kind of parameter, used to sample it (one of the kinds defined in
+        utils.rng), by default utils.rng.UNIFORM
+    min_val : array_like, optional
+        min value per component, in the recorded units, by default None
+    max_val : array_like, optional
+        max value per component, in the recorded units, by default None
+    setter : callable, optional
+        function setting a block of parameters of the same type at once
+        from values in the recorded units (see utils.ud_setters),
+        by default None (each parameter is set with set_value)
+    """
+
+    def __init__(
+        self,
+        section,
+        keys,
+        owner,
+        attr,
+        index=None,
+        scale=None,
+        kind=rng.UNIFORM,
+        min_val=None,
+        max_val=None,
+        setter=None,
+    ):
+        self.section = section
+        self.keys = keys
+        self.owner = owner
+        self.attr = attr
+        self.index = index
+        self.scale = scale
+        self.kind = kind
+        self.min_val = np.atleast_1d(np.asarray(min_val, dtype=float))
+        self.max_val = np.atleast_1d(np.asarray(max_val, dtype=float))
+        self.setter = setter
+
+    @property
+    def n_dims(self):
+        """Number of components of the parameter"""
+        return self.min_val.size
+
+    @property
+    def custom_key(self):
+        """Key of the parameter if it is a custom property of its owner,
+        otherwise None
+        """
+        if self.attr.startswith('["') and self.attr.endswith('"]'):
+            return self.attr[2:-2]
+        return None
+
+    @property
+    def param_id(self):
+        """Unique identifier of the parameter, made of its section
+        and keys
+        """
+        return "/".join((self.section,) + tuple(self.keys))
+
+    def get_value(self):
+        """Get the current value of the parameter as a JSON-friendly
+        Python object (a number, a boolean or a list of numbers)
+        """
+        if self.custom_key is not None:
+            value = self.owner[self.custom_key]
+        else:
+            value = getattr(self.owner, self.attr)
+        if self.index is not None:
+            value = value[self.index]
+
+        # arrays (vectors, colours, Euler angles...) are saved as lists
+        if hasattr(value, "__len__"):
+            value = list(value)
+
+        if self.scale is not None:
+            value = (np.array(value) * self.scale).tolist()
+
+        return value
+
+    def set_value(self, value):
+        """Set the parameter from a value in the recorded units
+
+        Parameters
+        ----------
+        value : float or array_like
+            value of the parameter, as returned by get_value
+        """
+        value = np.asarray(value, dtype=float)
+        if self.scale is not None:
+            value = value / self.scale
+
+        if self.kind == rng.CHOICE:
+            value = value.astype(bool)
+        elif self.kind == rng.INTEGER:
+            value = np.rint(value).astype(int)
+
+        # single components are set as Python scalars
+        value = value.item() if value.size == 1 else value.tolist()
+
+        if self.custom_key is not None:
+            self.owner[self.custom_key] = value
+        elif self.index is not None:
+            getattr(self.owner, self.attr)[self.index] = value
+        else:
+            setattr(self.owner, self.attr, value)
+
+
+def get_socket_kind(sckt):
+    """Get the kind of parameter of a node socket
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        node socket
+
+    Returns
+    -------
+    str
+        kind of parameter, as defined in utils.rng
+    """
+    if type(sckt) is bpy.types.NodeSocketBool:
+        return rng.CHOICE
+    elif type(sckt) is bpy.types.NodeSocketInt:
+        return rng.INTEGER
+    else:
+        return rng.UNIFORM
+
+
+def get_socket_key(owner_name, sckt):
+    """Compute the key under which a socket's values are saved
+
+    The key follows the pattern 'Values' + material or geometry node group
+    name + node name, with the node group name added for nodes inside a
+    group, and the socket name added for nodes with several outputs.
+
+    Parameters
+    ----------
+    owner_name : str
+        name of the material or geometry node group (GNG) the socket is
+        listed under
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    str
+        the key for this socket
+    """
+    nd = sckt.node
+    key = owner_name
+    if (nd.id_data.name in socket_ids.get_node_group_names()) and (
+        nd.id_data.name != owner_name
+    ):
+        key += nd.id_data.name
+    key += nd.name
+    if len(nd.outputs) > 1:
+        key += "_" + sckt.name
+
+    return "Values " + key
+
+
+def get_objects_transform_targets(context):
+    """Get the transforms of the objects selected for randomisation,
+    if the transform panel is set to the selected objects or to the
+    objects in a collection
+
+    The location and rotation of each object are recorded as vectors
+    of 3 components, under the object's name. The components that are
+    not randomised have their current value as min and max. All the
+    targets share a setter, so that they are set in bulk.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    min_vals, max_vals, mask = get_transform_bounds(context)
+    rad2deg = 180 / np.pi
+
+    list_targets = []
+    for obj in get_transform_objects(context):
+        for attr, cols, scale in zip(
+            get_transform_attrs(
+                context.scene.randomise_camera_props.bool_delta
+            ),
+            [slice(0, 3), slice(3, 6)],
+            [None, rad2deg],
+        ):
+            if not mask[cols].any():
+                continue
+
+            current_val = np.array(getattr(obj, attr)) * (scale or 1)
+            list_targets.append(
+                ParamTarget(
+                    "camera_transforms",
+                    (obj.name, attr),
+                    obj,
+                    attr,
+                    scale=scale,
+                    min_val=np.where(mask[cols], min_vals[cols], current_val),
+                    max_val=np.where(mask[cols], max_vals[cols], current_val),
+                    setter=set_transform_targets,
+                )
+            )
+    return list_targets
+
+
+def get_transform_targets(context):
+    """Get the camera transform components selected for randomisation
+
+    If the transform panel is set to several objects instead of the
+    camera, the targets are those of get_objects_transform_targets.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    if context.scene.randomise_camera_props.target_mode != CAMERA:
+        return get_objects_transform_targets(context)
+
+    (
+        loc,
+        loc_x_range,
+        loc_y_range,
+        loc_z_range,
+        rot,
+        rot_x_range,
+        rot_y_range,
+        rot_z_range,
+        delta_on,
+        rand_posx,
+        rand_posy,
+        rand_posz,
+        rand_rotx,
+        rand_roty,
+        rand_rotz,
+    ) = get_transform_inputs(context)
+
+    if delta_on:
+        loc_value_str = "delta_location"
+        value_str = "delta_rotation_euler"
+    else:
+        loc_value_str = "location"
+        value_str = "rotation_euler"
+
+    rad2deg = 180 / np.pi
+    camera = context.scene.camera
+    list_targets = []
+    for i, (rand_pos, rand_rot, loc_range, rot_range, axis) in enumerate(
+        zip(
+            [rand_posx, rand_posy, rand_posz],
+            [rand_rotx, rand_roty, rand_rotz],
+            [loc_x_range, loc_y_range, loc_z_range],
+            [rot_x_range, rot_y_range, rot_z_range],
+            ["x", "y", "z"],
+        )
+    ):
+        # if location (or rotation) is not randomised,
+        # the component keeps its current value
+        if rand_pos:
+            if not loc:
+                loc_range = [getattr(camera, loc_value_str)[i]] * 2
+            list_targets.append(
+                ParamTarget(
+                    "camera_transforms",
+                    (loc_value_str, axis + "_pos_vals"),
+                    camera,
+                    loc_value_str,
+                    index=i,
+                    min_val=loc_range[0],
+                    max_val=loc_range[1],
+                )
+            )
+        if rand_rot:
+            if not rot:
+                rot_range = [getattr(camera, value_str)[i] * rad2deg] * 2
+            list_targets.append(
+                ParamTarget(
+                    "camera_transforms",
+                    (value_str, axis + "_rot_vals"),
+                    camera,
+                    value_str,
+                    index=i,
+                    scale=rad2deg,
+                    min_val=rot_range[0],
+                    max_val=rot_range[1],
+                )
+            )
+
+    # sort so that all location components come before rotation ones
+    return sorted(list_targets, key=lambda t: t.keys[0] == value_str)
+
+
+def get_geometry_targets(context):
+    """Get the geometry node sockets selected for randomisation
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    cs = context.scene
+    sockets_to_randomise_per_gng = geom_list_to_rand(cs)
+
+    list_targets = []
+    for gng_str, list_sockets in sockets_to_randomise_per_gng.items():
+        sockets_props_collection = cs.socket_props_per_gng.collection[
+            gng_str
+        ].collection
+        for sckt in sorted(list_sockets, key=lambda s: s.node.name):
+            sckt_props = socket_ids.get_socket_props(
+                ("GEOMETRY", gng_str),
+                sockets_props_collection,
+                socket_ids.get_geometry_socket_id(sckt),
+            )
+            attr_str = cs.socket_type_to_attr[type(sckt)]
+            list_targets.append(
+                ParamTarget(
+                    "geometry",
+                    (get_socket_key(gng_str, sckt),),
+                    sckt,
+                    "default_value",
+                    kind=get_socket_kind(sckt),
+                    min_val=getattr(sckt_props, "min_" + attr_str),
+                    max_val=getattr(sckt_props, "max_" + attr_str),
+                )
+            )
+
+    if cs.socket_props_per_gng.bool_per_object_inputs:
+        list_targets += get_modifier_input_targets(context)
+    return list_targets
+
+
+def get_modifier_input_targets(context):
+    """Get the inputs of geometry nodes modifiers selected for
+    randomisation per object
+
+    Each input is recorded per object, under the object's name,
+    the modifier's name and the input's name.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    list_targets = []
+    for list_inputs, list_mods in modifier_inputs.get_modifiers_per_gng(
+        context.scene
+    ):
+        for mod in list_mods:
+            for modifier_input in list_inputs:
+                list_targets.append(
+                    ParamTarget(
+                        "geometry",
+                        (mod.id_data.name, mod.name, modifier_input.name),
+                        mod,
+                        f'["{modifier_input.identifier}"]',
+                        kind=modifier_input.kind,
+                        min_val=modifier_input.min_val,
+                        max_val=modifier_input.max_val,
+                        setter=modifier_inputs.set_modifier_targets,
+                    )
+                )
+    return list_targets
+
+
+def get_material_targets(context):
+    """Get the material node sockets selected for randomisation
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    cs = context.scene
+    (
+        list_subpanel_material_names,
+        sockets_to_randomise_per_material,
+    ) = mat_list_to_rand(cs)
+
+    list_targets = []
+    for mat_str in list_subpanel_material_names:
+        sockets_props_collection = cs.socket_props_per_material.collection[
+            mat_str
+        ].collection
+        for sckt in sorted(
+            sockets_to_randomise_per_material[mat_str],
+            key=lambda s: s.node.name,
+        ):
+            sckt_props = socket_ids.get_socket_props(
+                ("MATERIAL", mat_str),
+                sockets_props_collection,
+                socket_ids.get_material_socket_id(sckt),
+            )
+            attr_str = cs.socket_type_to_attr[type(sckt)]
+            list_targets.append(
+                ParamTarget(
+                    "materials",
+                    (get_socket_key(mat_str, sckt),),
+                    sckt,
+                    "default_value",
+                    kind=get_socket_kind(sckt),
+                    min_val=getattr(sckt_props, "min_" + attr_str),
+                    max_val=getattr(sckt_props, "max_" + attr_str),
+                )
+            )
+
+    list_targets.extend(get_attribute_targets(context))
+    return list_targets
+
+
+def get_attribute_targets(context):
+    """Get the material sockets randomised per object, through
+    object attributes
+
+    Each attribute is recorded per object, under the object's name
+    and the attribute's name.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    cs = context.scene
+    list_targets = []
+    map_materials_to_sockets = object_attributes.get_attribute_sockets(cs)
+    for list_materials, list_sockets in map_materials_to_sockets.items():
+        for obj in object_attributes.get_objects_using_materials(
+            cs, list_materials
+        ):
+            for attribute_name, min_val, max_val in list_sockets:
+                list_targets.append(
+                    ParamTarget(
+                        "materials",
+                        (obj.name, attribute_name),
+                        obj,
+                        f'["{attribute_name}"]',
+                        kind=rng.UNIFORM,
+                        min_val=min_val,
+                        max_val=max_val,
+                        setter=object_attributes.set_attribute_targets,
+                    )
+                )
+    return list_targets
+
+
+def get_UD_targets(context):
+    """Get the user defined (UD) properties selected for randomisation
+
+    Euler angles are recorded in degrees, like the bounds in the UD panel.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    cs = context.scene
+    rad2deg = 180 / np.pi
+
+    list_targets = []
+    for UD in cs.socket_props_per_UD.collection:
+        if not UD.bool_randomise:
+            continue
+
+        full_str = UD.name
+        UD_handle = ud_paths.get_UD_handle(full_str)
+        if UD_handle is None:
+            continue
+
+        attr_str = cs.UD_prop_to_attr[UD_handle.type]
+
+        list_targets.append(
+            ParamTarget(
+                "user_defined_props",
+                (full_str,),
+                UD_handle.owner,
+                UD_handle.attr,
+                scale=rad2deg if attr_str == "euler" else None,
+                kind=ud_setters.MAP_ATTR_TO_KIND[attr_str],
+                min_val=getattr(UD, "min_" + attr_str),
+                max_val=getattr(UD, "max_" + attr_str),
+                setter=ud_setters.MAP_ATTR_TO_SETTER[attr_str],
+            )
+        )
+    return list_targets
+
+
+def sync_collections(context):
+    """Synchronise the collections of materials, geometry node groups
+    and UD props, if the Blender data was edited since the last sync
+
+    This is run explicitly before resolving the parameters to randomise,
+    so that getting them only reads the collections.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    """
+    cs = context.scene
+    for collection_props, collection_str in [
+        (cs.socket_props_per_material, "materials"),
+        (cs.socket_props_per_gng, "Geometry Node Groups"),
+        (cs.socket_props_per_UD, "UD props"),
+    ]:
+        if collection_props.sync_collections():
+            print(f"Collection of {collection_str} updated")
+
+
+def get_targets_to_record(context):
+    """Get all the parameters selected for randomisation, across
+    all panels
+
+    The collections are synchronised first.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    list
+        list of ParamTarget objects
+    """
+    sync_collections(context)
+    return (
+        get_transform_targets(context)
+        + get_geometry_targets(context)
+        + get_material_targets(context)
+        + get_UD_targets(context)
+    )
+
+
+# -------------------------------
+# Sampling engine
+# -------------------------------
+def randomise_all_subsystems():
+    """Randomise once every panel that has parameters to randomise"""
+    bpy.ops.camera.apply_random_transform("INVOKE_DEFAULT")
+
+    for op in [
+        bpy.ops.node.randomise_all_geometry_sockets,
+        bpy.ops.node.randomise_all_material_sockets,
+        bpy.ops.node.randomise_all_ud_sockets,
+    ]:
+        # the operators' poll fails if their collection is empty
+        if op.poll():
+            op("INVOKE_DEFAULT")
+
+
+def sample_frames(context, tot_frame_no, randomise_frame_fn=None):
+    """Randomise and record all selected parameters for a number of frames
+
+    Frames are visited exactly once: at every frame, all the panels
+    are randomised once and the values of all the selected parameters
+    are then read. The cost is therefore linear in the number of frames
+    and in the number of parameters.
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    tot_frame_no : int
+        number of frames to sample, starting from frame 0
+    randomise_frame_fn : callable, optional
+        function that randomises the scene once; by default all panels
+        are randomised via their operators
+
+    Returns
+    -------
+    dict
+        dictionary of the parameter values per frame, with one key
+        per section in SECTIONS
+    """
+    # resolve the parameters to record once for all frames
+    list_targets = get_targets_to_record(context)
+
+    list_values_per_target = [[] for _ in list_targets]
+    for _, list_values in iter_frames(
+        context, list_targets, range(tot_frame_no), randomise_frame_fn
+    ):
+        for values, value in zip(list_values_per_target, list_values):
+            values.append(value)
+
+    return nest_values(list_targets, list_values_per_target)
+
+
+def iter_frames(context, list_targets, frames, randomise_frame_fn=None):
+    """Randomise and record the selected parameters frame by frame
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+    list_targets : list
+        list of ParamTarget objects to record
+    frames : iterable
+        frame numbers to sample
+    randomise_frame_fn : callable, optional
+        function that randomises the scene once; by default all panels
+        are randomised via their operators
+
+    Yields
+    ------
+    tuple
+        frame number and list of values of each target at that frame
+    """
+    if randomise_frame_fn is None:
+        randomise_frame_fn = randomise_all_subsystems
+
+    for frame in frames:
+        context.scene.frame_current = frame
+        randomise_frame_fn()
+
+        yield frame, [target.get_value() for target in list_targets]
+
+
+def nest_values(list_targets, list_values_per_target):
+    """Nest the values of each parameter following its keys
+
+    Parameters
+    ----------
+    list_targets : list
+        list of ParamTarget objects
+    list_values_per_target : list
+        list of values per frame, for each target
+
+    Returns
+    -------
+    dict
+        dictionary of the parameter values per frame, with one key
+        per section in SECTIONS
+    """
+    data = {section: {} for section in SECTIONS}
+    for target, values in zip(list_targets, list_values_per_target):
+        section_dict = data[target.section]
+        for ky in target.keys[:-1]:
+            section_dict = section_dict.setdefault(ky, {})
+        section_dict[target.keys[-1]] = values
+
+    return data
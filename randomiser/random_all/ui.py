@@ -58,6 +58,42 @@ class PanelRandomAll(bpy.types.Panel):
             icon_only=True,
         )
 
+        # Output format and path
+        col = layout.column(align=True)
+        col.prop(context.scene.rand_all_properties, "output_format")
+        col.prop(context.scene.rand_all_properties, "output_path")
+        if context.scene.rand_all_properties.output_format == "NPZ":
+            col.prop(context.scene.rand_all_properties, "chunk_size")
+
+        # Bake to keyframes
+        col = layout.column()
+        col.operator("camera.bake_param_keyframes", text="Bake to Keyframes")
+
+        # Replay from a parameter log
+        layout.separator()
+        col = layout.column(align=True)
+        col.prop(context.scene.rand_all_properties, "replay_path")
+        col.operator("camera.replay_param_log", text="Replay Current Frame")
+        col.prop(context.scene.rand_all_properties, "bool_replay")
+
+        # Per-frame randomisation toggles
+        layout.separator()
+        layout.prop(
+            context.scene.rand_all_properties, "bool_randomise_per_frame"
+        )
+        col = layout.column(align=True)
+        col.enabled = (
+            context.scene.rand_all_properties.bool_randomise_per_frame
+        )
+        for toggle_str in [
+            "bool_rand_camera_transforms",
+            "bool_rand_materials",
+            "bool_rand_geometry",
+            "bool_rand_UD",
+            "bool_rand_mesh",
+        ]:
+            col.prop(context.scene.rand_all_properties, toggle_str)
+
 
 # -----------------------
 # Classes to register
@@ -1,5 +1,7 @@
 import bpy
 
+from ..utils import rng
+
 
 # ---------------------------
 # Properties
@@ -23,6 +25,24 @@ class PropertiesRandomSeed(bpy.types.PropertyGroup):
     )
     seed_previous: seed_previous_prop  # type: ignore
 
+    rng_mode_prop = bpy.props.EnumProperty(
+        name="RNG mode",
+        items=(
+            (
+                rng.SEQUENTIAL,
+                "Sequential",
+                "Values at a frame depend on all the values drawn before",
+            ),
+            (
+                rng.FRAME,
+                "Per frame",
+                "Values only depend on the seed, the frame and the parameter",
+            ),
+        ),
+        default=rng.SEQUENTIAL,
+    )
+    rng_mode: rng_mode_prop  # type: ignore
+
 
 # ------------------------------------
 # Register / unregister classes
@@ -42,6 +42,9 @@ class PanelRandomSeed(bpy.types.Panel):
         )  # only disable the next part of the row
         right_col.prop(context.scene.seed_properties, "seed", icon_only=True)
 
+        # RNG mode
+        self.layout.prop(context.scene.seed_properties, "rng_mode")
+
 
 # -----------------------
 # Classes to register
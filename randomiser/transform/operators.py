@@ -1,9 +1,8 @@
-from random import seed, uniform
-
 import bpy
 import numpy as np
-from bpy.app.handlers import persistent
-from mathutils import Vector
+
+from ..utils import rng
+from .properties import CAMERA, SELECTED
 
 
 def get_transform_inputs(context):
@@ -62,12 +61,246 @@ def get_transform_inputs(context):
     )
 
 
+def get_transform_bounds(context):
+    """Get the bounds of the location and rotation components
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    tuple
+        arrays with the min values, the max values and whether each
+        component is randomised, for the x/y/z location components
+        followed by the x/y/z rotation components (in degrees)
+    """
+    (
+        loc,
+        loc_x_range,
+        loc_y_range,
+        loc_z_range,
+        rot,
+        rot_x_range,
+        rot_y_range,
+        rot_z_range,
+        delta_on,
+        rand_posx,
+        rand_posy,
+        rand_posz,
+        rand_rotx,
+        rand_roty,
+        rand_rotz,
+    ) = get_transform_inputs(context)
+
+    list_ranges = [
+        loc_x_range,
+        loc_y_range,
+        loc_z_range,
+        rot_x_range,
+        rot_y_range,
+        rot_z_range,
+    ]
+    min_vals = np.array([r[0] for r in list_ranges])
+    max_vals = np.array([r[1] for r in list_ranges])
+    mask = np.array(
+        [rand_posx, rand_posy, rand_posz, rand_rotx, rand_roty, rand_rotz]
+    )
+    return min_vals, max_vals, mask
+
+
+def get_transform_attrs(delta_on):
+    """Get the names of the location and rotation attributes
+
+    Parameters
+    ----------
+    delta_on : bool
+        whether the delta transform is randomised
+
+    Returns
+    -------
+    tuple
+        names of the location and rotation attributes of an object
+    """
+    if delta_on:
+        return "delta_location", "delta_rotation_euler"
+    return "location", "rotation_euler"
+
+
+def get_transform_objects(context):
+    """Get the objects whose transform is randomised
+
+    Parameters
+    ----------
+    context : _type_
+        _description_
+
+    Returns
+    -------
+    bpy.types.bpy_prop_collection or list
+        the objects in the selected collection, or a list with the
+        scene camera or the selected objects
+    """
+    cs = context.scene
+    props = cs.randomise_camera_props
+    if props.target_mode == CAMERA:
+        return [cs.camera] if cs.camera is not None else []
+    elif props.target_mode == SELECTED:
+        return [obj for obj in cs.objects if obj.select_get()]
+    elif props.target_collection is not None:
+        return props.target_collection.all_objects
+    return []
+
+
+# --------------------------------------------------
+# Bulk read and write of transforms
+# --------------------------------------------------
+def get_transform_array(objects, attr):
+    """Get a vector attribute of several objects as an array
+
+    Parameters
+    ----------
+    objects : bpy.types.bpy_prop_collection or list
+        objects to read
+    attr : str
+        name of the attribute (e.g. "location")
+
+    Returns
+    -------
+    numpy.ndarray
+        array of shape (number of objects, 3)
+    """
+    if isinstance(objects, bpy.types.bpy_prop_collection):
+        values = np.empty(len(objects) * 3, dtype=np.float32)
+        objects.foreach_get(attr, values)
+        return values.reshape(-1, 3).astype(float)
+
+    return np.array([getattr(obj, attr) for obj in objects], dtype=float)
+
+
+def set_transform_array(objects, attr, values):
+    """Set a vector attribute of several objects from an array
+
+    If the objects are an RNA collection, all the values are written
+    with a single foreach_set call. Otherwise the values are converted
+    to Python lists once, and each object's vector is assigned as a
+    whole.
+
+    Objects whose rotation mode is not Euler (quaternion or axis angle)
+    get the rotation converted to their own mode.
+
+    Parameters
+    ----------
+    objects : bpy.types.bpy_prop_collection or list
+        objects to modify
+    attr : str
+        name of the attribute (e.g. "location")
+    values : numpy.ndarray
+        array of shape (number of objects, 3)
+    """
+    if isinstance(objects, bpy.types.bpy_prop_collection):
+        objects.foreach_set(attr, np.ravel(values).astype(np.float32))
+    else:
+        for obj, value in zip(objects, np.reshape(values, (-1, 3)).tolist()):
+            setattr(obj, attr, value)
+
+    if attr == "rotation_euler":
+        for obj, value in zip(objects, np.reshape(values, (-1, 3)).tolist()):
+            if obj.rotation_mode in {"QUATERNION", "AXIS_ANGLE"}:
+                rotation_mode = obj.rotation_mode
+                obj.rotation_mode = "XYZ"
+                obj.rotation_euler = value
+                obj.rotation_mode = rotation_mode
+
+
+def randomise_objects_transform(
+    objects, generator, min_vals, max_vals, mask, delta_on
+):
+    """Randomise the location and rotation of several objects at once
+
+    The values of all the objects are drawn as a single (number of
+    objects x 6) block, and written with one bulk write per attribute.
+    The components that are not randomised keep their current values.
+
+    Parameters
+    ----------
+    objects : bpy.types.bpy_prop_collection or list
+        objects to transform
+    generator : numpy.random.Generator
+        random number generator
+    min_vals : numpy.ndarray
+        min values of the x/y/z location and rotation components
+        (rotation in degrees)
+    max_vals : numpy.ndarray
+        max values of the x/y/z location and rotation components
+        (rotation in degrees)
+    mask : numpy.ndarray
+        whether each of the 6 components is randomised
+    delta_on : bool
+        whether the delta transform is randomised
+    """
+    if len(objects) == 0:
+        return
+
+    # all components are drawn, so that the values drawn
+    # do not depend on the components randomised
+    values = rng.draw_block(
+        generator, rng.UNIFORM, min_vals, max_vals, len(objects)
+    )
+    values[:, 3:] = np.deg2rad(values[:, 3:])
+
+    for attr, cols in zip(
+        get_transform_attrs(delta_on), [slice(0, 3), slice(3, 6)]
+    ):
+        if not mask[cols].any():
+            continue
+
+        attr_values = values[:, cols]
+        if not mask[cols].all():
+            attr_values = np.where(
+                mask[cols], attr_values, get_transform_array(objects, attr)
+            )
+        set_transform_array(objects, attr, attr_values)
+
+
+def set_transform_targets(list_targets, values):
+    """Set a block of location and rotation parameters at once
+
+    Setter for the parameters recorded per object (see
+    random_all.sampling.get_transform_targets), with the values of
+    each parameter's 3 components in the recorded units (rotations
+    in degrees).
+
+    Parameters
+    ----------
+    list_targets : list
+        ParamTarget objects, each with an object as owner and a vector
+        attribute of 3 components
+    values : numpy.ndarray
+        values of all the components of the parameters
+    """
+    values = np.reshape(values, (len(list_targets), 3))
+    map_attr_to_rows = {}
+    for row, target in enumerate(list_targets):
+        map_attr_to_rows.setdefault(target.attr, []).append(row)
+
+    for attr, rows in map_attr_to_rows.items():
+        attr_values = values[rows]
+        if attr.endswith("rotation_euler"):
+            attr_values = np.deg2rad(attr_values)
+        set_transform_array(
+            [list_targets[row].owner for row in rows], attr, attr_values
+        )
+
+
 # -------------------------------
 # Operator
 # -------------------------------
 class ApplyRandomTransform(bpy.types.Operator):
     # docstring shows as a tooltip for menu items and buttons.
-    """Randomise the position and orientation of the camera
+    """Randomise the position and orientation of the camera,
+    the selected objects or the objects in a collection
 
     Parameters
     ----------
@@ -94,7 +327,7 @@ class ApplyRandomTransform(bpy.types.Operator):
         """Execute the randomiser operator
 
         Randomise the position and rotation x,y,z components
-        of the camera between their min and max values.
+        of the objects to transform between their min and max values.
 
         Parameters
         ----------
@@ -106,162 +339,22 @@ class ApplyRandomTransform(bpy.types.Operator):
         _type_
             _description_
         """
-
-        (
-            loc,
-            loc_x_range,
-            loc_y_range,
-            loc_z_range,
-            rot,
-            rot_x_range,
-            rot_y_range,
-            rot_z_range,
-            delta_on,
-            rand_posx,
-            rand_posy,
-            rand_posz,
-            rand_rotx,
-            rand_roty,
-            rand_rotz,
-        ) = get_transform_inputs(context)
-
-        previous_seed = context.scene.seed_properties.seed_previous
-        current_seed = context.scene.seed_properties.seed
-        seed_enabled = context.scene.seed_properties.seed_toggle
-        if (previous_seed != current_seed) and (seed_enabled is True):
-            seed(current_seed)
-            context.scene.seed_properties.seed_previous = current_seed
-
-        randomise_selected(
-            context,
-            loc,
-            loc_x_range,
-            loc_y_range,
-            loc_z_range,
-            rot,
-            rot_x_range,
-            rot_y_range,
-            rot_z_range,
-            delta_on,
-            rand_posx,
-            rand_posy,
-            rand_posz,
-            rand_rotx,
-            rand_roty,
-            rand_rotz,
+        # Set the seed if it is toggled on
+        rng.reseed_if_changed(context.scene.seed_properties)
+
+        min_vals, max_vals, mask = get_transform_bounds(context)
+        randomise_objects_transform(
+            get_transform_objects(context),
+            rng.get_sequential_generator(),
+            min_vals,
+            max_vals,
+            mask,
+            context.scene.randomise_camera_props.bool_delta,
         )
 
         return {"FINISHED"}
 
 
-@persistent
-def randomise_camera_transform_per_frame(dummy):
-    bpy.ops.camera.apply_random_transform("INVOKE_DEFAULT")
-    return
-
-
-# --------------------------------------------------
-# Randomise_selected function:
-
-
-def randomise_selected(
-    context,
-    loc,
-    loc_x_range,
-    loc_y_range,
-    loc_z_range,
-    rot,
-    rot_x_range,
-    rot_y_range,
-    rot_z_range,
-    delta_on,
-    rand_posx,
-    rand_posy,
-    rand_posz,
-    rand_rotx,
-    rand_roty,
-    rand_rotz,
-):
-    """Generate random numbers between the range for x/y/z
-    directions in location and rotation
-
-    Parameters
-    ----------
-    bpy : _type_
-        _description_
-
-    Returns
-    -------
-    _type_
-        _description_
-    """
-
-    if loc:
-        if delta_on:
-            value_str = "delta_location"
-        else:
-            value_str = "location"
-
-        if rand_posx:
-            getattr(context.scene.camera, value_str)[0] = uniform(
-                loc_x_range[0], loc_x_range[1]
-            )
-
-        if rand_posy:
-            getattr(context.scene.camera, value_str)[1] = uniform(
-                loc_y_range[0], loc_y_range[1]
-            )
-
-        if rand_posz:
-            getattr(context.scene.camera, value_str)[2] = uniform(
-                loc_z_range[0], loc_z_range[1]
-            )
-
-    else:  # otherwise the values change under us
-        uniform(0.0, 0.0), uniform(0.0, 0.0), uniform(0.0, 0.0)
-
-    if rot:
-        if rand_rotx:
-            rand_x = uniform(rot_x_range[0], rot_x_range[1])
-        else:
-            rand_x = uniform(0.0, 0.0)
-
-        if rand_roty:
-            rand_y = uniform(rot_y_range[0], rot_y_range[1])
-        else:
-            rand_y = uniform(0.0, 0.0)
-
-        if rand_rotz:
-            rand_z = uniform(rot_z_range[0], rot_z_range[1])
-        else:
-            rand_z = uniform(0.0, 0.0)
-
-        vec = Vector([rand_x, rand_y, rand_z])
-        deg2rad = np.pi / 180
-
-        vec = vec * deg2rad  # convert degrees to radians
-
-        rotation_mode = bpy.data.objects["Camera"].rotation_mode
-        if rotation_mode in {"QUATERNION", "AXIS_ANGLE"}:
-            bpy.data.objects["Camera"].rotation_mode = "XYZ"
-
-        bpy.data.objects["Camera"].rotation_euler[0] = vec[0]  # in radians
-        bpy.data.objects["Camera"].rotation_euler[1] = vec[1]
-        bpy.data.objects["Camera"].rotation_euler[2] = vec[2]
-
-        if delta_on:
-            bpy.data.objects["Camera"].delta_rotation_euler[0] = vec[0]
-            bpy.data.objects["Camera"].delta_rotation_euler[1] = vec[1]
-            bpy.data.objects["Camera"].delta_rotation_euler[2] = vec[2]
-        else:
-            bpy.data.objects["Camera"].rotation_euler[0] = vec[0]
-            bpy.data.objects["Camera"].rotation_euler[1] = vec[1]
-            bpy.data.objects["Camera"].rotation_euler[2] = vec[2]
-        bpy.data.objects["Camera"].rotation_mode = rotation_mode
-    else:
-        uniform(0.0, 0.0), uniform(0.0, 0.0), uniform(0.0, 0.0)
-
-
 # ---------------------
 # Classes to register
 # ---------------------
@@ -279,10 +372,6 @@ def register():
     for cls in list_classes_to_register:
         bpy.utils.register_class(cls)
 
-    bpy.app.handlers.frame_change_pre.append(
-        randomise_camera_transform_per_frame
-    )
-
     print("transform operators registered")
 
 
@@ -293,8 +382,4 @@ def unregister():
     for cls in list_classes_to_register:
         bpy.utils.unregister_class(cls)
 
-    bpy.app.handlers.frame_change_pre.remove(
-        randomise_camera_transform_per_frame
-    )
-
     print("transform operators unregistered")
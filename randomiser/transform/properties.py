@@ -1,6 +1,16 @@
 import bpy
 import numpy as np
 
+# -------------------------------
+# Objects to transform
+# -------------------------------
+# - CAMERA: the scene camera
+# - SELECTED: the selected objects in the scene
+# - COLLECTION: all the objects in a collection (including its children)
+CAMERA = "CAMERA"
+SELECTED = "SELECTED"
+COLLECTION = "COLLECTION"
+
 
 # -----------------------------------------
 # Bounds to PropertiesApplyRandomTransform
@@ -95,6 +105,8 @@ class PropertiesApplyRandomTransform(bpy.types.PropertyGroup):
     """
     Class holding the set of properties
     for the camera position and rotation:
+    - objects to transform (the camera, the selected objects or the
+      objects in a collection)
     - min/max values for x/y/z component of position and rotation, and
     - boolean for delta position and rotation
     - boolean for setting seed value
@@ -102,6 +114,31 @@ class PropertiesApplyRandomTransform(bpy.types.PropertyGroup):
 
     """
 
+    # Objects to transform
+    target_mode_prop = bpy.props.EnumProperty(
+        name="Objects",
+        items=(
+            (CAMERA, "Camera", "Randomise the transform of the scene camera"),
+            (
+                SELECTED,
+                "Selected",
+                "Randomise the transform of the selected objects",
+            ),
+            (
+                COLLECTION,
+                "Collection",
+                "Randomise the transform of the objects in a collection",
+            ),
+        ),
+        default=CAMERA,
+    )
+    target_mode: target_mode_prop  # type: ignore
+
+    target_collection_prop = bpy.props.PointerProperty(
+        name="Collection", type=bpy.types.Collection
+    )
+    target_collection: target_collection_prop  # type: ignore
+
     # Camera position and rotation
     camera_pos: bpy.props.FloatVectorProperty(  # type: ignore
         size=3,
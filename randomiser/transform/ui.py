@@ -1,11 +1,14 @@
 import bpy
 
+from .properties import CAMERA, COLLECTION
+
 
 # -------
 # Panel
 class PanelAddRandomTransform(bpy.types.Panel):
     """Class defining the panel for randomising
-    the camera transform
+    the transform of the camera, the selected objects or
+    the objects in a collection
 
     """
 
@@ -23,6 +26,20 @@ class PanelAddRandomTransform(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
+        props = context.scene.randomise_camera_props
+
+        # Objects to transform
+        col = layout.column()
+        col.prop(props, "target_mode")
+        if props.target_mode == COLLECTION:
+            col.prop(props, "target_collection")
+
+        # current values are shown for the camera,
+        # or for the active object if several objects are transformed
+        if props.target_mode == CAMERA:
+            display_obj = context.scene.camera
+        else:
+            display_obj = context.object
 
         # Create a simple row.
         # Create an row where the buttons are aligned to each other.
@@ -34,7 +51,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         col4 = row_split.column(align=True)
         col5 = row_split.column(align=True)
 
-        col1.label(text=" Randomise camera position:")
+        col1.label(text=" Randomise position:")
         col2.label(text="")
         col3.label(text="min")
         col4.label(text="max")
@@ -56,7 +73,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         else:
             value_str = "location"
 
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=0)
+        col1.prop(display_obj, value_str, icon_only=True, index=0)
         col1.enabled = False
 
         col2.prop(
@@ -89,7 +106,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         col4 = row_split.column(align=True)
 
         # Camera positon y
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=1)
+        col1.prop(display_obj, value_str, icon_only=True, index=1)
         col1.enabled = False
 
         col2.prop(
@@ -121,7 +138,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         col4 = row_split.column(align=True)
 
         # Camera positon y
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=2)
+        col1.prop(display_obj, value_str, icon_only=True, index=2)
         col1.enabled = False
 
         col2.prop(
@@ -144,7 +161,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
 
         #########################
         # Rotation part of panel
-        layout.label(text=" Randomise camera rotation:")
+        layout.label(text=" Randomise rotation:")
         row = layout.row()  # row = layout.row(align=True)
         row.label(text="x")
 
@@ -160,7 +177,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         else:
             value_str = "rotation_euler"
 
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=0)
+        col1.prop(display_obj, value_str, icon_only=True, index=0)
         col1.enabled = False
 
         col2.prop(
@@ -190,7 +207,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         col3 = row_split.column(align=True)
         col4 = row_split.column(align=True)
 
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=1)
+        col1.prop(display_obj, value_str, icon_only=True, index=1)
         col1.enabled = False
 
         col2.prop(
@@ -220,7 +237,7 @@ class PanelAddRandomTransform(bpy.types.Panel):
         col3 = row_split.column(align=True)
         col4 = row_split.column(align=True)
 
-        col1.prop(context.scene.camera, value_str, icon_only=True, index=2)
+        col1.prop(display_obj, value_str, icon_only=True, index=2)
         col1.enabled = False
 
         col2.prop(
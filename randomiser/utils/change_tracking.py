@@ -0,0 +1,506 @@
+import bpy
+from bpy.app.handlers import persistent
+
+# Types of data-blocks whose updates may change what is randomised
+# (node graphs, materials, objects, cameras, collections of objects and
+# the scene's randomiser properties)
+TRACKED_ID_TYPES = (
+    "NODETREE",
+    "MATERIAL",
+    "OBJECT",
+    "CAMERA",
+    "COLLECTION",
+    "SCENE",
+)
+
+# Collections of data-blocks in bpy.data whose additions or removals
+# may change what is randomised
+TRACKED_DATA_COLLECTIONS = (
+    "node_groups",
+    "materials",
+    "objects",
+    "cameras",
+    "collections",
+)
+
+# Properties of the scene holding the randomiser's settings
+RANDOMISER_SCENE_PROPS = (
+    "seed_properties",
+    "rand_all_properties",
+    "randomise_camera_props",
+    "randomise_mesh_props",
+    "socket_props_per_material",
+    "socket_props_per_gng",
+    "socket_props_per_UD",
+    "custom",
+)
+
+# Version of the tracked data: it is increased every time
+# the structure of the tracked data may have changed
+_version = 0
+
+# Structure of the tracked data-blocks last seen, per data-block, and
+# number of data-blocks per collection in bpy.data
+_map_id_to_structure = {}
+_data_counts = None
+
+# Number of times the Blender data was reloaded (after loading a file,
+# undoing or redoing). Python references to Blender data obtained
+# before a reload are no longer valid
+_n_reloads = 0
+
+# Collections of properties that are synchronised with the Blender data
+# (one collection of socket properties per material and per geometry
+# node group, and the collection of user-defined properties)
+MATERIALS = "MATERIALS"
+GEOMETRY = "GEOMETRY"
+USER_DEFINED = "USER_DEFINED"
+
+# Names of the items out of sync with the Blender data, per collection
+# (None marks all the items). All collections are out of sync initially
+_map_collection_to_dirty = {
+    MATERIALS: {None},
+    GEOMETRY: {None},
+    USER_DEFINED: {None},
+}
+
+
+def get_version():
+    """Get the current version of the tracked data
+
+    Returns
+    -------
+    int
+        version counter
+    """
+    return _version
+
+
+def bump_version():
+    """Mark the tracked data as changed"""
+    global _version
+    _version += 1
+
+
+def get_n_reloads():
+    """Get the number of times the Blender data was reloaded
+
+    Returns
+    -------
+    int
+        reload counter
+    """
+    return _n_reloads
+
+
+# -------------------------------
+# Dirty flags
+# -------------------------------
+def mark_dirty(collection, name=None):
+    """Mark an item of a synchronised collection as out of sync
+
+    Parameters
+    ----------
+    collection : str
+        synchronised collection (MATERIALS, GEOMETRY or USER_DEFINED)
+    name : str, optional
+        name of the material or geometry node group out of sync,
+        by default None (all the items in the collection)
+    """
+    _map_collection_to_dirty[collection].add(name)
+
+
+def is_dirty(collection, name=None):
+    """Check if an item of a synchronised collection is out of sync
+
+    This only reads the dirty flags, so it is cheap and has no side
+    effects.
+
+    Parameters
+    ----------
+    collection : str
+        synchronised collection (MATERIALS, GEOMETRY or USER_DEFINED)
+    name : str, optional
+        name of the item, by default None (any item in the collection)
+
+    Returns
+    -------
+    bool
+        True if the item may be out of sync with the Blender data
+    """
+    dirty = _map_collection_to_dirty[collection]
+    if name is None:
+        return bool(dirty)
+    return None in dirty or name in dirty
+
+
+def pop_dirty(collection):
+    """Get the items of a synchronised collection that are out of sync,
+    and mark them all as in sync
+
+    Parameters
+    ----------
+    collection : str
+        synchronised collection (MATERIALS, GEOMETRY or USER_DEFINED)
+
+    Returns
+    -------
+    set
+        names of the items out of sync (None if all of them are)
+    """
+    dirty = _map_collection_to_dirty[collection]
+    _map_collection_to_dirty[collection] = set()
+    return dirty
+
+
+def mark_updated_collections(list_ids, data_changed):
+    """Mark as out of sync the collections affected by structural changes
+
+    Parameters
+    ----------
+    list_ids : list
+        data-blocks whose structure changed
+    data_changed : bool
+        True if data-blocks were added or removed
+    """
+    # only the materials and geometry node groups whose structure
+    # changed need to be synchronised
+    for id_data in list_ids:
+        if isinstance(id_data, bpy.types.Material):
+            mark_dirty(MATERIALS, id_data.name)
+        elif isinstance(id_data, bpy.types.GeometryNodeTree):
+            mark_dirty(GEOMETRY, id_data.name)
+        elif isinstance(id_data, bpy.types.ShaderNodeTree) and (
+            not id_data.is_embedded_data
+        ):
+            # shader node groups may be shared by several materials
+            mark_dirty(MATERIALS)
+
+    # data-blocks that were added or removed are not listed
+    if data_changed:
+        mark_dirty(MATERIALS)
+        mark_dirty(GEOMETRY)
+
+    # user-defined properties may point to any object, camera or
+    # property of the scene
+    if data_changed or any(
+        isinstance(
+            id_data, (bpy.types.Object, bpy.types.Camera, bpy.types.Scene)
+        )
+        for id_data in list_ids
+    ):
+        mark_dirty(USER_DEFINED)
+
+
+# -------------------------------
+# Structure of the data-blocks
+# -------------------------------
+def get_properties_structure(data):
+    """Get the values of the properties of a property group, recursively
+
+    Read-only properties (e.g. flags computed from the change tracking
+    itself) are skipped.
+
+    Parameters
+    ----------
+    data : bpy.types.PropertyGroup or bpy.types.bpy_prop_collection
+        property group, or collection of property groups
+
+    Returns
+    -------
+    tuple
+        values of the properties
+    """
+    if not isinstance(data, bpy.types.PropertyGroup):
+        return tuple(get_properties_structure(item) for item in data)
+
+    list_values = []
+    for prop in data.bl_rna.properties:
+        if prop.identifier == "rna_type":
+            continue
+
+        value = getattr(data, prop.identifier)
+        if prop.type == "COLLECTION":
+            value = get_properties_structure(value)
+        elif prop.type == "POINTER":
+            if isinstance(value, bpy.types.PropertyGroup):
+                value = get_properties_structure(value)
+            else:
+                value = getattr(value, "name", None)
+        elif prop.is_readonly:
+            continue
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        list_values.append(value)
+    return tuple(list_values)
+
+
+def get_node_tree_structure(node_tree):
+    """Get the nodes, links and interface of a node tree
+
+    Parameters
+    ----------
+    node_tree : bpy.types.NodeTree
+        node tree
+
+    Returns
+    -------
+    tuple
+        names and types of the nodes (and node groups they hold),
+        links between sockets and inputs of the interface
+    """
+    if node_tree is None:
+        return None
+
+    nodes = tuple(
+        (
+            nd.name,
+            nd.bl_idname,
+            getattr(getattr(nd, "node_tree", None), "name", None),
+        )
+        for nd in node_tree.nodes
+    )
+    links = tuple(
+        (
+            lk.from_node.name,
+            lk.from_socket.identifier,
+            lk.to_node.name,
+            lk.to_socket.identifier,
+        )
+        for lk in node_tree.links
+    )
+    # Blender 4.0 replaced the inputs of node groups with an interface
+    if hasattr(node_tree, "interface"):
+        inputs = tuple(
+            (item.name, item.identifier, item.bl_socket_idname)
+            for item in node_tree.interface.items_tree
+            if item.item_type == "SOCKET"
+        )
+    else:
+        inputs = tuple(
+            (sckt.name, sckt.identifier, sckt.bl_socket_idname)
+            for sckt in node_tree.inputs
+        )
+    return (node_tree.name, nodes, links, inputs)
+
+
+def get_structure(id_data):
+    """Get the structure of a tracked data-block
+
+    The structure holds what the randomiser resolves when listing the
+    parameters to randomise (names, nodes and links, material slots,
+    modifiers, objects in collections and the randomiser's settings),
+    but not the values it randomises.
+
+    Parameters
+    ----------
+    id_data : bpy.types.ID
+        data-block
+
+    Returns
+    -------
+    tuple
+        structure of the data-block
+    """
+    if isinstance(id_data, bpy.types.NodeTree):
+        return get_node_tree_structure(id_data)
+    elif isinstance(id_data, bpy.types.Material):
+        return (
+            id_data.name,
+            id_data.use_nodes,
+            get_node_tree_structure(id_data.node_tree),
+        )
+    elif isinstance(id_data, bpy.types.Object):
+        return (
+            id_data.name,
+            getattr(id_data.data, "name", None),
+            tuple(
+                (slot.link, getattr(slot.material, "name", None))
+                for slot in id_data.material_slots
+            ),
+            tuple(
+                (
+                    mod.name,
+                    mod.type,
+                    getattr(getattr(mod, "node_group", None), "name", None),
+                )
+                for mod in id_data.modifiers
+            ),
+        )
+    elif isinstance(id_data, bpy.types.Collection):
+        return (
+            id_data.name,
+            tuple(obj.name for obj in id_data.objects),
+            tuple(child.name for child in id_data.children),
+        )
+    elif isinstance(id_data, bpy.types.Scene):
+        return (
+            id_data.name,
+            getattr(id_data.camera, "name", None),
+            tuple(obj.name for obj in id_data.objects),
+            tuple(
+                get_properties_structure(getattr(id_data, prop_str))
+                for prop_str in RANDOMISER_SCENE_PROPS
+                if hasattr(id_data, prop_str)
+            ),
+        )
+    return (id_data.name,)
+
+
+def get_structure_key(id_data):
+    """Get the key of a data-block in the structures last seen
+
+    Parameters
+    ----------
+    id_data : bpy.types.ID
+        data-block
+
+    Returns
+    -------
+    tuple
+        type of the data-block and its memory address
+    """
+    return (type(id_data).__name__, id_data.as_pointer())
+
+
+def get_data_counts():
+    """Get the number of data-blocks per tracked collection in bpy.data
+
+    Returns
+    -------
+    tuple
+        number of data-blocks, per collection in TRACKED_DATA_COLLECTIONS
+    """
+    return tuple(
+        len(getattr(bpy.data, data_str))
+        for data_str in TRACKED_DATA_COLLECTIONS
+    )
+
+
+def remember_structures():
+    """Remember the structure of all the tracked data-blocks
+
+    After this, only the data-blocks whose structure changes are
+    reported as structural updates.
+    """
+    global _data_counts
+    _map_id_to_structure.clear()
+    for data_str in TRACKED_DATA_COLLECTIONS + ("scenes",):
+        for id_data in getattr(bpy.data, data_str):
+            list_ids = [id_data]
+            if isinstance(id_data, bpy.types.Material) and id_data.node_tree:
+                list_ids.append(id_data.node_tree)
+            for id_tracked in list_ids:
+                _map_id_to_structure[get_structure_key(id_tracked)] = (
+                    get_structure(id_tracked)
+                )
+    _data_counts = get_data_counts()
+
+
+def get_structural_updates(depsgraph):
+    """Get the tracked data-blocks whose structure changed in a
+    depsgraph update
+
+    Updates that only move objects, and updates of values randomised by
+    the randomiser itself (socket values, modifier inputs and custom
+    properties), do not change the structure of the data-blocks.
+
+    Parameters
+    ----------
+    depsgraph : bpy.types.Depsgraph
+        dependency graph that was updated
+
+    Returns
+    -------
+    tuple
+        list of data-blocks whose structure changed, and True if
+        data-blocks were added or removed
+    """
+    global _data_counts
+    data_counts = get_data_counts()
+    data_changed = data_counts != _data_counts
+    _data_counts = data_counts
+
+    list_ids = []
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object) and not (
+            update.is_updated_geometry or update.is_updated_shading
+        ):
+            continue
+        if not isinstance(
+            id_data,
+            (
+                bpy.types.NodeTree,
+                bpy.types.Material,
+                bpy.types.Object,
+                bpy.types.Camera,
+                bpy.types.Collection,
+                bpy.types.Scene,
+            ),
+        ):
+            continue
+
+        key = get_structure_key(id_data)
+        structure = get_structure(id_data)
+        if _map_id_to_structure.get(key) != structure:
+            _map_id_to_structure[key] = structure
+            list_ids.append(id_data)
+    return list_ids, data_changed
+
+
+# -------------------------------
+# Handlers
+# -------------------------------
+# NOTE: the values set by the randomiser (transforms, socket values,
+# modifier inputs, custom properties) are reported as updates too, so
+# only changes to the structure of the tracked data increase the version
+# and values randomised per frame do not invalidate the tracked data
+@persistent
+def track_depsgraph_updates(scene, depsgraph):
+    if not any(depsgraph.id_type_updated(t) for t in TRACKED_ID_TYPES):
+        return
+
+    list_ids, data_changed = get_structural_updates(depsgraph)
+    if list_ids or data_changed:
+        bump_version()
+        mark_updated_collections(list_ids, data_changed)
+
+
+# after loading a file or undoing, references to Blender data
+# may no longer be valid
+@persistent
+def track_data_reload(dummy):
+    global _n_reloads
+    _n_reloads += 1
+    remember_structures()
+    bump_version()
+    for collection in _map_collection_to_dirty:
+        mark_dirty(collection)
+
+
+# -----------------------------------------
+# Register and unregister functions
+# ------------------------------------------
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(track_depsgraph_updates)
+    for handlers in [
+        bpy.app.handlers.load_post,
+        bpy.app.handlers.undo_post,
+        bpy.app.handlers.redo_post,
+    ]:
+        handlers.append(track_data_reload)
+
+    print("change tracking registered")
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(track_depsgraph_updates)
+    for handlers in [
+        bpy.app.handlers.load_post,
+        bpy.app.handlers.undo_post,
+        bpy.app.handlers.redo_post,
+    ]:
+        handlers.remove(track_data_reload)
+
+    print("change tracking unregistered")
@@ -0,0 +1,53 @@
+import numpy as np
+
+from . import rng
+
+# -------------------------------
+# Bounds of node group inputs
+# -------------------------------
+# Limits of the min and max values of the inputs of a node group's
+# interface if they are not set (the full range of their type), per kind
+MAP_KIND_TO_DEFAULT_LIMITS = {
+    rng.UNIFORM: (
+        -float(np.finfo(np.float32).max),
+        float(np.finfo(np.float32).max),
+    ),
+    rng.INTEGER: (
+        int(np.iinfo(np.int32).min),
+        int(np.iinfo(np.int32).max),
+    ),
+}
+
+
+def is_unbounded(kind, min_val, max_val):
+    """Check if the bounds of an input reach the default limits of
+    its kind
+
+    Values drawn between such bounds are meaningless (e.g. about
+    +/-3.4e38 for a float input), so the input should not be randomised
+    until its min and max values are set.
+
+    Parameters
+    ----------
+    kind : str
+        kind of parameter, as defined in utils.rng
+    min_val : array_like
+        min value per component
+    max_val : array_like
+        max value per component
+
+    Returns
+    -------
+    bool
+        True if any component is infinite or at the default limits
+    """
+    if kind not in MAP_KIND_TO_DEFAULT_LIMITS:
+        return False
+
+    min_limit, max_limit = MAP_KIND_TO_DEFAULT_LIMITS[kind]
+    min_val = np.asarray(min_val, dtype=float)
+    max_val = np.asarray(max_val, dtype=float)
+    return bool(
+        np.any(~np.isfinite(min_val) | (min_val <= min_limit))
+        or np.any(~np.isfinite(max_val) | (max_val >= max_limit))
+    )
@@ -1,7 +1,33 @@
-import bpy
+from . import node_rewrite, socket_ids
+from .shared_sockets import get_socket_target_key, report_shared_sockets
 
 
 def mat_list_to_rand(cs):
+    """Get the sockets to randomise per material
+
+    Each socket is listed once, under the material that owns it. A
+    socket inside a node group shared by several materials is owned by
+    the first material (in the collection's order) that selects it for
+    randomisation: it is randomised once, with the properties set in
+    that material, and the change applies to all the materials using
+    the node group.
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene
+
+    Returns
+    -------
+    tuple
+        list of material names, and list of sockets to randomise
+        per material name
+    """
+    # synchronise the collections first, if the Blender data
+    # was edited since the last sync
+    if cs.socket_props_per_material.sync_collections():
+        print("Collection of materials updated")
+
     list_subpanel_material_names = [
         mat.name
         for mat in cs.socket_props_per_material.collection
@@ -10,14 +36,10 @@ def mat_list_to_rand(cs):
 
     # for every material: save sockets to randomise
     sockets_to_randomise_per_material = {}
+    map_socket_to_owner = {}
     for mat_str in list_subpanel_material_names:
         # get collection of socket properties for this material
         # ATT socket properties do not include the actual socket object
-        if cs.socket_props_per_material.collection[
-            mat_str
-        ].update_sockets_collection:
-            print("Collection of material sockets updated")
-
         sockets_props_collection = cs.socket_props_per_material.collection[
             mat_str
         ].collection
@@ -31,18 +53,22 @@ def mat_list_to_rand(cs):
         # modify socket props to set toggle to False
         sockets_to_randomise_per_material[mat_str] = []
         for sckt in candidate_sockets:
+            # sockets replaced by Attribute nodes are randomised
+            # per object, not from the material
+            if node_rewrite.is_rewritten(sckt):
+                continue
+
             # get socket identifier sting
-            sckt_id = sckt.node.name + "_" + sckt.name
-            if sckt.node.id_data.name in bpy.data.node_groups:
-                sckt_id = sckt.node.id_data.name + "_" + sckt_id
+            sckt_id = socket_ids.get_material_socket_id(sckt)
+            sckt_props = socket_ids.get_socket_props(
+                ("MATERIAL", mat_str), sockets_props_collection, sckt_id
+            )
 
             # if this socket is selected to randomise but it is unlinked:
             # set randomisation toggle to False
-            if (not sckt.is_linked) and (
-                sockets_props_collection[sckt_id].bool_randomise
-            ):
+            if (not sckt.is_linked) and (sckt_props.bool_randomise):
                 setattr(
-                    sockets_props_collection[sckt_id],
+                    sckt_props,
                     "bool_randomise",
                     False,
                 )
@@ -53,14 +79,28 @@ def mat_list_to_rand(cs):
 
             # after modifying randomisation toggle
             # save list of sockets to randomise to dict,
-            # with key = material
-            if sockets_props_collection[sckt_id].bool_randomise:
+            # with key = material (sockets in shared node groups are
+            # only saved under the first material that selects them)
+            sckt_key = get_socket_target_key(sckt, mat_str)
+            if sckt_props.bool_randomise and (
+                sckt_key not in map_socket_to_owner
+            ):
+                map_socket_to_owner[sckt_key] = mat_str
                 sockets_to_randomise_per_material[mat_str].append(sckt)
 
+    report_shared_sockets(
+        map_socket_to_owner, socket_ids.get_cached_materials_per_socket(cs)
+    )
+
     return list_subpanel_material_names, sockets_to_randomise_per_material
 
 
 def geom_list_to_rand(cs):
+    # synchronise the collections first, if the Blender data
+    # was edited since the last sync
+    if cs.socket_props_per_gng.sync_collections():
+        print("Collection of Geometry Node Groups updated")
+
     list_subpanel_gng_names = [
         gng.name for gng in cs.socket_props_per_gng.collection
     ]
@@ -69,11 +109,6 @@ def geom_list_to_rand(cs):
     for gng_str in list_subpanel_gng_names:
         # get collection of socket properties for this GNG
         # ATT socket properties do not include the actual socket object
-        if cs.socket_props_per_gng.collection[
-            gng_str
-        ].update_sockets_collection:
-            print("Collection of geometry sockets updated")
-
         sockets_props_collection = cs.socket_props_per_gng.collection[
             gng_str
         ].collection
@@ -87,16 +122,22 @@ def geom_list_to_rand(cs):
         # modify socket props to set toggle to False
         sockets_to_randomise_per_gng[gng_str] = []
         for sckt in candidate_sockets:
+            # sockets replaced by Random Value nodes are randomised
+            # in the graph, not from Python
+            if node_rewrite.is_rewritten(sckt):
+                continue
+
             # get socket identifier string
-            sckt_id = sckt.node.name + "_" + sckt.name
+            sckt_id = socket_ids.get_geometry_socket_id(sckt)
+            sckt_props = socket_ids.get_socket_props(
+                ("GEOMETRY", gng_str), sockets_props_collection, sckt_id
+            )
 
             # if this socket is selected to randomise but it is unlinked:
             # set randomisation toggle to False
-            if (not sckt.is_linked) and (
-                sockets_props_collection[sckt_id].bool_randomise
-            ):
+            if (not sckt.is_linked) and (sckt_props.bool_randomise):
                 setattr(
-                    sockets_props_collection[sckt_id],
+                    sckt_props,
                     "bool_randomise",
                     False,
                 )
@@ -108,7 +149,7 @@ def geom_list_to_rand(cs):
             # after modifying randomisation toggle
             # save list of sockets to randomise to dict,
             # with key = material
-            if sockets_props_collection[sckt_id].bool_randomise:
+            if sckt_props.bool_randomise:
                 sockets_to_randomise_per_gng[gng_str].append(sckt)
 
     return sockets_to_randomise_per_gng
@@ -0,0 +1,125 @@
+import numpy as np
+
+# -------------------------------
+# Noise distributions
+# -------------------------------
+# - UNIFORM: noise between -amplitude and +amplitude
+# - NORMAL: Gaussian noise with the amplitude as standard deviation
+UNIFORM = "UNIFORM"
+NORMAL = "NORMAL"
+
+
+# -------------------------------
+# Buffers
+# -------------------------------
+class NoiseBuffers:
+    """Preallocated float32 buffers for the noise of one mesh data layer
+
+    The buffers hold the original values of the layer (base), the noise
+    drawn (noise) and their sum (out), each as a contiguous array of
+    shape (number of items, number of components). They are allocated
+    once and reused every time the layer is randomised, so randomising
+    a layer does not allocate memory proportional to its size.
+
+    Parameters
+    ----------
+    n_items : int
+        number of items in the layer (e.g. vertices or loops)
+    n_components : int
+        number of components per item (e.g. 3 for positions)
+    """
+
+    def __init__(self, n_items, n_components):
+        self.base = np.empty((n_items, n_components), dtype=np.float32)
+        self.noise = np.empty_like(self.base)
+        self.out = np.empty_like(self.base)
+
+        # True once noise was added to the base values into out
+        self.has_output = False
+
+    @property
+    def shape(self):
+        return self.base.shape
+
+    def matches(self, n_items, n_components):
+        """Check if the buffers fit a layer of the given size
+
+        Parameters
+        ----------
+        n_items : int
+            number of items in the layer
+        n_components : int
+            number of components per item
+
+        Returns
+        -------
+        bool
+            True if the buffers have the shape of the layer
+        """
+        return self.shape == (n_items, n_components)
+
+    def rebase_if_edited(self, current):
+        """Take the current values of the layer as its base values, if
+        they are not the values last written to it
+
+        If the layer was edited since it was last randomised (e.g. by
+        the user), its current values are its new original values.
+
+        Parameters
+        ----------
+        current : numpy.ndarray
+            current values of the layer, of the shape of the buffers
+
+        Returns
+        -------
+        bool
+            True if the base values were replaced
+        """
+        if (not self.has_output) or np.array_equal(current, self.out):
+            return False
+
+        self.base[:] = current
+        self.has_output = False
+        return True
+
+
+def add_noise(generator, buffers, amplitude, distribution=UNIFORM):
+    """Add a noise field to the base values of a layer
+
+    The noise is drawn directly into the noise buffer and added to the
+    base values into the out buffer, with no intermediate arrays.
+
+    Parameters
+    ----------
+    generator : numpy.random.Generator
+        random number generator
+    buffers : NoiseBuffers
+        buffers of the layer, with the base values already read
+    amplitude : array_like
+        amplitude of the noise, per component (or a single value for
+        all components)
+    distribution : str, optional
+        UNIFORM or NORMAL, by default UNIFORM
+
+    Returns
+    -------
+    numpy.ndarray
+        the out buffer, with the base values plus noise
+    """
+    amplitude = np.asarray(amplitude, dtype=np.float32)
+
+    if distribution == UNIFORM:
+        # uniform in [0, 1) mapped to [-amplitude, amplitude)
+        generator.random(dtype=np.float32, out=buffers.noise)
+        buffers.noise *= 2
+        buffers.noise -= 1
+    elif distribution == NORMAL:
+        generator.standard_normal(dtype=np.float32, out=buffers.noise)
+    else:
+        raise ValueError(f"Unknown noise distribution: {distribution}")
+
+    buffers.noise *= amplitude
+    np.add(buffers.base, buffers.noise, out=buffers.out)
+    buffers.has_output = True
+
+    return buffers.out
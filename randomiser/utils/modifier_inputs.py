@@ -0,0 +1,322 @@
+import bpy
+import numpy as np
+
+from .. import config
+from . import input_bounds, rng
+from .node_groups import get_modifier_linked_to_gng
+
+# Kind of parameter and number of components, per type of input socket
+# (subtypes, e.g. NodeSocketFloatDistance, share the kind of their type)
+MAP_SOCKET_IDNAME_TO_KIND = {
+    "NodeSocketFloat": (rng.UNIFORM, 1),
+    "NodeSocketInt": (rng.INTEGER, 1),
+    "NodeSocketBool": (rng.CHOICE, 1),
+    "NodeSocketVector": (rng.UNIFORM, 3),
+}
+
+
+# -------------------------------
+# Inputs to randomise
+# -------------------------------
+class ModifierInput:
+    """An input of a geometry node group (GNG), exposed on the
+    modifiers linked to it, selected for randomisation
+
+    Parameters
+    ----------
+    identifier : str
+        identifier of the input (its key in the modifiers, e.g. Input_2)
+    name : str
+        name of the input
+    kind : str
+        kind of parameter, as defined in utils.rng
+    min_val : numpy.ndarray
+        min value per component
+    max_val : numpy.ndarray
+        max value per component
+    """
+
+    def __init__(self, identifier, name, kind, min_val, max_val):
+        self.identifier = identifier
+        self.name = name
+        self.kind = kind
+        self.min_val = min_val
+        self.max_val = max_val
+
+    @property
+    def n_dims(self):
+        """Number of components of the input"""
+        return self.min_val.size
+
+
+def get_gng_inputs(gng):
+    """Get the input sockets of the interface of a node group
+
+    Parameters
+    ----------
+    gng : bpy.types.GeometryNodeTree
+        geometry node group
+
+    Returns
+    -------
+    list
+        input sockets of the interface
+    """
+    # Blender 4.0 replaced the inputs of node groups with an interface
+    if hasattr(gng, "interface"):
+        return [
+            item
+            for item in gng.interface.items_tree
+            if item.item_type == "SOCKET" and item.in_out == "INPUT"
+        ]
+    return list(gng.inputs)
+
+
+def get_gng_inputs_to_randomise(
+    gng, node2randomise_prefix=config.DEFAULT_RANDOM_KEYWORD
+):
+    """Get the inputs of a geometry node group that can be randomised
+    per object
+
+    These are the inputs whose name starts with node2randomise_prefix
+    (case insensitive), of a type that can be randomised.
+
+    Parameters
+    ----------
+    gng : bpy.types.GeometryNodeTree
+        geometry node group
+    node2randomise_prefix : str, optional
+        prefix that identifies the inputs to randomise, by default 'random'
+
+    Returns
+    -------
+    list
+        list of (input socket of the interface, kind, number of
+        components, attribute holding its min/max values) tuples
+    """
+    list_inputs = []
+    for in_socket in get_gng_inputs(gng):
+        if not in_socket.name.lower().startswith(
+            node2randomise_prefix.lower()
+        ):
+            continue
+
+        for idname, (kind, n_dims) in MAP_SOCKET_IDNAME_TO_KIND.items():
+            if in_socket.bl_socket_idname.startswith(idname):
+                break
+        else:
+            continue
+
+        attr_str = config.MAP_SOCKET_TYPE_TO_ATTR[getattr(bpy.types, idname)]
+        list_inputs.append((in_socket, kind, n_dims, attr_str))
+    return list_inputs
+
+
+def get_inputs_to_randomise(gng, inputs_props_collection):
+    """Get the inputs of a geometry node group to randomise per object
+
+    The inputs are sampled between the min and max values set for them
+    in the geometry panel (see
+    geometry.property_classes.collection_geom_socket_properties).
+    Inputs whose bounds are still at the default limits of their type
+    are skipped and reported.
+
+    Parameters
+    ----------
+    gng : bpy.types.GeometryNodeTree
+        geometry node group
+    inputs_props_collection : _type_
+        collection of properties of the GNG's inputs, per identifier
+
+    Returns
+    -------
+    list
+        list of ModifierInput objects
+    """
+    list_inputs = []
+    for in_socket, kind, _, attr_str in get_gng_inputs_to_randomise(gng):
+        input_props = inputs_props_collection.get(in_socket.identifier)
+        if (input_props is None) or (not input_props.bool_randomise):
+            continue
+
+        min_val = np.array(getattr(input_props, "min_" + attr_str), float)
+        max_val = np.array(getattr(input_props, "max_" + attr_str), float)
+        if input_bounds.is_unbounded(kind, min_val, max_val):
+            print(
+                f"Input {in_socket.name} from {gng.name} is unbounded:",
+                "set its min and max values to randomise it per object",
+            )
+            continue
+
+        list_inputs.append(
+            ModifierInput(
+                in_socket.identifier,
+                in_socket.name,
+                kind,
+                min_val,
+                max_val,
+            )
+        )
+    return list_inputs
+
+
+def get_modifiers_per_gng(cs):
+    """Get the modifiers linked to each geometry node group with
+    inputs to randomise
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene whose objects' modifiers are randomised
+
+    Returns
+    -------
+    list
+        list of (inputs to randomise, modifiers) tuples, one per
+        geometry node group linked to a modifier
+    """
+    list_gngs = [
+        gng
+        for gng in bpy.data.node_groups
+        if gng.type == "GEOMETRY" and gng.users > 0
+    ]
+
+    list_inputs_and_mods = []
+    for gng in list_gngs:
+        gng_props = cs.socket_props_per_gng.collection.get(gng.name)
+        if gng_props is None:
+            continue
+
+        list_inputs = get_inputs_to_randomise(gng, gng_props.modifier_inputs)
+        if not list_inputs:
+            continue
+
+        list_mods = []
+        for obj in cs.objects:
+            mod = get_modifier_linked_to_gng(gng.name, obj)
+            if mod is not None:
+                list_mods.append(mod)
+
+        if list_mods:
+            list_inputs_and_mods.append((list_inputs, list_mods))
+    return list_inputs_and_mods
+
+
+# -------------------------------
+# Bulk write
+# -------------------------------
+def convert_values(kind, values):
+    """Convert drawn values to the type of the modifier inputs
+
+    Parameters
+    ----------
+    kind : str
+        kind of parameter, as defined in utils.rng
+    values : numpy.ndarray
+        drawn values
+
+    Returns
+    -------
+    numpy.ndarray
+        values as floats, integers or booleans
+    """
+    if kind == rng.INTEGER:
+        return np.rint(values).astype(int)
+    elif kind == rng.CHOICE:
+        return np.asarray(values).astype(bool)
+    return np.asarray(values, dtype=float)
+
+
+def set_modifier_inputs(list_mods, list_inputs, values):
+    """Set the inputs of several modifiers, one row of values per modifier
+
+    The values of each input are converted to Python values with a
+    single call, and set on every modifier.
+
+    Parameters
+    ----------
+    list_mods : list
+        modifiers linked to the same geometry node group
+    list_inputs : list
+        ModifierInput objects, all of the same kind
+    values : numpy.ndarray
+        array of shape (number of modifiers, number of components of
+        all the inputs)
+    """
+    col = 0
+    for modifier_input in list_inputs:
+        n = modifier_input.n_dims
+        input_values = convert_values(
+            modifier_input.kind, values[:, col : col + n]
+        )
+        col += n
+
+        if n == 1:
+            input_values = input_values[:, 0]
+        for mod, value in zip(list_mods, input_values.tolist()):
+            mod[modifier_input.identifier] = value
+
+    # changes to modifier inputs are not tagged automatically
+    for obj in {mod.id_data for mod in list_mods}:
+        obj.update_tag()
+
+
+def randomise_modifier_inputs(cs, generator):
+    """Randomise the inputs of the geometry nodes modifiers of
+    the objects of a scene, with different values per object
+
+    The values of all the modifiers linked to a node group are drawn
+    as one block per kind of input (one row per modifier).
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene whose objects' modifiers are randomised
+    generator : numpy.random.Generator
+        random number generator
+    """
+    for list_inputs, list_mods in get_modifiers_per_gng(cs):
+        map_kind_to_inputs = {}
+        for modifier_input in list_inputs:
+            map_kind_to_inputs.setdefault(modifier_input.kind, []).append(
+                modifier_input
+            )
+
+        for kind, list_inputs_kind in map_kind_to_inputs.items():
+            values = rng.draw_block(
+                generator,
+                kind,
+                np.concatenate([i.min_val for i in list_inputs_kind]),
+                np.concatenate([i.max_val for i in list_inputs_kind]),
+                len(list_mods),
+            )
+            set_modifier_inputs(list_mods, list_inputs_kind, values)
+
+
+def set_modifier_targets(list_targets, values):
+    """Set a block of modifier inputs at once
+
+    Setter for the modifier inputs recorded per object (see
+    random_all.sampling.get_modifier_input_targets), all of the same
+    kind.
+
+    Parameters
+    ----------
+    list_targets : list
+        ParamTarget objects, each with a modifier as owner and an
+        input as custom property
+    values : numpy.ndarray
+        values of all the components of the parameters
+    """
+    values = convert_values(list_targets[0].kind, np.ravel(values)).tolist()
+
+    col = 0
+    for target in list_targets:
+        n = target.n_dims
+        target.owner[target.custom_key] = (
+            values[col] if n == 1 else values[col : col + n]
+        )
+        col += n
+
+    for obj in {target.owner.id_data for target in list_targets}:
+        obj.update_tag()
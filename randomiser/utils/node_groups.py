@@ -1,5 +1,7 @@
 import bpy
 
+from . import change_tracking
+
 
 # ---------------------------
 # GNGs linked to modifiers
@@ -64,31 +66,224 @@ def get_modifier_linked_to_gng(gng_name, context_active_object):
 
 
 # ------------------------------------
-# Navigating node tree of node groups
+# Node group hierarchy index
 # ------------------------------------
+def get_id_key(node_group):
+    """Get a hashable key for a node group or a material
 
+    Node groups and materials may share names, so the key includes
+    the kind of data-block.
 
-def get_node_group_parent_of_node_group(node_group):
-    # input node group could be a material, in which case the
-    # node group parent is none
-    parent_ng = None
+    Parameters
+    ----------
+    node_group : _type_
+        node group, material or None
 
-    if node_group is not None and (type(node_group) != bpy.types.Material):
-        list_all_ngs = [
-            gr for gr in bpy.data.node_groups if gr.type == node_group.type
-        ]
+    Returns
+    -------
+    tuple or None
+        kind and name of the data-block, or None if the input is None
+    """
+    if node_group is None:
+        return None
+    elif type(node_group) is bpy.types.Material:
+        return ("MATERIAL", node_group.name)
+    else:
+        return ("NODE_GROUP", node_group.name)
 
-        for gr in list_all_ngs:
+
+class NodeGroupHierarchy:
+    """Index of the parent, children, root and depth of every node group
+
+    The index is built in one pass over the nodes of all node groups and
+    materials. A node group's parent is the node group of the same type
+    that holds a node linked to it; if there is none, the parent of a
+    shader node group is the material that holds a group node linked to
+    it. A node group whose parent is None has no root and depth 0.
+    """
+
+    def __init__(self):
+        # parent candidates per node group name
+        map_ng_to_ng_parent = {}
+        map_ng_to_mat_parent = {}
+        for gr in bpy.data.node_groups:
             for nd in gr.nodes:
                 if (
                     (hasattr(nd, "node_tree"))
                     and (hasattr(nd.node_tree, "name"))
-                    and (nd.node_tree.name == node_group.name)
+                    and (nd.node_tree.type == gr.type)
                 ):
-                    parent_ng = gr
-                    break
+                    map_ng_to_ng_parent[nd.node_tree.name] = gr
 
-    return parent_ng  # immediate parent
+        for mat in bpy.data.materials:
+            if not mat.use_nodes:
+                continue
+            for nd in mat.node_tree.nodes:
+                if (
+                    (nd.type == "GROUP")
+                    and (hasattr(nd, "node_tree"))
+                    and (hasattr(nd.node_tree, "name"))
+                ):
+                    map_ng_to_mat_parent[nd.node_tree.name] = mat
+
+        # immediate parent and children
+        self.map_ng_to_parent = {}
+        self.map_parent_to_children = {}
+        for gr in bpy.data.node_groups:
+            parent = map_ng_to_ng_parent.get(gr.name)
+            if (parent is None) and (gr.type == "SHADER"):
+                parent = map_ng_to_mat_parent.get(gr.name)
+
+            self.map_ng_to_parent[gr.name] = parent
+            self.map_parent_to_children.setdefault(
+                get_id_key(parent), []
+            ).append(gr)
+
+        # root and depth, walking up from each node group
+        self.map_ng_to_root_and_depth = {}
+        for gr in bpy.data.node_groups:
+            self.map_ng_to_root_and_depth[gr.name] = self._walk_to_root(gr)
+
+        # inner node groups per root, in the order of bpy.data.node_groups
+        self.map_root_to_inner_ngs = {}
+        for gr in bpy.data.node_groups:
+            root_key = get_id_key(self.map_ng_to_root_and_depth[gr.name][0])
+            self.map_root_to_inner_ngs.setdefault(root_key, []).append(gr)
+
+    def _walk_to_root(self, node_group):
+        parent = self.map_ng_to_parent[node_group.name]
+        if parent is None:
+            return (None, 0)
+
+        depth = 1
+        # a material has no parent; the depth is bounded in case
+        # of a cycle
+        while (
+            type(parent) is not bpy.types.Material
+            and self.map_ng_to_parent.get(parent.name) is not None
+            and depth <= len(self.map_ng_to_parent)
+        ):
+            root_and_depth = self.map_ng_to_root_and_depth.get(parent.name)
+            if root_and_depth is not None:
+                return (root_and_depth[0], depth + root_and_depth[1])
+            parent = self.map_ng_to_parent[parent.name]
+            depth += 1
+
+        return (parent, depth)
+
+    def get_parent(self, node_group):
+        """Get the immediate parent of a node group (None for a material)"""
+        if (node_group is None) or (type(node_group) is bpy.types.Material):
+            return None
+        return self.map_ng_to_parent.get(node_group.name)
+
+    def get_children(self, node_group):
+        """Get the node groups whose immediate parent is the input node
+        group or material"""
+        return self.map_parent_to_children.get(get_id_key(node_group), [])
+
+    def get_root_and_depth(self, node_group):
+        """Get the root parent and depth of a node group"""
+        if (node_group is None) or (type(node_group) is bpy.types.Material):
+            return (None, 0)
+        return self.map_ng_to_root_and_depth.get(node_group.name, (None, 0))
+
+    def get_inner_ngs(self, root_parent_node_group):
+        """Get the node groups whose root parent is the input one"""
+        return self.map_root_to_inner_ngs.get(
+            get_id_key(root_parent_node_group), []
+        )
+
+
+# hierarchy index, rebuilt when the tracked data changes
+_hierarchy = None
+_hierarchy_version = None
+
+
+def get_hierarchy():
+    """Get the node group hierarchy index, rebuilding it only if
+    the tracked data changed since it was last built
+
+    Returns
+    -------
+    NodeGroupHierarchy
+        hierarchy index of all node groups
+    """
+    global _hierarchy, _hierarchy_version
+    if (_hierarchy is None) or (
+        _hierarchy_version != change_tracking.get_version()
+    ):
+        _hierarchy = NodeGroupHierarchy()
+        _hierarchy_version = change_tracking.get_version()
+
+    return _hierarchy
+
+
+# ------------------------------------
+# Subtrees of node trees
+# ------------------------------------
+# nested node groups per node group name, rebuilt when the tracked
+# data changes
+_map_ng_to_subtree = {}
+_subtree_version = None
+
+
+def get_ngs_in_subtree(node_tree):
+    """Get the node groups nested at any depth inside a node tree
+
+    The subtree is traversed depth-first following only group nodes, so
+    the cost scales with the size of the input node tree's subtree rather
+    than with the number of node groups in the file. The subtree of every
+    node group visited is cached, so node groups shared by several node
+    trees (e.g. a library of shader node groups used by many materials)
+    are only traversed once.
+
+    Parameters
+    ----------
+    node_tree : _type_
+        node tree to traverse (e.g. the node tree of a material, or
+        a node group)
+
+    Returns
+    -------
+    dict
+        node groups in the subtree, by name, in depth-first order
+    """
+    global _subtree_version
+    if _subtree_version != change_tracking.get_version():
+        _map_ng_to_subtree.clear()
+        _subtree_version = change_tracking.get_version()
+
+    map_name_to_ng = {}
+    for nd in node_tree.nodes:
+        if (
+            (nd.type == "GROUP")
+            and (hasattr(nd, "node_tree"))
+            and (hasattr(nd.node_tree, "name"))
+        ):
+            inner_ng = nd.node_tree
+            if inner_ng.name not in _map_ng_to_subtree:
+                # mark as visited before traversing, in case of a cycle
+                _map_ng_to_subtree[inner_ng.name] = {}
+                _map_ng_to_subtree[inner_ng.name] = get_ngs_in_subtree(
+                    inner_ng
+                )
+            map_name_to_ng[inner_ng.name] = inner_ng
+            map_name_to_ng.update(_map_ng_to_subtree[inner_ng.name])
+
+    return map_name_to_ng
+
+
+# ------------------------------------
+# Navigating node tree of node groups
+# ------------------------------------
+def get_node_group_parent_of_node_group(node_group):
+    # input node group could be a material, in which case the
+    # node group parent is none
+    parent = get_hierarchy().get_parent(node_group)
+    if type(parent) is bpy.types.Material:
+        return None
+    return parent  # immediate parent
 
 
 def get_parent_of_gng(
@@ -138,38 +333,13 @@ def get_parent_of_sng(node_group):
     """
     # the parent of a SNG can be another SNG, a Material, or None
     # input node group could be a material, in which case the parent is none
-
-    # check if parent is a node group
-    parent_sng = get_node_group_parent_of_node_group(node_group)
-
-    # if the input node group is NOT a material:
-    # check further if parent is a material
-    if (
-        (parent_sng is None)
-        and (node_group is not None)
-        and (type(node_group) is not bpy.types.Material)
-    ):
-        list_all_materials = [
-            mat for mat in bpy.data.materials if mat.use_nodes
-        ]
-        for mat in list_all_materials:
-            for nd in mat.node_tree.nodes:
-                if (
-                    (nd.type == "GROUP")
-                    and (hasattr(nd, "node_tree"))
-                    and (hasattr(nd.node_tree, "name"))
-                    and (nd.node_tree.name == node_group.name)
-                ):
-                    parent_sng = mat
-                    break
-
-    return parent_sng  # immediate parent
+    return get_hierarchy().get_parent(node_group)  # immediate parent
 
 
 def get_parent_of_ng(node_group):
     # Select the function to compute the parent of the
     # node group based on the node group type
-    if (type(node_group) == bpy.types.Material) or (
+    if (type(node_group) is bpy.types.Material) or (
         node_group.type == "SHADER"
     ):
         return get_parent_of_sng(node_group)
@@ -181,17 +351,7 @@ def get_root_and_depth_of_ng(node_group):
     # compute root node group: this is the node group in
     # the path whose parent is None. For shader node groups,
     # it will be the material
-    parent = get_parent_of_ng(node_group)
-    depth = 0
-    if parent is None:
-        return (parent, depth)
-    else:
-        depth = 1
-        while get_parent_of_ng(parent) is not None:
-            depth += 1
-            parent = get_parent_of_ng(parent)
-
-    return (parent, depth)
+    return get_hierarchy().get_root_and_depth(node_group)
 
 
 def get_map_inner_ngs_given_roots(
@@ -209,15 +369,12 @@ def get_map_inner_ngs_given_roots(
     list_candidate_root_node_groups : _type_
         list of node groups
     """
-    list_node_groups = [
-        gr for gr in bpy.data.node_groups  # if gr.type == "GEOMETRY"
-    ]
+    hierarchy = get_hierarchy()
 
     map_node_group_to_root = {}
-    for gr in list_node_groups:
-        root_parent, depth = get_root_and_depth_of_ng(gr)
-        if root_parent in list_candidate_roots:
-            map_node_group_to_root[gr] = (root_parent, depth)  # tuple
+    for root in list_candidate_roots:
+        for gr in hierarchy.get_inner_ngs(root):
+            map_node_group_to_root[gr] = hierarchy.get_root_and_depth(gr)
 
     return map_node_group_to_root
 
@@ -240,18 +397,14 @@ def get_path_to_ng(node_group):
     path_to_ng: list
         a list of parent geometry group nodes up to the input one
     """
-    parent = get_parent_of_ng(node_group)
-    if parent is None:
-        path_to_ng = []  # why empty rather than [None]?
-    else:
-        path_to_ng = [parent]
-        while get_parent_of_ng(parent) is not None:
-            parent = get_parent_of_ng(parent)
-            path_to_ng.append(parent)
-
-        path_to_ng.reverse()
-
-    path_to_ng.append(node_group)
+    hierarchy = get_hierarchy()
+    path_to_ng = [node_group]
+    parent = hierarchy.get_parent(node_group)
+    while parent is not None:
+        path_to_ng.append(parent)
+        parent = hierarchy.get_parent(parent)
+
+    path_to_ng.reverse()
     return path_to_ng
 
 
@@ -274,13 +427,14 @@ def get_max_depth_of_root(root_parent_node_group):
         the depth of the innermost node group
         for this root parent node group
     """
-    map_inner_ngs = get_map_inner_ngs_given_roots([root_parent_node_group])
-
-    max_depth = 0
-    if map_inner_ngs:
-        max_depth = max([v[1] for _, v in map_inner_ngs.items()])
-
-    return max_depth
+    hierarchy = get_hierarchy()
+    return max(
+        (
+            hierarchy.get_root_and_depth(gr)[1]
+            for gr in hierarchy.get_inner_ngs(root_parent_node_group)
+        ),
+        default=0,
+    )
 
 
 # ------------------------------------
@@ -310,7 +464,7 @@ def get_selectable_node_for_ng(node_group):
         # get full list of nodes under the parent
         # parent can be a group node (for shader or geometry nodes)
         # or a Material (for shader nodes)
-        if type(parent_node_group) != bpy.types.Material:
+        if type(parent_node_group) is not bpy.types.Material:
             list_nodes_under_parent = parent_node_group.nodes
         else:
             list_nodes_under_parent = parent_node_group.node_tree.nodes
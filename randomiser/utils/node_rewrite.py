@@ -0,0 +1,401 @@
+import re
+import zlib
+
+import bpy
+import numpy as np
+
+# -------------------------------
+# Markers of rewritten sockets
+# -------------------------------
+# Custom property of an input node mapping the identifier of each of
+# its rewritten output sockets to the node replacing it (a Random Value
+# node in geometry node groups, or an Attribute node in materials)
+REWRITE_KEY = "randomiser_in_graph"
+
+# Name of the node providing the frame to the Random Value nodes
+# in a node group (it must not start with the random keyword, so that
+# it is not listed as a node to randomise)
+FRAME_NODE_NAME = "In-graph randomisation frame"
+
+# Data type of the Random Value node replacing each type of socket
+MAP_SOCKET_TYPE_TO_DATA_TYPE = {
+    bpy.types.NodeSocketFloat: "FLOAT",
+    bpy.types.NodeSocketVector: "FLOAT_VECTOR",
+    bpy.types.NodeSocketInt: "INT",
+    bpy.types.NodeSocketBool: "BOOLEAN",
+}
+
+# Identifiers of the min input, max input and output sockets of the
+# Random Value node, per data type (booleans are drawn with a
+# probability instead of min/max values)
+MAP_DATA_TYPE_TO_SOCKET_IDS = {
+    "FLOAT_VECTOR": ("Min", "Max", "Value"),
+    "FLOAT": ("Min_001", "Max_001", "Value_001"),
+    "INT": ("Min_002", "Max_002", "Value_002"),
+    "BOOLEAN": (None, None, "Value_003"),
+}
+
+
+# Output of the Attribute node replacing each type of material socket
+MAP_SOCKET_TYPE_TO_ATTRIBUTE_OUTPUT = {
+    bpy.types.NodeSocketFloat: "Fac",
+    bpy.types.NodeSocketVector: "Vector",
+    bpy.types.NodeSocketColor: "Color",
+}
+
+# Prefix of the names of the object attributes holding values
+# randomised per object
+ATTRIBUTE_PREFIX = "randomiser_"
+
+
+def get_socket_by_identifier(sockets, identifier):
+    """Get a socket by its identifier
+
+    Sockets of nodes with several data types (e.g. Random Value) share
+    names, but not identifiers.
+
+    Parameters
+    ----------
+    sockets : _type_
+        input or output sockets of a node
+    identifier : str
+        identifier of the socket
+
+    Returns
+    -------
+    bpy.types.NodeSocket
+        socket with that identifier
+    """
+    return next(s for s in sockets if s.identifier == identifier)
+
+
+def get_seed_offset(param_id):
+    """Get the offset added to the global seed for a parameter
+
+    Parameters
+    ----------
+    param_id : str
+        unique identifier of the parameter
+
+    Returns
+    -------
+    int
+        offset, small enough to add to the seed as a 32-bit integer
+    """
+    return zlib.crc32(param_id.encode()) % 2**30
+
+
+def is_rewritten(sckt):
+    """Check if an input node's socket was replaced by another node
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    bool
+        True if the socket was rewritten
+    """
+    return sckt.identifier in sckt.node.get(REWRITE_KEY, {})
+
+
+def get_replacement_node(sckt):
+    """Get the node replacing a rewritten socket
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    bpy.types.Node or None
+        node replacing the socket, or None if the socket was not
+        rewritten (or the node was deleted)
+    """
+    if not is_rewritten(sckt):
+        return None
+    node_name = sckt.node[REWRITE_KEY][sckt.identifier]
+    return sckt.node.id_data.nodes.get(node_name)
+
+
+# -------------------------------
+# Rewrite
+# -------------------------------
+def replace_socket(sckt, new_node, out_socket):
+    """Move the links from an input node's socket to another node's output,
+    and mark the socket as rewritten
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+    new_node : bpy.types.Node
+        node replacing the input node's socket
+    out_socket : bpy.types.NodeSocket
+        output socket of new_node taking the links
+    """
+    node_tree = sckt.node.id_data
+    new_node.location = sckt.node.location
+    new_node.location.y -= 200
+
+    for to_socket in [link.to_socket for link in sckt.links]:
+        node_tree.links.new(out_socket, to_socket)
+
+    if REWRITE_KEY not in sckt.node:
+        sckt.node[REWRITE_KEY] = {}
+    sckt.node[REWRITE_KEY][sckt.identifier] = new_node.name
+
+
+def get_frame_node(node_tree):
+    """Get the Scene Time node of a node group, adding it if needed
+
+    Parameters
+    ----------
+    node_tree : bpy.types.GeometryNodeTree
+        node group
+
+    Returns
+    -------
+    bpy.types.Node
+        Scene Time node
+    """
+    frame_node = node_tree.nodes.get(FRAME_NODE_NAME)
+    if frame_node is None:
+        frame_node = node_tree.nodes.new("GeometryNodeInputSceneTime")
+        frame_node.name = FRAME_NODE_NAME
+        frame_node.label = FRAME_NODE_NAME
+    return frame_node
+
+
+def add_seed_driver(seed_socket, scene, seed_offset):
+    """Drive the seed of a Random Value node from the scene seed
+
+    The driver is a simple expression, which Blender evaluates without
+    running Python.
+
+    Parameters
+    ----------
+    seed_socket : bpy.types.NodeSocket
+        seed input of the Random Value node
+    scene : bpy.types.Scene
+        scene holding the seed properties
+    seed_offset : int
+        offset added to the scene seed
+    """
+    driver = seed_socket.driver_add("default_value").driver
+    driver.type = "SCRIPTED"
+    var = driver.variables.new()
+    var.name = "seed"
+    var.type = "SINGLE_PROP"
+    var.targets[0].id_type = "SCENE"
+    var.targets[0].id = scene
+    var.targets[0].data_path = "seed_properties.seed"
+    driver.expression = f"seed + {seed_offset}"
+
+
+def rewrite_socket(sckt, min_val, max_val, param_id, scene):
+    """Replace the output socket of an input node by a Random Value node
+
+    The Random Value node draws a value between min_val and max_val,
+    with the scene frame as ID and the scene seed plus an offset per
+    parameter as seed. The links from the socket are moved to the
+    Random Value node's output, and the input node is kept so that
+    the rewrite can be reverted.
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+    min_val : array_like
+        min value per component
+    max_val : array_like
+        max value per component
+    param_id : str
+        unique identifier of the parameter
+    scene : bpy.types.Scene
+        scene holding the seed properties
+
+    Returns
+    -------
+    dict
+        record of the rewrite (parameter, node, data type, bounds and
+        seed offset)
+    """
+    node_tree = sckt.node.id_data
+    data_type = MAP_SOCKET_TYPE_TO_DATA_TYPE[type(sckt)]
+    min_id, max_id, out_id = MAP_DATA_TYPE_TO_SOCKET_IDS[data_type]
+    min_val = np.atleast_1d(min_val).tolist()
+    max_val = np.atleast_1d(max_val).tolist()
+
+    rand_node = node_tree.nodes.new("FunctionNodeRandomValue")
+    rand_node.data_type = data_type
+    rand_node.label = f"{sckt.node.name} (in-graph)"
+
+    # bounds
+    if data_type == "BOOLEAN":
+        probability = 0.5 if min_val != max_val else float(max_val[0])
+        in_socket = get_socket_by_identifier(rand_node.inputs, "Probability")
+        in_socket.default_value = probability
+    else:
+        for identifier, val in [(min_id, min_val), (max_id, max_val)]:
+            in_socket = get_socket_by_identifier(rand_node.inputs, identifier)
+            in_socket.default_value = (
+                val if data_type == "FLOAT_VECTOR" else val[0]
+            )
+
+    # frame and seed
+    node_tree.links.new(
+        get_frame_node(node_tree).outputs["Frame"],
+        get_socket_by_identifier(rand_node.inputs, "ID"),
+    )
+    seed_offset = get_seed_offset(param_id)
+    add_seed_driver(
+        get_socket_by_identifier(rand_node.inputs, "Seed"), scene, seed_offset
+    )
+
+    # move the links to the Random Value node
+    replace_socket(
+        sckt, rand_node, get_socket_by_identifier(rand_node.outputs, out_id)
+    )
+
+    return {
+        "param_id": param_id,
+        "node_group": node_tree.name,
+        "node": sckt.node.name,
+        "socket": sckt.identifier,
+        "data_type": data_type,
+        "min": min_val,
+        "max": max_val,
+        "seed_offset": seed_offset,
+    }
+
+
+def get_attribute_name(param_id):
+    """Get the name of the object attribute holding a parameter's values
+
+    Parameters
+    ----------
+    param_id : str
+        unique identifier of the parameter
+
+    Returns
+    -------
+    str
+        attribute name, with only letters, digits and underscores
+    """
+    return ATTRIBUTE_PREFIX + re.sub(r"\W", "_", param_id)
+
+
+def rewrite_socket_to_attribute(sckt, attribute_name):
+    """Replace the output socket of a material's input node by an
+    Attribute node reading an object attribute
+
+    The Attribute node reads the attribute from the object being
+    rendered, so each object using the material can have its own value
+    (set as a custom property of the object).
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+    attribute_name : str
+        name of the object attribute
+    """
+    node_tree = sckt.node.id_data
+    attr_node = node_tree.nodes.new("ShaderNodeAttribute")
+    attr_node.attribute_type = "OBJECT"
+    attr_node.attribute_name = attribute_name
+    attr_node.label = f"{sckt.node.name} (per object)"
+
+    replace_socket(
+        sckt,
+        attr_node,
+        attr_node.outputs[MAP_SOCKET_TYPE_TO_ATTRIBUTE_OUTPUT[type(sckt)]],
+    )
+
+
+def get_socket_attribute_name(sckt):
+    """Get the name of the object attribute replacing a material socket
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    str or None
+        name of the attribute, or None if the socket was not replaced
+        by an Attribute node
+    """
+    node = get_replacement_node(sckt)
+    if (node is None) or (node.bl_idname != "ShaderNodeAttribute"):
+        return None
+    return node.attribute_name
+
+
+def revert_socket(sckt):
+    """Set an input node's socket back in place of the node replacing it
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node that was rewritten
+    """
+    node = sckt.node
+    node_tree = node.id_data
+    new_node = get_replacement_node(sckt)
+
+    if new_node is not None:
+        # move the links back to the input node's socket
+        for to_socket in [
+            link.to_socket
+            for out_socket in new_node.outputs
+            for link in out_socket.links
+        ]:
+            node_tree.links.new(sckt, to_socket)
+
+        if new_node.bl_idname == "FunctionNodeRandomValue":
+            get_socket_by_identifier(new_node.inputs, "Seed").driver_remove(
+                "default_value"
+            )
+        node_tree.nodes.remove(new_node)
+
+    del node[REWRITE_KEY][sckt.identifier]
+    if not node[REWRITE_KEY]:
+        del node[REWRITE_KEY]
+
+    # remove the frame node once no Random Value node uses it
+    frame_node = node_tree.nodes.get(FRAME_NODE_NAME)
+    if (frame_node is not None) and not any(
+        REWRITE_KEY in nd for nd in node_tree.nodes
+    ):
+        node_tree.nodes.remove(frame_node)
+
+
+def revert_node_tree(node_tree):
+    """Revert all the rewritten sockets of a node tree
+
+    Parameters
+    ----------
+    node_tree : bpy.types.NodeTree
+        node group, or node tree of a material
+
+    Returns
+    -------
+    int
+        number of sockets reverted
+    """
+    list_sockets = [
+        sckt
+        for nd in node_tree.nodes
+        if REWRITE_KEY in nd
+        for sckt in nd.outputs
+        if is_rewritten(sckt)
+    ]
+    for sckt in list_sockets:
+        revert_socket(sckt)
+    return len(list_sockets)
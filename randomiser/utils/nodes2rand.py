@@ -1,7 +1,7 @@
 import bpy
 
 from .. import config
-from . import node_groups
+from . import change_tracking, node_groups
 
 
 def get_nodes_to_randomise_from_list(
@@ -122,11 +122,13 @@ def get_material_nodes_to_randomise_group(
     # list of nodes for current material
     # belonging to a group; the group can be any levels deep
 
-    # list of inner node groups for this material
-    map_inner_node_groups = node_groups.get_map_inner_ngs_given_roots(
-        [bpy.data.materials[material_str]]
+    # list of inner node groups for this material, found by traversing
+    # only the material's own subtree
+    list_inner_node_groups = list(
+        node_groups.get_ngs_in_subtree(
+            bpy.data.materials[material_str].node_tree
+        ).values()
     )
-    list_inner_node_groups = list(map_inner_node_groups.keys())
 
     # list of all material nodes inside a group
     list_material_nodes_in_groups = []
@@ -203,3 +205,73 @@ def get_geometry_nodes_to_randomise(
     )
 
     return list_input_nodes
+
+
+# -------------------------
+# Cached candidate sockets
+# -------------------------
+# candidate sockets per (kind, name) of collection, with the fingerprint
+# of the node trees they were computed from
+_map_key_to_cached_sockets = {}
+_cache_n_reloads = None
+
+
+def get_node_tree_fingerprint(node_tree):
+    """Get a cheap fingerprint of the structure of a node tree
+
+    The fingerprint changes if nodes or links are added or removed,
+    or if nodes are renamed.
+
+    Parameters
+    ----------
+    node_tree : _type_
+        node tree (a node group or the node tree of a material)
+
+    Returns
+    -------
+    tuple
+        session UID of the node tree, number of nodes, number of links
+        and names of the nodes
+    """
+    return (
+        node_tree.session_uid,
+        len(node_tree.nodes),
+        len(node_tree.links),
+        tuple(node_tree.nodes.keys()),
+    )
+
+
+def get_cached_candidate_sockets(key, list_node_trees, get_sockets_fn):
+    """Get the candidate sockets of a collection, recomputing them only
+    if the node trees they come from changed
+
+    Parameters
+    ----------
+    key : tuple
+        identifier of the collection (e.g. ("MATERIAL", material name))
+    list_node_trees : list
+        node trees the candidate sockets are searched in
+    get_sockets_fn : callable
+        function with no arguments that computes the list of candidate
+        sockets
+
+    Returns
+    -------
+    list
+        list of candidate sockets
+    """
+    global _cache_n_reloads
+    # references to sockets are not valid after a reload
+    if _cache_n_reloads != change_tracking.get_n_reloads():
+        _map_key_to_cached_sockets.clear()
+        _cache_n_reloads = change_tracking.get_n_reloads()
+
+    fingerprint = tuple(
+        get_node_tree_fingerprint(nt) for nt in list_node_trees
+    )
+    cached = _map_key_to_cached_sockets.get(key)
+    if (cached is None) or (cached[0] != fingerprint):
+        cached = (fingerprint, get_sockets_fn())
+        _map_key_to_cached_sockets[key] = cached
+
+    return cached[1]
@@ -0,0 +1,221 @@
+import bpy
+import numpy as np
+
+from . import change_tracking, node_rewrite, rng, socket_ids
+from .shared_sockets import get_socket_target_key
+
+# -------------------------------
+# Objects using each material
+# -------------------------------
+# objects per material, recomputed when the tracked data changes
+# (e.g. if a material is assigned to an object)
+_map_material_to_objects = {}
+_objects_version = None
+
+
+def get_objects_using_material(scene, material_str):
+    """Get the objects of a scene with a material in any of their slots
+
+    The objects are cached until the tracked data changes.
+
+    Parameters
+    ----------
+    scene : bpy.types.Scene
+        scene
+    material_str : str
+        name of the material
+
+    Returns
+    -------
+    list
+        objects using the material
+    """
+    global _objects_version
+    if _objects_version != change_tracking.get_version():
+        _map_material_to_objects.clear()
+        _objects_version = change_tracking.get_version()
+
+    key = (scene.name, material_str)
+    if key not in _map_material_to_objects:
+        material = bpy.data.materials.get(material_str)
+        _map_material_to_objects[key] = [
+            obj
+            for obj in scene.objects
+            if any(slot.material == material for slot in obj.material_slots)
+        ]
+    return _map_material_to_objects[key]
+
+
+# -------------------------------
+# Sockets randomised per object
+# -------------------------------
+def get_objects_using_materials(scene, list_materials):
+    """Get the objects of a scene using any of several materials
+
+    Parameters
+    ----------
+    scene : bpy.types.Scene
+        scene
+    list_materials : list
+        names of the materials
+
+    Returns
+    -------
+    list
+        objects using any of the materials, each only once
+    """
+    map_name_to_obj = {}
+    for mat_str in list_materials:
+        for obj in get_objects_using_material(scene, mat_str):
+            map_name_to_obj.setdefault(obj.name, obj)
+    return list(map_name_to_obj.values())
+
+
+def get_attribute_sockets(cs):
+    """Get the material sockets selected for randomisation that were
+    replaced by object attributes
+
+    A socket inside a node group shared by several materials is listed
+    once, with the properties set in the first material that selects
+    it, and applies to the objects using any of those materials.
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene
+
+    Returns
+    -------
+    dict
+        list of (attribute name, min value, max value) tuples per
+        tuple of names of the materials the sockets affect
+    """
+    if cs.socket_props_per_material.sync_collections():
+        print("Collection of materials updated")
+
+    map_socket_to_materials = socket_ids.get_cached_materials_per_socket(cs)
+    map_materials_to_sockets = {}
+    set_sockets_listed = set()
+    for mat in cs.socket_props_per_material.collection:
+        for sckt in mat.candidate_sockets:
+            attribute_name = node_rewrite.get_socket_attribute_name(sckt)
+            sckt_key = get_socket_target_key(sckt, mat.name)
+            if (attribute_name is None) or (sckt_key in set_sockets_listed):
+                continue
+
+            sckt_props = socket_ids.get_socket_props(
+                ("MATERIAL", mat.name),
+                mat.collection,
+                socket_ids.get_material_socket_id(sckt),
+            )
+            if not sckt_props.bool_randomise:
+                continue
+
+            set_sockets_listed.add(sckt_key)
+            attr_str = cs.socket_type_to_attr[type(sckt)]
+            map_materials_to_sockets.setdefault(
+                tuple(map_socket_to_materials[sckt_key]), []
+            ).append(
+                (
+                    attribute_name,
+                    np.atleast_1d(getattr(sckt_props, "min_" + attr_str)),
+                    np.atleast_1d(getattr(sckt_props, "max_" + attr_str)),
+                )
+            )
+    return map_materials_to_sockets
+
+
+def randomise_object_attributes(cs, generator):
+    """Randomise the object attributes read by the materials, with
+    different values per object
+
+    The values of all the attributes of a material (or of the materials
+    sharing a node group), for all the objects using it, are drawn as a
+    single block (one row per object). The values of each attribute are
+    converted to Python values with a single call, and set as custom
+    properties of the objects.
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene
+    generator : numpy.random.Generator
+        random number generator
+    """
+    for list_materials, list_sockets in get_attribute_sockets(cs).items():
+        list_objects = get_objects_using_materials(cs, list_materials)
+        if not list_objects:
+            continue
+
+        values = rng.draw_block(
+            generator,
+            rng.UNIFORM,
+            np.concatenate([min_val for _, min_val, _ in list_sockets]),
+            np.concatenate([max_val for _, _, max_val in list_sockets]),
+            len(list_objects),
+        )
+
+        col = 0
+        for attribute_name, min_val, _ in list_sockets:
+            n = min_val.size
+            attr_values = values[:, col : col + n]
+            col += n
+
+            if n == 1:
+                attr_values = attr_values[:, 0]
+            for obj, value in zip(list_objects, attr_values.tolist()):
+                obj[attribute_name] = value
+
+        # changes to custom properties are not tagged automatically
+        for obj in list_objects:
+            obj.update_tag()
+
+
+def set_attribute_targets(list_targets, values):
+    """Set a block of object attributes at once
+
+    Setter for the object attributes recorded per object (see
+    random_all.sampling.get_attribute_targets).
+
+    Parameters
+    ----------
+    list_targets : list
+        ParamTarget objects, each with an object as owner and an
+        attribute as custom property
+    values : numpy.ndarray
+        values of all the components of the parameters
+    """
+    values = np.ravel(values).astype(float).tolist()
+
+    col = 0
+    for target in list_targets:
+        n = target.n_dims
+        target.owner[target.custom_key] = (
+            values[col] if n == 1 else values[col : col + n]
+        )
+        col += n
+
+    for obj in {target.owner for target in list_targets}:
+        obj.update_tag()
+
+
+def remove_object_attributes(objects):
+    """Remove the attributes randomised per object from some objects
+
+    Parameters
+    ----------
+    objects : _type_
+        objects to clean
+
+    Returns
+    -------
+    int
+        number of attributes removed
+    """
+    n_removed = 0
+    for obj in objects:
+        for key in list(obj.keys()):
+            if key.startswith(node_rewrite.ATTRIBUTE_PREFIX):
+                del obj[key]
+                n_removed += 1
+    return n_removed
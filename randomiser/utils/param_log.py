@@ -0,0 +1,542 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .param_store import ParamStore
+
+# -------------------------------
+# Output formats
+# -------------------------------
+# - JSON: one .json file with all frames, written at the end
+# - JSONL: one line per frame, appended as frames are produced
+# - NPZ: columnar chunks of frames, written every chunk_size frames
+# - STORE: memory-mapped binary store (see utils.param_store)
+JSON = "JSON"
+JSONL = "JSONL"
+NPZ = "NPZ"
+STORE = "STORE"
+
+
+def check_param_ids(path, stored_param_ids, param_ids):
+    """Check that an existing log has the parameters of the current run,
+    before resuming it
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the log
+    stored_param_ids : list or None
+        identifiers of the parameters in the log, or None if they
+        are not known
+    param_ids : list
+        identifiers of the parameters of the current run
+
+    Raises
+    ------
+    ValueError
+        if the parameters or their order differ
+    """
+    if (stored_param_ids is None) or (
+        list(stored_param_ids) != list(param_ids)
+    ):
+        raise ValueError(
+            f"Cannot resume {path}: the log has different parameters "
+            "than the current run (e.g. if the parameters selected for "
+            "randomisation changed). Use a new output path."
+        )
+
+
+# -------------------------------
+# JSON Lines writer
+# -------------------------------
+def read_last_record_jsonl(path, block_size=65536):
+    """Get the last record written to a JSON Lines parameter log
+
+    Only the end of the file is read, one block at a time, so memory
+    use does not grow with the length of the log. An incomplete last
+    line (e.g. if the process writing the log crashed) is removed from
+    the file.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .jsonl log
+    block_size : int, optional
+        number of bytes read at a time from the end of the file,
+        by default 65536
+
+    Returns
+    -------
+    dict or None
+        last complete record in the log, or None if the log is missing
+        or empty
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+
+    with open(path, "r+b") as file_obj:
+        valid_end = file_obj.seek(0, os.SEEK_END)
+        start = valid_end
+        tail = b""
+        while True:
+            # read the previous block
+            block_start = max(0, start - block_size)
+            file_obj.seek(block_start)
+            tail = file_obj.read(start - block_start) + tail
+            start = block_start
+
+            # find the last complete record (the first line may be cut
+            # by the start of the block, unless it is the file's start)
+            lines = tail.splitlines(keepends=True)
+            while len(lines) > (0 if start == 0 else 1):
+                line = lines.pop()
+                try:
+                    record = json.loads(line)
+                    record["frame"]
+                except (
+                    json.JSONDecodeError,
+                    KeyError,
+                    TypeError,
+                    UnicodeDecodeError,
+                ):
+                    valid_end -= len(line)
+                    continue
+
+                file_obj.truncate(valid_end)
+                return record
+
+            tail = b"".join(lines)
+            if start == 0:
+                file_obj.truncate(valid_end)
+                return None
+
+
+def read_last_frame_jsonl(path):
+    """Get the last frame written to a JSON Lines parameter log
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .jsonl log
+
+    Returns
+    -------
+    int or None
+        last frame in the log, or None if the log is missing or empty
+    """
+    record = read_last_record_jsonl(path)
+    return None if record is None else record["frame"]
+
+
+class JSONLParamWriter:
+    """Parameter log writer appending one JSON record per frame
+
+    Each line is a dictionary with the frame number under the key "frame"
+    and the value of each parameter under its identifier. Lines are
+    flushed as they are written, so a partial run keeps all the frames
+    completed so far.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .jsonl log
+    param_ids : list
+        identifiers of the parameters, in the order of the values passed
+        to write_frame
+    resume : bool, optional
+        if True, append to an existing log; otherwise the log is
+        overwritten. By default False
+
+    Raises
+    ------
+    ValueError
+        if resuming a log whose records have different parameters
+    """
+
+    def __init__(self, path, param_ids, resume=False):
+        self.path = Path(path)
+        self.param_ids = list(param_ids)
+        self.last_frame = None
+        if resume:
+            record = read_last_record_jsonl(self.path)
+            if record is not None:
+                frame = record.pop("frame")
+                check_param_ids(self.path, list(record), self.param_ids)
+                self.last_frame = frame
+        self.file_obj = open(self.path, "a" if resume else "w")
+
+    def write_frame(self, frame, values):
+        """Append the values of all parameters at one frame
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+        values : list
+            value of each parameter (numbers or lists of numbers)
+        """
+        record = {"frame": frame}
+        record.update(zip(self.param_ids, values))
+        self.file_obj.write(json.dumps(record) + "\n")
+        self.file_obj.flush()
+
+    def close(self):
+        self.file_obj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# -------------------------------
+# Columnar NPZ writer
+# -------------------------------
+class NPZParamWriter:
+    """Parameter log writer saving frames in columnar .npz chunks
+
+    The log is a directory with a schema.json file describing the
+    parameters, and chunk_<N>.npz files with two arrays: "frames"
+    (one frame number per row) and "values" (one row per frame, with
+    the components of all parameters). A chunk is written every
+    chunk_size frames, so memory use does not grow with the number
+    of frames.
+
+    Parameters
+    ----------
+    dir_path : str or pathlib.Path
+        path to the log directory
+    param_ids : list
+        identifiers of the parameters, in the order of the values passed
+        to write_frame
+    n_dims : list
+        number of components of each parameter
+    chunk_size : int, optional
+        number of frames per chunk, by default 1000
+    resume : bool, optional
+        if True, add chunks to an existing log; otherwise existing chunks
+        are removed. By default False
+
+    Raises
+    ------
+    ValueError
+        if resuming a log with a different schema
+    """
+
+    def __init__(
+        self, dir_path, param_ids, n_dims, chunk_size=1000, resume=False
+    ):
+        self.dir_path = Path(dir_path)
+        self.chunk_size = chunk_size
+        self.dir_path.mkdir(parents=True, exist_ok=True)
+
+        schema = {"param_ids": list(param_ids), "n_dims": list(n_dims)}
+        schema_path = self.dir_path / "schema.json"
+
+        list_chunks = sorted(self.dir_path.glob("chunk_*.npz"))
+        if resume and list_chunks:
+            # the chunks must have the same layout as the new frames
+            stored_schema = {}
+            if schema_path.is_file():
+                with open(schema_path, "r") as in_file_obj:
+                    stored_schema = json.load(in_file_obj)
+            check_param_ids(
+                self.dir_path,
+                stored_schema.get("param_ids"),
+                schema["param_ids"],
+            )
+            if stored_schema.get("n_dims") != schema["n_dims"]:
+                raise ValueError(
+                    f"Cannot resume {self.dir_path}: the log has different "
+                    "numbers of components per parameter than the current "
+                    "run. Use a new output path."
+                )
+
+            self.last_frame = read_last_frame_npz(self.dir_path)
+            self.n_chunks = len(list_chunks)
+        else:
+            for chunk_path in list_chunks:
+                chunk_path.unlink()
+            self.last_frame = None
+            self.n_chunks = 0
+
+            with open(schema_path, "w") as out_file_obj:
+                out_file_obj.write(json.dumps(schema, indent=4))
+
+        self.list_frames = []
+        self.list_rows = []
+
+    def write_frame(self, frame, values):
+        """Buffer the values of all parameters at one frame, and write
+        a chunk if the buffer is full
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+        values : list
+            value of each parameter (numbers or lists of numbers)
+        """
+        self.list_frames.append(frame)
+        self.list_rows.append(
+            np.concatenate([np.atleast_1d(v) for v in values])
+            if values
+            else np.empty(0)
+        )
+        if len(self.list_frames) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered frames to a new chunk"""
+        if not self.list_frames:
+            return
+
+        np.savez(
+            self.dir_path / f"chunk_{self.n_chunks:05d}.npz",
+            frames=np.array(self.list_frames),
+            values=np.stack(self.list_rows),
+        )
+        self.n_chunks += 1
+        self.list_frames = []
+        self.list_rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_last_frame_npz(dir_path):
+    """Get the last frame written to a columnar .npz parameter log
+
+    Parameters
+    ----------
+    dir_path : str or pathlib.Path
+        path to the log directory
+
+    Returns
+    -------
+    int or None
+        last frame in the log, or None if the log has no chunks
+    """
+    list_chunks = sorted(Path(dir_path).glob("chunk_*.npz"))
+    if not list_chunks:
+        return None
+
+    with np.load(list_chunks[-1]) as chunk:
+        return int(chunk["frames"][-1])
+
+
+def load_npz_log(dir_path):
+    """Load all the chunks of a columnar .npz parameter log
+
+    Parameters
+    ----------
+    dir_path : str or pathlib.Path
+        path to the log directory
+
+    Returns
+    -------
+    tuple
+        schema dictionary, array of frames and array of values
+        (one row per frame)
+    """
+    dir_path = Path(dir_path)
+    with open(dir_path / "schema.json", "r") as in_file_obj:
+        schema = json.load(in_file_obj)
+
+    list_frames = []
+    list_values = []
+    for chunk_path in sorted(dir_path.glob("chunk_*.npz")):
+        with np.load(chunk_path) as chunk:
+            list_frames.append(chunk["frames"])
+            list_values.append(chunk["values"])
+
+    if not list_frames:
+        return schema, np.empty(0, dtype=int), np.empty((0, 0))
+
+    return schema, np.concatenate(list_frames), np.concatenate(list_values)
+
+
+# -------------------------------
+# Readers
+# -------------------------------
+def flatten_nested_values(data, prefix=()):
+    """Flatten a nested dictionary of values per frame
+
+    Parameters
+    ----------
+    data : dict
+        nested dictionary, as saved in the .json output file
+    prefix : tuple, optional
+        keys of the parent dictionaries, by default ()
+
+    Returns
+    -------
+    dict
+        dictionary with the list of values per frame of each parameter,
+        with the keys joined by "/" as parameter identifier
+    """
+    flat_data = {}
+    for ky, val in data.items():
+        if isinstance(val, dict):
+            flat_data.update(flatten_nested_values(val, prefix + (ky,)))
+        else:
+            flat_data["/".join(prefix + (ky,))] = val
+    return flat_data
+
+
+class JSONParamReader:
+    """Reader of a .json parameter log
+
+    If the log has no list of frames under the key "frames", its values
+    are assumed to start at frame 0.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .json log
+    """
+
+    def __init__(self, path):
+        with open(path, "r") as in_file_obj:
+            data = json.load(in_file_obj)
+
+        list_frames = data.pop("frames", None)
+        self.values_per_param = flatten_nested_values(data)
+        if list_frames is None:
+            n_frames = max(
+                (len(v) for v in self.values_per_param.values()), default=0
+            )
+            list_frames = range(n_frames)
+        self.map_frame_to_row = {f: row for row, f in enumerate(list_frames)}
+
+    def get_frame(self, frame):
+        row = self.map_frame_to_row[frame]
+        return {
+            param_id: values[row]
+            for param_id, values in self.values_per_param.items()
+        }
+
+
+class JSONLParamReader:
+    """Reader of a JSON Lines parameter log
+
+    The file is scanned once to index the position of each frame's
+    record, so that each frame is then read with a single seek.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .jsonl log
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.map_frame_to_offset = {}
+        with open(self.path, "rb") as in_file_obj:
+            offset = 0
+            for line in in_file_obj:
+                try:
+                    self.map_frame_to_offset[json.loads(line)["frame"]] = (
+                        offset
+                    )
+                except (json.JSONDecodeError, KeyError):
+                    pass
+                offset += len(line)
+
+    def get_frame(self, frame):
+        with open(self.path, "rb") as in_file_obj:
+            in_file_obj.seek(self.map_frame_to_offset[frame])
+            record = json.loads(in_file_obj.readline())
+        record.pop("frame")
+        return record
+
+
+class NPZParamReader:
+    """Reader of a columnar .npz parameter log
+
+    Parameters
+    ----------
+    dir_path : str or pathlib.Path
+        path to the log directory
+    """
+
+    def __init__(self, dir_path):
+        schema, frames, self.values = load_npz_log(dir_path)
+        self.param_ids = schema["param_ids"]
+        self.n_dims = schema["n_dims"]
+        self.map_frame_to_row = {int(f): row for row, f in enumerate(frames)}
+
+    def get_frame(self, frame):
+        row = self.values[self.map_frame_to_row[frame]]
+        frame_values = {}
+        col = 0
+        for param_id, n in zip(self.param_ids, self.n_dims):
+            value = row[col : col + n]
+            frame_values[param_id] = value.item() if n == 1 else value.tolist()
+            col += n
+        return frame_values
+
+
+class StoreParamReader:
+    """Reader of a memory-mapped parameter store
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .npy store
+    """
+
+    def __init__(self, path):
+        self.store = ParamStore.open(path)
+
+    def get_frame(self, frame):
+        # frames outside the store or not written yet are missing
+        row = frame - self.store.frame_start
+        if not (0 <= row < len(self.store.data)) or (
+            self.store.data["frame"][row] != frame
+        ):
+            raise KeyError(frame)
+
+        return {
+            param_id: value.tolist()
+            for param_id, value in self.store.get_frame(frame).items()
+        }
+
+
+def open_param_log(path):
+    """Open a parameter log for reading, in any of the output formats
+
+    The format is inferred from the path: a directory is read as .npz
+    chunks, and files are read according to their extension (.jsonl,
+    .npy or .json).
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the log
+
+    Returns
+    -------
+    _type_
+        reader with a get_frame(frame) method, which returns a dictionary
+        with the value of each parameter by identifier
+    """
+    path = Path(path)
+    if path.is_dir():
+        return NPZParamReader(path)
+    elif path.suffix == ".jsonl":
+        return JSONLParamReader(path)
+    elif path.suffix == ".npy":
+        return StoreParamReader(path)
+    else:
+        return JSONParamReader(path)
@@ -0,0 +1,287 @@
+from pathlib import Path
+
+import numpy as np
+
+from . import rng
+
+# dtype of the values of each kind of parameter
+MAP_KIND_TO_DTYPE = {
+    rng.UNIFORM: "<f8",
+    rng.INTEGER: "<i8",
+    rng.CHOICE: "?",
+}
+
+
+def get_store_dtype(param_ids, n_dims, kinds):
+    """Get the structured dtype of a row of the parameter store
+
+    Each row has a "frame" field with the frame number, and one field
+    per parameter, with the parameter's identifier as name and shape
+    (n_dims,) if the parameter has several components.
+
+    Parameters
+    ----------
+    param_ids : list
+        identifiers of the parameters
+    n_dims : list
+        number of components of each parameter
+    kinds : list
+        kind of each parameter (as defined in utils.rng)
+
+    Returns
+    -------
+    numpy.dtype
+        structured dtype
+    """
+    list_fields = [("frame", "<i8")]
+    for param_id, n, kind in zip(param_ids, n_dims, kinds):
+        if n == 1:
+            list_fields.append((param_id, MAP_KIND_TO_DTYPE[kind]))
+        else:
+            list_fields.append((param_id, MAP_KIND_TO_DTYPE[kind], (n,)))
+
+    return np.dtype(list_fields)
+
+
+# -------------------------------
+# Parameter store
+# -------------------------------
+class ParamStore:
+    """Binary store of parameter values, memory-mapped from disk
+
+    The store is a .npy file holding a structured array with one row
+    per frame. Its header describes the schema of a row: the identifier,
+    dtype and number of components of every parameter. Rows are read
+    and written in place through a numpy.memmap, and the row of frame k
+    is found in constant time (frame k is at row k - frame_start).
+    Rows not written yet have a frame number of -1.
+
+    Use ParamStore.create to make a new store and ParamStore.open to
+    open an existing one.
+
+    Parameters
+    ----------
+    data : numpy.memmap
+        memory-mapped structured array
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+        written = self.data["frame"] >= 0
+        self.frame_start = (
+            int(self.data["frame"][np.argmax(written)]) - np.argmax(written)
+            if written.any()
+            else 0
+        )
+
+    @classmethod
+    def create(cls, path, param_ids, n_dims, kinds, n_frames, frame_start=0):
+        """Create a new store for a range of frames
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            path to the .npy store
+        param_ids : list
+            identifiers of the parameters
+        n_dims : list
+            number of components of each parameter
+        kinds : list
+            kind of each parameter (as defined in utils.rng)
+        n_frames : int
+            number of frames (rows) in the store
+        frame_start : int, optional
+            frame number of the first row, by default 0
+
+        Returns
+        -------
+        ParamStore
+            store opened for writing
+        """
+        data = np.lib.format.open_memmap(
+            Path(path),
+            mode="w+",
+            dtype=get_store_dtype(param_ids, n_dims, kinds),
+            shape=(n_frames,),
+        )
+        data["frame"] = -1
+
+        store = cls(data)
+        store.frame_start = frame_start
+        return store
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """Open an existing store
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            path to the .npy store
+        mode : str, optional
+            "r" to read only or "r+" to read and write, by default "r"
+
+        Returns
+        -------
+        ParamStore
+            store
+        """
+        return cls(np.lib.format.open_memmap(Path(path), mode=mode))
+
+    @property
+    def param_ids(self):
+        """Identifiers of the parameters in the store"""
+        return list(self.data.dtype.names[1:])
+
+    @property
+    def last_frame(self):
+        """Last frame written to the store, or None if no frame
+        was written"""
+        frames = self.data["frame"]
+        frames = frames[frames >= 0]
+        return int(frames.max()) if frames.size else None
+
+    def write_frame(self, frame, values):
+        """Write the values of all parameters at one frame
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+        values : list
+            value of each parameter, in the order of param_ids
+        """
+        self.data[frame - self.frame_start] = (frame, *values)
+
+    def get_frame(self, frame):
+        """Get the values of all parameters at one frame
+
+        Parameters
+        ----------
+        frame : int
+            frame number
+
+        Returns
+        -------
+        dict
+            value of each parameter, by identifier (a view of the store,
+            not a copy)
+        """
+        row = self.data[frame - self.frame_start]
+        return {param_id: row[param_id] for param_id in self.param_ids}
+
+    def close(self):
+        self.data.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ParamStoreWriter(ParamStore):
+    """Parameter log writer saving frames to a memory-mapped store
+
+    When resuming, the existing store must have the same schema as the
+    current run (parameters, numbers of components and dtypes). If it has
+    fewer rows than n_frames, it is grown to n_frames rows, keeping the
+    frames already written.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .npy store
+    param_ids : list
+        identifiers of the parameters, in the order of the values passed
+        to write_frame
+    n_dims : list
+        number of components of each parameter
+    kinds : list
+        kind of each parameter (as defined in utils.rng)
+    n_frames : int
+        number of frames (rows) in the store
+    resume : bool, optional
+        if True, write to an existing store; otherwise a new store is
+        created. By default False
+
+    Raises
+    ------
+    ValueError
+        if resuming a store with a different schema
+    """
+
+    def __init__(self, path, param_ids, n_dims, kinds, n_frames, resume=False):
+        path = Path(path)
+        if resume and path.is_file():
+            check_store_schema(path, get_store_dtype(param_ids, n_dims, kinds))
+            grow_store(path, n_frames)
+            store = ParamStore.open(path, mode="r+")
+        else:
+            store = ParamStore.create(path, param_ids, n_dims, kinds, n_frames)
+        super().__init__(store.data)
+        self.frame_start = store.frame_start
+
+
+def check_store_schema(path, dtype):
+    """Check that an existing store has the schema of the current run,
+    before resuming it
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .npy store
+    dtype : numpy.dtype
+        structured dtype of a row for the current run
+
+    Raises
+    ------
+    ValueError
+        if the parameters, their numbers of components or their dtypes
+        differ
+    """
+    stored_dtype = ParamStore.open(path).data.dtype
+    if stored_dtype == dtype:
+        return
+
+    if stored_dtype.names != dtype.names:
+        difference = "different parameters"
+    else:
+        difference = "different components or dtypes per parameter"
+    raise ValueError(
+        f"Cannot resume {path}: the store has {difference} than the "
+        "current run (e.g. if the parameters selected for randomisation "
+        "changed). Use a new output path."
+    )
+
+
+def grow_store(path, n_frames):
+    """Grow an existing store to a number of rows, keeping its rows
+
+    The store is copied to a new file with more rows, which then
+    replaces it. Stores with at least n_frames rows are left unchanged.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        path to the .npy store
+    n_frames : int
+        number of frames (rows) the store must have
+    """
+    path = Path(path)
+    store = ParamStore.open(path)
+    if len(store.data) >= n_frames:
+        return
+
+    grown_path = path.with_name(path.stem + "_grown.npy")
+    grown_data = np.lib.format.open_memmap(
+        grown_path, mode="w+", dtype=store.data.dtype, shape=(n_frames,)
+    )
+    grown_data["frame"] = -1
+    grown_data[: len(store.data)] = store.data
+    grown_data.flush()
+
+    # release the memory maps before replacing the file
+    del store, grown_data
+    grown_path.replace(path)
@@ -0,0 +1,220 @@
+import random
+import zlib
+
+import numpy as np
+
+# -------------------------------
+# Kinds of randomised parameters
+# -------------------------------
+# - UNIFORM: continuous value between min and max (floats, vectors, colours)
+# - INTEGER: integer between min and max, both included
+# - CHOICE: either the min or the max value (booleans)
+UNIFORM = "uniform"
+INTEGER = "integer"
+CHOICE = "choice"
+
+# -------------------------------
+# RNG modes
+# -------------------------------
+# - SEQUENTIAL: values are drawn from a single stream, so the values at a
+#   frame depend on all the values drawn before
+# - FRAME: values are drawn from a separate stream per seed, frame and
+#   parameter, so any frame can be regenerated on its own
+SEQUENTIAL = "SEQUENTIAL"
+FRAME = "FRAME"
+
+
+def get_generator(seed=None):
+    """Get a NumPy random number generator
+
+    Parameters
+    ----------
+    seed : int, optional
+        seed of the generator, by default None (fresh entropy from the OS)
+
+    Returns
+    -------
+    numpy.random.Generator
+        random number generator
+    """
+    return np.random.default_rng(seed)
+
+
+# -------------------------------
+# Sequential generator
+# -------------------------------
+# Generator shared by the per-frame randomisation, reseeded together
+# with Python's random module
+_sequential_generator = get_generator()
+
+
+def get_sequential_generator():
+    """Get the generator shared by the per-frame randomisation
+
+    Returns
+    -------
+    numpy.random.Generator
+        random number generator
+    """
+    return _sequential_generator
+
+
+def reseed(seed):
+    """Reseed Python's random module and the sequential generator
+
+    Parameters
+    ----------
+    seed : int
+        new seed
+    """
+    global _sequential_generator
+    random.seed(seed)
+    _sequential_generator = get_generator(seed)
+
+
+def reseed_if_changed(seed_props):
+    """Reseed if the seed is toggled on and has changed since last used
+
+    Parameters
+    ----------
+    seed_props : _type_
+        seed properties of the scene (with seed_toggle, seed and
+        seed_previous attributes)
+    """
+    if seed_props.seed_toggle and (
+        seed_props.seed_previous != seed_props.seed
+    ):
+        reseed(seed_props.seed)
+        seed_props.seed_previous = seed_props.seed
+
+
+def draw_block(rng, kind, min_vals, max_vals, n_rows):
+    """Draw a block of random values with a single call to the generator
+
+    Each column of the block is sampled between its own min and max
+    values. Like Python's random.uniform, infinite bounds give NaN values
+    for UNIFORM columns rather than raising an error.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        random number generator
+    kind : str
+        kind of the parameters in the block (UNIFORM, INTEGER or CHOICE)
+    min_vals : array_like
+        min value per column
+    max_vals : array_like
+        max value per column
+    n_rows : int
+        number of rows (frames) to draw
+
+    Returns
+    -------
+    numpy.ndarray
+        array of floats of shape (n_rows, number of columns)
+    """
+    min_vals = np.asarray(min_vals, dtype=float)
+    max_vals = np.asarray(max_vals, dtype=float)
+    size = (n_rows, min_vals.size)
+
+    if kind == UNIFORM:
+        with np.errstate(invalid="ignore"):
+            return min_vals + (max_vals - min_vals) * rng.random(size)
+
+    elif kind == INTEGER:
+        # bounds may be in any order
+        return rng.integers(
+            np.minimum(min_vals, max_vals).astype(np.int64),
+            np.maximum(min_vals, max_vals).astype(np.int64),
+            size=size,
+            endpoint=True,
+        ).astype(float)
+
+    elif kind == CHOICE:
+        return np.where(rng.random(size) < 0.5, min_vals, max_vals)
+
+    else:
+        raise ValueError(f"Unknown kind of parameter: {kind}")
+
+
+# -------------------------------
+# Counter-based generators
+# -------------------------------
+def get_param_key(seed, param_id):
+    """Get the key of the Philox streams of a parameter
+
+    Parameters
+    ----------
+    seed : int
+        seed set by the user
+    param_id : str
+        unique identifier of the parameter
+
+    Returns
+    -------
+    numpy.ndarray
+        Philox key (two 64-bit unsigned integers)
+    """
+    seed_seq = np.random.SeedSequence(
+        [seed % 2**32, zlib.crc32(param_id.encode())]
+    )
+    return seed_seq.generate_state(2, dtype=np.uint64)
+
+
+def get_frame_generator(key, frame):
+    """Get the generator of a parameter's stream at one frame
+
+    The frame is set in the most significant word of the Philox counter,
+    so that the streams of consecutive frames never overlap.
+
+    Parameters
+    ----------
+    key : numpy.ndarray
+        Philox key of the parameter, as returned by get_param_key
+    frame : int
+        frame number
+
+    Returns
+    -------
+    numpy.random.Generator
+        random number generator
+    """
+    counter = np.zeros(4, dtype=np.uint64)
+    counter[3] = frame % 2**64
+    return np.random.Generator(np.random.Philox(key=key, counter=counter))
+
+
+def draw_at_frames(key, kind, min_vals, max_vals, frames):
+    """Draw the values of a parameter at a set of frames
+
+    The values at each frame only depend on the parameter's key and
+    the frame number.
+
+    Parameters
+    ----------
+    key : numpy.ndarray
+        Philox key of the parameter, as returned by get_param_key
+    kind : str
+        kind of the parameter (UNIFORM, INTEGER or CHOICE)
+    min_vals : array_like
+        min value per component
+    max_vals : array_like
+        max value per component
+    frames : iterable
+        frame numbers
+
+    Returns
+    -------
+    numpy.ndarray
+        array of floats of shape (number of frames, number of components)
+    """
+    list_rows = [
+        draw_block(
+            get_frame_generator(key, frame), kind, min_vals, max_vals, 1
+        )
+        for frame in frames
+    ]
+    if not list_rows:
+        return np.empty((0, np.size(min_vals)))
+
+    return np.concatenate(list_rows)
@@ -0,0 +1,96 @@
+# -------------------------------
+# Sockets shared by materials
+# -------------------------------
+# shared sockets last reported, with their owner and materials
+# (they are printed again only if they change)
+_reported_shared_sockets = None
+
+
+def get_socket_target_key(sckt, material_str):
+    """Get a key identifying a material socket across all the materials
+    it is listed under
+
+    A socket inside a node group shared by several materials is listed
+    under each of them, but it is the same socket, so its key only
+    depends on the node group. The node trees of the materials
+    themselves are embedded data, all with the same name (e.g.
+    "Shader Nodetree"), so the key of their sockets depends on the
+    material instead.
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+    material_str : str
+        name of the material the socket is listed under
+
+    Returns
+    -------
+    tuple
+        owner of the node tree ("MATERIAL" or "NODE_GROUP", and its
+        name), name of the node and identifier of the socket
+    """
+    node_tree = sckt.node.id_data
+    if node_tree.is_embedded_data:
+        owner_key = ("MATERIAL", material_str)
+    else:
+        owner_key = ("NODE_GROUP", node_tree.name)
+    return owner_key + (sckt.node.name, sckt.identifier)
+
+
+def get_materials_per_socket(cs):
+    """Get the materials each candidate socket is listed under
+
+    A socket inside a node group shared by several materials is a
+    candidate socket of each of them.
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene
+
+    Returns
+    -------
+    dict
+        list of material names per socket key (see
+        get_socket_target_key), in the order of the collection
+        of materials
+    """
+    map_socket_to_materials = {}
+    for mat in cs.socket_props_per_material.collection:
+        for sckt in mat.candidate_sockets:
+            map_socket_to_materials.setdefault(
+                get_socket_target_key(sckt, mat.name), []
+            ).append(mat.name)
+    return map_socket_to_materials
+
+
+def report_shared_sockets(map_socket_to_owner, map_socket_to_materials):
+    """Print the sockets to randomise that are shared by several
+    materials, and the material owning each of them
+
+    Parameters
+    ----------
+    map_socket_to_owner : dict
+        name of the material owning each socket to randomise,
+        per socket key
+    map_socket_to_materials : dict
+        list of material names per socket key
+    """
+    global _reported_shared_sockets
+    shared_sockets = {
+        sckt_key: (owner, tuple(map_socket_to_materials[sckt_key]))
+        for sckt_key, owner in map_socket_to_owner.items()
+        if len(map_socket_to_materials[sckt_key]) > 1
+    }
+    if shared_sockets == _reported_shared_sockets:
+        return
+
+    for sckt_key, (owner, list_materials) in shared_sockets.items():
+        _, node_tree_str, node_str, sckt_str = sckt_key
+        print(
+            f"Socket {node_str}_{sckt_str} from node group {node_tree_str}",
+            f"affects materials {', '.join(list_materials)}:",
+            f"randomised once, with the properties set in {owner}",
+        )
+    _reported_shared_sockets = shared_sockets
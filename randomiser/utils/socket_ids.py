@@ -0,0 +1,189 @@
+import bpy
+
+from . import change_tracking
+from .shared_sockets import get_materials_per_socket
+
+# -------------------------------
+# Node group names
+# -------------------------------
+# set of node group names, rebuilt when the tracked data changes
+_set_node_group_names = set()
+_node_group_names_version = None
+
+
+def get_node_group_names():
+    """Get the set of names of all node groups
+
+    Returns
+    -------
+    set
+        names of the node groups in bpy.data.node_groups
+    """
+    global _set_node_group_names, _node_group_names_version
+    if _node_group_names_version != change_tracking.get_version():
+        _set_node_group_names = set(bpy.data.node_groups.keys())
+        _node_group_names_version = change_tracking.get_version()
+
+    return _set_node_group_names
+
+
+# -------------------------------
+# Materials per socket
+# -------------------------------
+# materials each candidate socket is listed under, per scene,
+# recomputed when the tracked data changes
+_map_scene_to_materials_per_socket = {}
+_materials_per_socket_version = None
+
+
+def get_cached_materials_per_socket(cs):
+    """Get the materials each candidate material socket is listed under
+
+    The map is computed with shared_sockets.get_materials_per_socket
+    and cached until the tracked data changes, so the collection of
+    materials should be synchronised before calling this.
+
+    Parameters
+    ----------
+    cs : bpy.types.Scene
+        scene
+
+    Returns
+    -------
+    dict
+        list of material names per socket key (see
+        shared_sockets.get_socket_target_key)
+    """
+    global _materials_per_socket_version
+    if _materials_per_socket_version != change_tracking.get_version():
+        _map_scene_to_materials_per_socket.clear()
+        _materials_per_socket_version = change_tracking.get_version()
+
+    if cs.name not in _map_scene_to_materials_per_socket:
+        _map_scene_to_materials_per_socket[cs.name] = get_materials_per_socket(
+            cs
+        )
+    return _map_scene_to_materials_per_socket[cs.name]
+
+
+# -------------------------------
+# Socket identifiers
+# -------------------------------
+def get_material_socket_id(sckt):
+    """Get the identifier of a material socket in its collection
+    of socket properties
+
+    The identifier is the node name and the socket name, prefixed with
+    the node group name if the node is inside a node group.
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    str
+        socket identifier
+    """
+    sckt_id = sckt.node.name + "_" + sckt.name
+    if sckt.node.id_data.name in get_node_group_names():
+        sckt_id = sckt.node.id_data.name + "_" + sckt_id
+    return sckt_id
+
+
+def get_geometry_socket_id(sckt):
+    """Get the identifier of a geometry socket in its collection
+    of socket properties
+
+    Parameters
+    ----------
+    sckt : bpy.types.NodeSocket
+        output socket of an input node
+
+    Returns
+    -------
+    str
+        socket identifier (node name and socket name)
+    """
+    return sckt.node.name + "_" + sckt.name
+
+
+# -------------------------------
+# Index of socket properties
+# -------------------------------
+# map from socket identifier to position in the collection of socket
+# properties, per (kind, name) of collection
+_map_key_to_props_index = {}
+_props_index_n_reloads = None
+
+
+def get_socket_props_index(key, sockets_props_collection):
+    """Get the map from socket identifier to position in a collection
+    of socket properties
+
+    The map is rebuilt only if the collection changed size or was
+    explicitly invalidated (see invalidate_socket_props_index).
+
+    Parameters
+    ----------
+    key : tuple
+        identifier of the collection (e.g. ("MATERIAL", material name))
+    sockets_props_collection : _type_
+        collection of socket properties
+
+    Returns
+    -------
+    dict
+        position of each socket's properties in the collection,
+        by socket identifier
+    """
+    global _props_index_n_reloads
+    if _props_index_n_reloads != change_tracking.get_n_reloads():
+        _map_key_to_props_index.clear()
+        _props_index_n_reloads = change_tracking.get_n_reloads()
+
+    props_index = _map_key_to_props_index.get(key)
+    if (props_index is None) or (
+        len(props_index) != len(sockets_props_collection)
+    ):
+        props_index = {
+            sckt_prop.name: i
+            for i, sckt_prop in enumerate(sockets_props_collection)
+        }
+        _map_key_to_props_index[key] = props_index
+
+    return props_index
+
+
+def invalidate_socket_props_index(key):
+    """Mark the index of a collection of socket properties as out of date
+
+    Parameters
+    ----------
+    key : tuple
+        identifier of the collection
+    """
+    _map_key_to_props_index.pop(key, None)
+
+
+def get_socket_props(key, sockets_props_collection, sckt_id):
+    """Get the properties of a socket from its collection
+
+    Parameters
+    ----------
+    key : tuple
+        identifier of the collection
+    sockets_props_collection : _type_
+        collection of socket properties
+    sckt_id : str
+        socket identifier
+
+    Returns
+    -------
+    _type_
+        socket properties
+    """
+    return sockets_props_collection[
+        get_socket_props_index(key, sockets_props_collection)[sckt_id]
+    ]
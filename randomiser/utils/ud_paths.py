@@ -0,0 +1,128 @@
+import re
+
+import bpy
+
+from . import change_tracking
+
+# Full Python path of a user-defined (UD) property on a data-block,
+# e.g. bpy.data.objects["Cube"].collision.absorption
+DATA_BLOCK_PATH_REGEX = re.compile(
+    r"^bpy\.data\.(?P<collection>\w+)\[(?P<quote>[\"'])(?P<name>.+?)"
+    r"(?P=quote)\]\.(?P<attr_path>.+)$"
+)
+
+# Prefix of the full Python path of a UD property on the scene,
+# e.g. bpy.context.scene.frame_current
+SCENE_PATH_PREFIX = "bpy.context.scene."
+
+
+# -------------------------------
+# UD property handles
+# -------------------------------
+class UDHandle:
+    """A user-defined (UD) property resolved to the Blender data holding it
+
+    The property is the attribute attr of owner, and owner is either the
+    data-block id_data or a struct inside it (e.g. a modifier). Once
+    resolved, the property is read and set directly, without parsing
+    its path again.
+
+    Parameters
+    ----------
+    id_data : bpy.types.ID
+        data-block the property is defined on (an object, a camera,
+        the scene...)
+    owner : _type_
+        Blender data holding the attribute
+    attr : str
+        name of the attribute
+    """
+
+    def __init__(self, id_data, owner, attr):
+        self.id_data = id_data
+        self.owner = owner
+        self.attr = attr
+        self.type = type(getattr(owner, attr))
+
+    def get_value(self):
+        return getattr(self.owner, self.attr)
+
+    def set_value(self, value):
+        setattr(self.owner, self.attr, value)
+
+
+def compile_UD_path(full_str):
+    """Resolve the full Python path of a UD property
+
+    Two forms of path are supported: properties on a data-block in
+    bpy.data (e.g. bpy.data.cameras["Camera"].dof.aperture_fstop) and
+    properties on the scene (e.g. bpy.context.scene.frame_current).
+
+    Parameters
+    ----------
+    full_str : str
+        full Python path of the UD property
+
+    Returns
+    -------
+    UDHandle or None
+        resolved property, or None if the path does not point to
+        an existing property
+    """
+    match = DATA_BLOCK_PATH_REGEX.match(full_str)
+    if match:
+        collection = getattr(bpy.data, match["collection"], None)
+        if not isinstance(collection, bpy.types.bpy_prop_collection):
+            return None
+        id_data = collection.get(match["name"])
+        attr_path = match["attr_path"]
+    elif full_str.startswith(SCENE_PATH_PREFIX):
+        id_data = bpy.context.scene
+        attr_path = full_str[len(SCENE_PATH_PREFIX) :]
+    else:
+        return None
+
+    if id_data is None:
+        return None
+
+    # e.g. ('modifiers["Subsurf"]', 'levels') or ('', 'location')
+    owner_path, _, attr = attr_path.rpartition(".")
+    try:
+        owner = id_data.path_resolve(owner_path) if owner_path else id_data
+        return UDHandle(id_data, owner, attr)
+    except (AttributeError, ValueError):
+        return None
+
+
+# handle of each UD path, compiled again when the tracked data changes
+# (e.g. if a data-block is renamed or deleted)
+_map_path_to_handle = {}
+_handles_version = None
+
+
+def get_UD_handle(full_str):
+    """Get the resolved handle of a UD property
+
+    Handles are compiled once and cached until the tracked data changes,
+    so repeated calls (e.g. once per frame) are a dictionary lookup.
+
+    Parameters
+    ----------
+    full_str : str
+        full Python path of the UD property
+
+    Returns
+    -------
+    UDHandle or None
+        resolved property, or None if the path does not point to
+        an existing property
+    """
+    global _handles_version
+    if _handles_version != change_tracking.get_version():
+        _map_path_to_handle.clear()
+        _handles_version = change_tracking.get_version()
+
+    if full_str not in _map_path_to_handle:
+        _map_path_to_handle[full_str] = compile_UD_path(full_str)
+
+    return _map_path_to_handle[full_str]
@@ -0,0 +1,85 @@
+import numpy as np
+
+from . import rng
+
+# -------------------------------
+# Kinds of user-defined (UD) properties
+# -------------------------------
+# Kind of parameter (as defined in utils.rng) used to sample each type
+# of UD property (as named in config.MAP_PROPS_TO_ATTR)
+MAP_ATTR_TO_KIND = {
+    "float_1d": rng.UNIFORM,
+    "float_3d": rng.UNIFORM,
+    "int_1d": rng.INTEGER,
+    "bool_1d": rng.CHOICE,
+    "euler": rng.UNIFORM,
+}
+
+
+# -------------------------------
+# Setters
+# -------------------------------
+# Each setter sets a block of UD properties of the same type at once.
+# The properties are passed as a list of objects with "owner" and "attr"
+# attributes (e.g. the handles in utils.ud_paths), and the values as an
+# array with one row per property (or a flat array, for scalars). The
+# block is converted to Python values with a single call, and each
+# property is then assigned as a whole (a scalar or a full vector).
+def set_scalars(list_targets, values):
+    """Set a block of scalar UD properties
+
+    Parameters
+    ----------
+    list_targets : list
+        properties to set (objects with "owner" and "attr" attributes)
+    values : numpy.ndarray
+        one value per property
+    """
+    for target, value in zip(list_targets, np.ravel(values).tolist()):
+        setattr(target.owner, target.attr, value)
+
+
+def set_vectors(list_targets, values):
+    """Set a block of vector UD properties, one full vector per property
+
+    Parameters
+    ----------
+    list_targets : list
+        properties to set (objects with "owner" and "attr" attributes)
+    values : numpy.ndarray
+        array of shape (number of properties, number of components)
+    """
+    values = np.reshape(values, (len(list_targets), -1)).tolist()
+    for target, value in zip(list_targets, values):
+        setattr(target.owner, target.attr, value)
+
+
+def set_float_1d(list_targets, values):
+    set_scalars(list_targets, np.asarray(values, dtype=float))
+
+
+def set_float_3d(list_targets, values):
+    set_vectors(list_targets, np.asarray(values, dtype=float))
+
+
+def set_int_1d(list_targets, values):
+    set_scalars(list_targets, np.rint(values).astype(int))
+
+
+def set_bool_1d(list_targets, values):
+    set_scalars(list_targets, np.asarray(values).astype(bool))
+
+
+def set_euler(list_targets, values):
+    # the bounds of Euler angles are set in degrees in the UD panel
+    set_vectors(list_targets, np.deg2rad(values))
+
+
+# Setter per type of UD property
+MAP_ATTR_TO_SETTER = {
+    "float_1d": set_float_1d,
+    "float_3d": set_float_3d,
+    "int_1d": set_int_1d,
+    "bool_1d": set_bool_1d,
+    "euler": set_euler,
+}
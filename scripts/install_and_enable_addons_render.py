@@ -169,6 +169,126 @@ def save_camera_settings(
     print("===============Camera settings saved=================")
 
 
+# =============================================================================
+
+# Geometry attribute marking the regions shown in the segmentation mask,
+# and shader AOV the main material writes it to
+SEG_ATTRIBUTE_NAME = "seg_mask"
+SEG_AOV_NAME = "seg_mask"
+
+
+def set_material(geo_node_group, set_material_nodes, material):
+    for node_name in set_material_nodes:
+        bpy.data.node_groups[geo_node_group].nodes[node_name].inputs[
+            2
+        ].default_value = material
+
+
+def setup_single_pass_render(
+    basename,
+    geo_node_group,
+    seg_nodes,
+    background_node,
+    main_material_name,
+):
+    """
+    Set up the scene to render the main image and the segmentation mask
+    in a single pass.
+
+    All the regions use the main material, so the randomisation of the
+    main image is unchanged. The regions to segment are marked with a
+    geometry attribute (stored after their Set Material nodes), which the
+    main material writes to a shader AOV. The compositor builds the
+    segmentation mask (red on black) from the AOV, and a File Output node
+    saves both images as:
+    - <basename>_f<frame>.png
+    - <basename>_seg<frame>.png
+    """
+    scene = bpy.context.scene
+
+    main_material = bpy.data.materials.get(main_material_name)
+    if main_material is None:
+        raise ValueError(
+            f"Main material {main_material_name} not found: "
+            "cannot set up the single pass render"
+        )
+
+    # Set materials: main material for all the regions
+    set_material(geo_node_group, seg_nodes, main_material)
+    set_material(geo_node_group, [background_node], main_material)
+
+    # Mark the regions to segment with a geometry attribute
+    node_tree = bpy.data.node_groups[geo_node_group]
+    for node_name in seg_nodes:
+        set_material_node = node_tree.nodes[node_name]
+        store_node = node_tree.nodes.new("GeometryNodeStoreNamedAttribute")
+        store_node.data_type = "FLOAT"
+        store_node.domain = "FACE"
+        store_node.inputs["Name"].default_value = SEG_ATTRIBUTE_NAME
+        store_node.inputs["Value"].default_value = 1.0
+        store_node.location = set_material_node.location
+        store_node.location.x += 200
+
+        geometry_output = set_material_node.outputs["Geometry"]
+        for to_socket in [link.to_socket for link in geometry_output.links]:
+            node_tree.links.new(store_node.outputs["Geometry"], to_socket)
+        node_tree.links.new(geometry_output, store_node.inputs["Geometry"])
+
+    # Write the attribute to a shader AOV in the main material
+    # (the background regions have no attribute, and write 0)
+    mat_tree = main_material.node_tree
+    attribute_node = mat_tree.nodes.new("ShaderNodeAttribute")
+    attribute_node.attribute_type = "GEOMETRY"
+    attribute_node.attribute_name = SEG_ATTRIBUTE_NAME
+    aov_node = mat_tree.nodes.new("ShaderNodeOutputAOV")
+    # Blender 4.0 renamed the AOV name of the node to aov_name
+    if hasattr(aov_node, "aov_name"):
+        aov_node.aov_name = SEG_AOV_NAME
+    else:
+        aov_node.name = SEG_AOV_NAME
+    mat_tree.links.new(attribute_node.outputs["Fac"], aov_node.inputs["Value"])
+
+    # Enable the AOV pass
+    aov = bpy.context.view_layer.aovs.add()
+    aov.name = SEG_AOV_NAME
+    aov.type = "VALUE"
+
+    # Compositor nodes
+    scene.use_nodes = True
+    tree = scene.node_tree
+
+    render_layers = tree.nodes.new("CompositorNodeRLayers")
+
+    # hard mask, without the filtering at the edges of the regions
+    threshold = tree.nodes.new("CompositorNodeMath")
+    threshold.operation = "GREATER_THAN"
+    threshold.inputs[1].default_value = 0.5
+
+    mask_colour = tree.nodes.new("CompositorNodeMixRGB")
+    mask_colour.inputs[1].default_value = (0.0, 0.0, 0.0, 1.0)  # black
+    mask_colour.inputs[2].default_value = (1.0, 0.0, 0.0, 1.0)  # red
+
+    # '#' is replaced by the frame number
+    output_path = Path(basename).resolve()
+    file_output = tree.nodes.new("CompositorNodeOutputFile")
+    file_output.base_path = str(output_path.parent)
+    file_output.format.file_format = "PNG"
+    file_output.file_slots[0].path = output_path.name + "_f#"
+    file_output.file_slots.new(output_path.name + "_seg#")
+
+    tree.links.new(render_layers.outputs["Image"], file_output.inputs[0])
+    tree.links.new(render_layers.outputs[SEG_AOV_NAME], threshold.inputs[0])
+    tree.links.new(threshold.outputs["Value"], mask_colour.inputs["Fac"])
+    tree.links.new(mask_colour.outputs["Image"], file_output.inputs[1])
+
+    # keep the main image as the render result
+    if not any(nd.type == "COMPOSITE" for nd in tree.nodes):
+        composite = tree.nodes.new("CompositorNodeComposite")
+        tree.links.new(render_layers.outputs["Image"], composite.inputs[0])
+
+    print("Single pass render set up: main image and segmentation mask")
+
+
 # %% Main function
 def main():
     """
@@ -178,6 +298,11 @@ def main():
     --output:   Output json file
     --render_seg_only:   Render the segmentation only
     --render_main_only:   Render the main image only
+    --single_pass:   Render the main image and segmentation in one pass
+    --geo_node_group:   Geometry node group with the Set Material nodes
+    --seg_nodes:   Set Material nodes of the regions to segment
+    --background_node:   Set Material node of the background
+    --main_material:   Material for the main images
 
     """
 
@@ -266,6 +391,53 @@ def main():
         help="Input bool to render",
     )
 
+    # Render main image and segmentation mask in a single pass
+    parser.add_argument(
+        "-sp",
+        "--single_pass",
+        action="store_true",
+        help="Render the main image and the segmentation mask in one pass",
+    )
+
+    # Nodes and materials used to render the segmentation masks
+    parser.add_argument(
+        "--geo_node_group",
+        type=str,
+        default="Colon Geo Node",
+        help="Geometry node group with the Set Material nodes",
+    )
+    parser.add_argument(
+        "--seg_nodes",
+        nargs="+",
+        type=str,
+        default=["Set Material.001", "Set Material.004", "Set Material.002"],
+        help="Set Material nodes of the regions to segment",
+    )
+    parser.add_argument(
+        "--background_node",
+        type=str,
+        default="Set Material",
+        help="Set Material node of the background",
+    )
+    parser.add_argument(
+        "--main_material",
+        type=str,
+        default="Fat.001",
+        help="Material for the main images",
+    )
+    parser.add_argument(
+        "--seg_material",
+        type=str,
+        default="Red",
+        help="Material for the regions to segment in the masks",
+    )
+    parser.add_argument(
+        "--background_material",
+        type=str,
+        default="Black",
+        help="Material for the background in the masks",
+    )
+
     # build parser object
     args = parser.parse_args(argv)
 
@@ -283,7 +455,9 @@ def main():
     # ---------
 
     # render_seg_only = bool(args.render_seg_only[0])
-    render_main = bool(int(args.render_main[0]))
+    render_main = (
+        bool(int(args.render_main[0])) if args.render_main else False
+    )
 
     # extract list of python files
     # TODO: option to exclude files (w regex?)
@@ -373,7 +547,7 @@ def main():
         # obj = bpy.data.objects[3] #Sphere
 
         bpy.context.view_layer.objects.active = active_obj
-        bpy.context.scene.socket_props_per_gng.update_gngs_collection
+        bpy.context.scene.socket_props_per_gng.sync_collections()
         # bpy.ops.node.randomise_all_geometry_sockets("INVOKE_DEFAULT")
 
         # Save params?
@@ -455,7 +629,7 @@ def main():
         #         provided - generate from .blend file objects"
         #     )
 
-        bpy.context.scene.socket_props_per_material.update_materials_collection
+        bpy.context.scene.socket_props_per_material.sync_collections()
         bpy.ops.node.randomise_all_material_sockets("INVOKE_DEFAULT")
 
         # Based on random_all_save_params and collection_socket_properties
@@ -523,9 +697,18 @@ def main():
         # bpy.ops.node.randomise_all_geometry_sockets("INVOKE_DEFAULT")
 
         # Set materials for main images and segmentation
-        fat_material = bpy.data.materials.get("Fat.001")
-        red_material = bpy.data.materials.get("Red")
-        black_material = bpy.data.materials.get("Black")
+        fat_material = bpy.data.materials.get(args.main_material)
+        red_material = bpy.data.materials.get(args.seg_material)
+        black_material = bpy.data.materials.get(args.background_material)
+
+        if args.single_pass:
+            setup_single_pass_render(
+                str(args.basename[0]),
+                args.geo_node_group,
+                args.seg_nodes,
+                args.background_node,
+                args.main_material,
+            )
 
         # bpy.context.scene.frame_current = args.frame[0]
         for current_frame in range(1, args.frame[0] + 1):
@@ -548,24 +731,25 @@ def main():
 
             print(f"\n\n\n\n\n{data}\n\n\n\n\n")
 
+            if args.single_pass:
+                print("\n\nRendering main image and segmentation mask...")
+                set_camera_settings(data)
+
+                # The compositor's File Output node saves both images
+                bpy.ops.render.render()
+                continue
+
             print("\n\nRendering main images...")
             print("render_main = ", render_main)
             if render_main is True:
                 # Set Material for main images
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.001"
-                ].inputs[2].default_value = fat_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.004"
-                ].inputs[2].default_value = fat_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.002"
-                ].inputs[2].default_value = fat_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material"
-                ].inputs[2].default_value = fat_material
-
-                bpy.context.scene.socket_props_per_material.update_materials_collection
+                set_material(
+                    args.geo_node_group,
+                    args.seg_nodes + [args.background_node],
+                    fat_material,
+                )
+
+                bpy.context.scene.socket_props_per_material.sync_collections()
 
                 set_camera_settings(data)
 
@@ -609,18 +793,10 @@ def main():
             else:
                 print("\n\nRendering segmentation masks...")
                 # Set Material node
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.001"
-                ].inputs[2].default_value = red_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.004"
-                ].inputs[2].default_value = red_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material.002"
-                ].inputs[2].default_value = red_material
-                bpy.data.node_groups["Colon Geo Node"].nodes[
-                    "Set Material"
-                ].inputs[2].default_value = black_material
+                set_material(args.geo_node_group, args.seg_nodes, red_material)
+                set_material(
+                    args.geo_node_group, [args.background_node], black_material
+                )
 
                 # Ensure render engine is set
                 # bpy.context.scene.render.engine = 'CYCLES'
@@ -226,7 +226,7 @@ def main():
         # obj = bpy.data.objects[3] #Sphere
 
         bpy.context.view_layer.objects.active = active_obj
-        bpy.context.scene.socket_props_per_gng.update_gngs_collection
+        bpy.context.scene.socket_props_per_gng.sync_collections()
         # bpy.ops.node.randomise_all_geometry_sockets("INVOKE_DEFAULT")
 
         # Based on random_all_save_params mainly
@@ -284,7 +284,7 @@ def main():
                         (ini_min_max_values[m_str],) * n_dim,
                     )
 
-        bpy.context.scene.socket_props_per_material.update_materials_collection
+        bpy.context.scene.socket_props_per_material.sync_collections()
         bpy.ops.node.randomise_all_material_sockets("INVOKE_DEFAULT")
 
         # Based on random_all_save_params and collection_socket_properties
@@ -247,6 +247,34 @@ def test_per_frame():
         assert first_run[idx] == bpy.data.objects["Camera"].location[0]
 
 
+def test_plan_cached_across_frames():
+    """
+    Test that stepping frames with the per-frame randomisation on does
+    not rebuild the randomisation plan, since the randomised values do
+    not change the structure of the scene.
+    """
+    from randomiser.random_all import plan
+    from randomiser.utils import change_tracking
+
+    cs = bpy.data.scenes["Scene"]
+    cs.rand_all_properties.bool_replay = False
+    cs.rand_all_properties.bool_randomise_per_frame = True
+    cs.rand_all_properties.bool_rand_camera_transforms = True
+    cs.rand_all_properties.bool_rand_materials = True
+    cs.rand_all_properties.bool_rand_geometry = True
+
+    # the first frames may sync the collections of the randomiser
+    for frame in range(2):
+        cs.frame_set(frame)
+
+    version = change_tracking.get_version()
+    randomisation_plan = plan.get_plan(bpy.context)
+    for frame in range(2, 10):
+        cs.frame_set(frame)
+        assert change_tracking.get_version() == version
+        assert plan.get_plan(bpy.context) is randomisation_plan
+
+
 ###################
 ##   GEOMETRY   ###
 ###################
@@ -265,7 +293,7 @@ def test_randomiser_geometry():
     # set up some of the properties that will be needed for testing
     obj = bpy.data.objects[3]
     bpy.context.view_layer.objects.active = obj
-    bpy.context.scene.socket_props_per_gng.update_gngs_collection
+    bpy.context.scene.socket_props_per_gng.sync_collections()
     bpy.ops.node.randomise_all_geometry_sockets("INVOKE_DEFAULT")
 
     # set range for randomise in blender properties
@@ -370,7 +398,7 @@ def test_randomiser_metallic():
     # set up some of the properties that will be needed for testing
     obj = bpy.data.objects[1]
     bpy.context.view_layer.objects.active = obj
-    bpy.context.scene.socket_props_per_material.update_materials_collection
+    bpy.context.scene.socket_props_per_material.sync_collections()
     bpy.ops.node.randomise_all_material_sockets("INVOKE_DEFAULT")
 
     print(len(bpy.data.scenes["Scene"].socket_props_per_material.collection))
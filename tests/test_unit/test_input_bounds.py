@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from utils import input_bounds, rng
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+@pytest.mark.parametrize(
+    "kind, min_val, max_val",
+    [
+        (rng.UNIFORM, [-FLOAT32_MAX], [FLOAT32_MAX]),
+        (rng.UNIFORM, [0.0], [FLOAT32_MAX]),
+        (rng.UNIFORM, [0.0, -np.inf, 0.0], [1.0, 1.0, 1.0]),
+        (rng.INTEGER, [-(2**31)], [2**31 - 1]),
+        (rng.INTEGER, [0], [2**31 - 1]),
+    ],
+)
+def test_default_limits_are_unbounded(kind, min_val, max_val):
+    assert input_bounds.is_unbounded(kind, min_val, max_val)
+
+
+@pytest.mark.parametrize(
+    "kind, min_val, max_val",
+    [
+        (rng.UNIFORM, [-1.5], [2.5]),
+        (rng.UNIFORM, [0.0, 0.0, 0.0], [1.0, 2.0, 3.0]),
+        (rng.INTEGER, [-10], [10]),
+        (rng.CHOICE, [0], [1]),
+    ],
+)
+def test_set_limits_are_bounded(kind, min_val, max_val):
+    assert not input_bounds.is_unbounded(kind, min_val, max_val)
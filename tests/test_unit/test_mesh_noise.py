@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from utils import mesh_noise, rng
+
+
+def get_buffers(n_items, n_components):
+    buffers = mesh_noise.NoiseBuffers(n_items, n_components)
+    buffers.base[:] = np.arange(n_items * n_components).reshape(
+        n_items, n_components
+    )
+    return buffers
+
+
+def test_uniform_noise_within_amplitude():
+    buffers = get_buffers(1000, 3)
+    amplitude = [0.5, 0.0, 2.0]
+    out = mesh_noise.add_noise(rng.get_generator(42), buffers, amplitude)
+
+    noise = out - buffers.base
+    assert np.all(np.abs(noise) <= np.array(amplitude) + 1e-6)
+    assert np.all(noise[:, 1] == 0)
+    assert noise[:, 2].min() < -1.5 and noise[:, 2].max() > 1.5
+
+
+def test_normal_noise_std():
+    buffers = get_buffers(100_000, 1)
+    out = mesh_noise.add_noise(
+        rng.get_generator(42), buffers, 0.1, mesh_noise.NORMAL
+    )
+
+    np.testing.assert_allclose(np.std(out - buffers.base), 0.1, rtol=0.02)
+
+
+def test_buffers_reused_and_base_kept():
+    buffers = get_buffers(10, 2)
+    base = buffers.base.copy()
+    list_ids = [id(buffers.base), id(buffers.noise), id(buffers.out)]
+
+    generator = rng.get_generator(42)
+    out_1 = mesh_noise.add_noise(generator, buffers, 1.0).copy()
+    out_2 = mesh_noise.add_noise(generator, buffers, 1.0)
+
+    assert out_2 is buffers.out
+    assert [id(buffers.base), id(buffers.noise), id(buffers.out)] == list_ids
+    assert buffers.out.dtype == np.float32
+    np.testing.assert_array_equal(buffers.base, base)
+    assert not np.array_equal(out_1, out_2)
+
+
+def test_noise_reproducible():
+    list_out = [
+        mesh_noise.add_noise(rng.get_generator(7), get_buffers(10, 3), 1.0)
+        for _ in range(2)
+    ]
+    np.testing.assert_array_equal(*list_out)
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        mesh_noise.add_noise(rng.get_generator(), get_buffers(1, 1), 1.0, "")
+
+
+def test_buffers_matches():
+    buffers = mesh_noise.NoiseBuffers(10, 2)
+    assert buffers.matches(10, 2)
+    assert not buffers.matches(10, 3)
+
+
+def test_rebase_if_edited():
+    buffers = get_buffers(10, 3)
+    base = buffers.base.copy()
+
+    # nothing written yet
+    assert not buffers.rebase_if_edited(np.zeros((10, 3), np.float32))
+
+    out = mesh_noise.add_noise(rng.get_generator(42), buffers, 0.1).copy()
+
+    # the layer still has the values last written
+    assert not buffers.rebase_if_edited(out)
+    np.testing.assert_array_equal(buffers.base, base)
+
+    # the layer was edited
+    edited = out + 1
+    assert buffers.rebase_if_edited(edited)
+    np.testing.assert_array_equal(buffers.base, edited)
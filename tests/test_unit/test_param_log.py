@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pytest
+from utils import param_log
+
+PARAM_IDS = ["camera_transforms/location/x_pos_vals", "materials/Values Col"]
+N_DIMS = [1, 4]
+
+
+def get_values(frame):
+    return [frame * 0.1, [frame, frame + 1, frame + 2, 1.0]]
+
+
+def test_jsonl_writer(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with param_log.JSONLParamWriter(path, PARAM_IDS) as writer:
+        for frame in range(3):
+            writer.write_frame(frame, get_values(frame))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [rec["frame"] for rec in records] == [0, 1, 2]
+    assert records[1][PARAM_IDS[1]] == get_values(1)[1]
+
+
+def test_jsonl_writer_resume(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with param_log.JSONLParamWriter(path, PARAM_IDS) as writer:
+        for frame in range(3):
+            writer.write_frame(frame, get_values(frame))
+
+    # simulate a crash while writing frame 3
+    with open(path, "a") as out_file_obj:
+        out_file_obj.write('{"frame": 3, "camera_')
+
+    writer = param_log.JSONLParamWriter(path, PARAM_IDS, resume=True)
+    assert writer.last_frame == 2
+    with writer:
+        writer.write_frame(3, get_values(3))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [rec["frame"] for rec in records] == [0, 1, 2, 3]
+
+
+def test_npz_writer(tmp_path):
+    with param_log.NPZParamWriter(
+        tmp_path, PARAM_IDS, N_DIMS, chunk_size=2
+    ) as writer:
+        for frame in range(5):
+            writer.write_frame(frame, get_values(frame))
+
+    assert len(list(tmp_path.glob("chunk_*.npz"))) == 3
+    assert param_log.read_last_frame_npz(tmp_path) == 4
+
+    schema, frames, values = param_log.load_npz_log(tmp_path)
+    assert schema == {"param_ids": PARAM_IDS, "n_dims": N_DIMS}
+    np.testing.assert_array_equal(frames, np.arange(5))
+    np.testing.assert_allclose(values[3], [0.3, 3, 4, 5, 1.0])
+
+    # resume
+    writer = param_log.NPZParamWriter(
+        tmp_path, PARAM_IDS, N_DIMS, chunk_size=2, resume=True
+    )
+    assert writer.last_frame == 4
+    with writer:
+        writer.write_frame(5, get_values(5))
+    _, frames, _ = param_log.load_npz_log(tmp_path)
+    np.testing.assert_array_equal(frames, np.arange(6))
+
+
+def test_jsonl_writer_resume_mismatch(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with param_log.JSONLParamWriter(path, PARAM_IDS) as writer:
+        writer.write_frame(0, get_values(0))
+
+    with pytest.raises(ValueError, match="different parameters"):
+        param_log.JSONLParamWriter(path, PARAM_IDS[:1], resume=True)
+
+    # the log is left unchanged
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [rec["frame"] for rec in records] == [0]
+
+
+def test_read_last_record_jsonl_tail(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with param_log.JSONLParamWriter(path, PARAM_IDS) as writer:
+        for frame in range(20):
+            writer.write_frame(frame, get_values(frame))
+    with open(path, "a") as out_file_obj:
+        out_file_obj.write('{"frame": 20, "camera_')
+    size = path.stat().st_size
+
+    # blocks smaller than a record
+    record = param_log.read_last_record_jsonl(path, block_size=16)
+    assert record["frame"] == 19
+    assert record[PARAM_IDS[1]] == get_values(19)[1]
+    assert path.stat().st_size == size - len('{"frame": 20, "camera_')
+
+
+def test_npz_writer_resume_mismatch(tmp_path):
+    with param_log.NPZParamWriter(
+        tmp_path, PARAM_IDS, N_DIMS, chunk_size=1
+    ) as writer:
+        writer.write_frame(0, get_values(0))
+
+    with pytest.raises(ValueError, match="different parameters"):
+        param_log.NPZParamWriter(
+            tmp_path, PARAM_IDS[::-1], N_DIMS[::-1], resume=True
+        )
+    with pytest.raises(ValueError, match="components"):
+        param_log.NPZParamWriter(tmp_path, PARAM_IDS, [1, 3], resume=True)
+
+    # the schema is left unchanged
+    schema, _, _ = param_log.load_npz_log(tmp_path)
+    assert schema == {"param_ids": PARAM_IDS, "n_dims": N_DIMS}
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pytest
+from utils import param_log, param_store, rng
+
+PARAM_IDS = [
+    "camera_transforms/location/x_pos_vals",
+    "materials/Values Col",
+    "geometry/Values GNGRandomInt",
+]
+N_DIMS = [1, 4, 1]
+KINDS = [rng.UNIFORM, rng.UNIFORM, rng.INTEGER]
+FRAMES = range(3, 8)
+
+
+def get_values(frame):
+    return [frame * 0.5, [frame, frame + 1.0, frame + 2.0, 1.0], frame]
+
+
+def write_log(path, output_format):
+    if output_format == param_log.JSON:
+        data = {
+            "frames": list(FRAMES),
+            "camera_transforms": {"location": {"x_pos_vals": []}},
+            "materials": {"Values Col": []},
+            "geometry": {"Values GNGRandomInt": []},
+        }
+        for frame in FRAMES:
+            x, col, n = get_values(frame)
+            data["camera_transforms"]["location"]["x_pos_vals"].append(x)
+            data["materials"]["Values Col"].append(col)
+            data["geometry"]["Values GNGRandomInt"].append(n)
+        with open(path, "w") as out_file_obj:
+            out_file_obj.write(json.dumps(data))
+        return
+
+    if output_format == param_log.JSONL:
+        writer = param_log.JSONLParamWriter(path, PARAM_IDS)
+    elif output_format == param_log.NPZ:
+        writer = param_log.NPZParamWriter(path, PARAM_IDS, N_DIMS, 2)
+    else:
+        writer = param_store.ParamStore.create(
+            path, PARAM_IDS, N_DIMS, KINDS, len(FRAMES), FRAMES[0]
+        )
+    with writer:
+        for frame in FRAMES:
+            writer.write_frame(frame, get_values(frame))
+
+
+@pytest.mark.parametrize(
+    "output_format, file_name",
+    [
+        (param_log.JSON, "log.json"),
+        (param_log.JSONL, "log.jsonl"),
+        (param_log.NPZ, "log"),
+        (param_log.STORE, "log.npy"),
+    ],
+)
+def test_open_param_log(tmp_path, output_format, file_name):
+    path = tmp_path / file_name
+    write_log(path, output_format)
+
+    reader = param_log.open_param_log(path)
+    for frame in [5, 3, 7]:
+        frame_values = reader.get_frame(frame)
+        assert list(frame_values) == PARAM_IDS
+        for param_id, expected in zip(PARAM_IDS, get_values(frame)):
+            np.testing.assert_array_equal(frame_values[param_id], expected)
+
+    for frame in [0, 100]:
+        with pytest.raises(KeyError):
+            reader.get_frame(frame)
+
+
+def test_json_log_without_frames(tmp_path):
+    path = tmp_path / "log.json"
+    with open(path, "w") as out_file_obj:
+        out_file_obj.write(json.dumps({"geometry": {"Values A": [1, 2, 3]}}))
+
+    reader = param_log.open_param_log(path)
+    assert reader.get_frame(0) == {"geometry/Values A": 1}
+    assert reader.get_frame(2) == {"geometry/Values A": 3}
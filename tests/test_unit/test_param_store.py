@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from utils import param_store, rng
+
+PARAM_IDS = [
+    "camera_transforms/location/x_pos_vals",
+    "materials/Values Col",
+    "geometry/Values GNGRandomInt",
+    "geometry/Values GNGRandomBool",
+]
+N_DIMS = [1, 4, 1, 1]
+KINDS = [rng.UNIFORM, rng.UNIFORM, rng.INTEGER, rng.CHOICE]
+
+
+def get_values(frame):
+    return [frame * 0.1, [frame, frame + 1, frame + 2, 1.0], frame, True]
+
+
+def test_store_write_and_read(tmp_path):
+    path = tmp_path / "store.npy"
+    with param_store.ParamStore.create(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=10, frame_start=5
+    ) as store:
+        for frame in range(5, 15):
+            store.write_frame(frame, get_values(frame))
+
+    store = param_store.ParamStore.open(path)
+    assert store.param_ids == PARAM_IDS
+    assert store.frame_start == 5
+    assert store.last_frame == 14
+
+    row = store.get_frame(8)
+    assert row[PARAM_IDS[0]] == 0.8
+    np.testing.assert_array_equal(row[PARAM_IDS[1]], [8, 9, 10, 1.0])
+    assert row[PARAM_IDS[2]] == 8
+    assert row[PARAM_IDS[2]].dtype == np.int64
+    assert row[PARAM_IDS[3]]
+
+
+def test_store_writer_resume(tmp_path):
+    path = tmp_path / "store.npy"
+    with param_store.ParamStoreWriter(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=6
+    ) as writer:
+        assert writer.last_frame is None
+        for frame in range(3):
+            writer.write_frame(frame, get_values(frame))
+
+    with param_store.ParamStoreWriter(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=6, resume=True
+    ) as writer:
+        assert writer.last_frame == 2
+        for frame in range(3, 6):
+            writer.write_frame(frame, get_values(frame))
+
+    store = param_store.ParamStore.open(path)
+    np.testing.assert_array_equal(store.data["frame"], np.arange(6))
+
+
+def test_store_writer_resume_grows(tmp_path):
+    path = tmp_path / "store.npy"
+    with param_store.ParamStoreWriter(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=3
+    ) as writer:
+        for frame in range(3):
+            writer.write_frame(frame, get_values(frame))
+
+    # more frames than in the store
+    with param_store.ParamStoreWriter(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=5, resume=True
+    ) as writer:
+        assert writer.last_frame == 2
+        for frame in range(3, 5):
+            writer.write_frame(frame, get_values(frame))
+
+    store = param_store.ParamStore.open(path)
+    np.testing.assert_array_equal(store.data["frame"], np.arange(5))
+    assert store.get_frame(1)[PARAM_IDS[0]] == 0.1
+
+
+@pytest.mark.parametrize(
+    "param_ids, n_dims, kinds",
+    [
+        (PARAM_IDS[:3], N_DIMS[:3], KINDS[:3]),
+        (PARAM_IDS, [1, 3, 1, 1], KINDS),
+        (PARAM_IDS, N_DIMS, [rng.UNIFORM] * 4),
+    ],
+)
+def test_store_writer_resume_mismatch(tmp_path, param_ids, n_dims, kinds):
+    path = tmp_path / "store.npy"
+    with param_store.ParamStoreWriter(
+        path, PARAM_IDS, N_DIMS, KINDS, n_frames=3
+    ) as writer:
+        writer.write_frame(0, get_values(0))
+
+    with pytest.raises(ValueError, match="Cannot resume"):
+        param_store.ParamStoreWriter(
+            path, param_ids, n_dims, kinds, n_frames=3, resume=True
+        )
+
+    # the store is left unchanged
+    store = param_store.ParamStore.open(path)
+    assert store.param_ids == PARAM_IDS
+    assert store.last_frame == 0
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from utils import rng
+
+
+@pytest.mark.parametrize("kind", [rng.UNIFORM, rng.INTEGER, rng.CHOICE])
+def test_draw_block_within_bounds(kind):
+    min_vals = [0.0, -5.0, 2.0]
+    max_vals = [1.0, 5.0, 2.0]
+    block = rng.draw_block(
+        rng.get_generator(42), kind, min_vals, max_vals, 100
+    )
+
+    assert block.shape == (100, 3)
+    assert np.all(block >= min_vals)
+    assert np.all(block <= max_vals)
+
+
+def test_draw_block_kinds():
+    generator = rng.get_generator(42)
+
+    ints = rng.draw_block(generator, rng.INTEGER, [3], [0], 100)
+    assert np.all(ints == np.rint(ints))
+    assert set(np.unique(ints)) == {0.0, 1.0, 2.0, 3.0}
+
+    choices = rng.draw_block(generator, rng.CHOICE, [0], [1], 100)
+    assert set(np.unique(choices)) == {0.0, 1.0}
+
+
+def test_draw_block_reproducible():
+    blocks = [
+        rng.draw_block(rng.get_generator(7), rng.UNIFORM, [0], [1], 10)
+        for _ in range(2)
+    ]
+    np.testing.assert_array_equal(*blocks)
+
+
+def test_draw_block_infinite_bounds():
+    block = rng.draw_block(
+        rng.get_generator(42), rng.UNIFORM, [-np.inf], [np.inf], 5
+    )
+    assert np.all(np.isnan(block))
+
+
+def test_draw_block_unknown_kind():
+    with pytest.raises(ValueError):
+        rng.draw_block(rng.get_generator(42), "gaussian", [0], [1], 5)
+
+
+def test_reseed_if_changed():
+    seed_props = SimpleNamespace(seed_toggle=True, seed=3, seed_previous=0)
+
+    rng.reseed_if_changed(seed_props)
+    assert seed_props.seed_previous == 3
+    first_run = rng.get_sequential_generator().random(5)
+
+    # the seed has not changed: the sequence continues
+    rng.reseed_if_changed(seed_props)
+    assert np.all(rng.get_sequential_generator().random(5) != first_run)
+
+    # a new seed is used: the sequence restarts
+    seed_props.seed_previous = 0
+    rng.reseed_if_changed(seed_props)
+    np.testing.assert_array_equal(
+        rng.get_sequential_generator().random(5), first_run
+    )
+
+
+def test_draw_at_frames_addressable():
+    key = rng.get_param_key(42, "materials/Values MaterialRandomMetallic")
+    all_frames = rng.draw_at_frames(
+        key, rng.UNIFORM, [0, 0], [1, 1], range(10)
+    )
+
+    # regenerating a range of frames gives the same values
+    np.testing.assert_array_equal(
+        rng.draw_at_frames(key, rng.UNIFORM, [0, 0], [1, 1], range(4, 7)),
+        all_frames[4:7],
+    )
+    # consecutive frames get different values
+    assert len(np.unique(all_frames[:, 0])) == 10
+
+
+def test_param_keys_differ():
+    keys = [
+        rng.get_param_key(42, "geometry/Values A"),
+        rng.get_param_key(42, "geometry/Values B"),
+        rng.get_param_key(43, "geometry/Values A"),
+    ]
+    list_values = [
+        rng.draw_at_frames(key, rng.UNIFORM, [0], [1], [0]) for key in keys
+    ]
+    assert len(np.unique(list_values)) == 3
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from batch import shards
+
+
+@pytest.mark.parametrize(
+    "frame_start, frame_end, n_shards, expected_shards",
+    [
+        (1, 10, 3, [(1, 4), (5, 7), (8, 10)]),
+        (0, 3, 4, [(0, 0), (1, 1), (2, 2), (3, 3)]),
+        (1, 2, 8, [(1, 1), (2, 2)]),
+        (5, 5, 1, [(5, 5)]),
+    ],
+)
+def test_split_frame_range(frame_start, frame_end, n_shards, expected_shards):
+    assert (
+        shards.split_frame_range(frame_start, frame_end, n_shards)
+        == expected_shards
+    )
+
+
+def test_merge_param_logs(tmp_path):
+    list_logs = [
+        {
+            "frames": [3, 4],
+            "camera_transforms": {"location": {"x_pos_vals": [0.3, 0.4]}},
+            "materials": {"Values MaterialRandomMetallic": [0.03, 0.04]},
+        },
+        {
+            "frames": [1, 2],
+            "camera_transforms": {"location": {"x_pos_vals": [0.1, 0.2]}},
+            "materials": {"Values MaterialRandomMetallic": [0.01, 0.02]},
+        },
+    ]
+    list_log_paths = []
+    for i, log in enumerate(list_logs):
+        list_log_paths.append(tmp_path / f"log_{i}.json")
+        list_log_paths[-1].write_text(json.dumps(log))
+
+    merged_log = shards.merge_param_logs(
+        list_log_paths, tmp_path / "merged.json"
+    )
+
+    assert merged_log == {
+        "frames": [1, 2, 3, 4],
+        "camera_transforms": {
+            "location": {"x_pos_vals": [0.1, 0.2, 0.3, 0.4]}
+        },
+        "materials": {
+            "Values MaterialRandomMetallic": [0.01, 0.02, 0.03, 0.04]
+        },
+    }
+    assert json.loads((tmp_path / "merged.json").read_text()) == merged_log
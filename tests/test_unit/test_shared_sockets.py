@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from utils import shared_sockets
+
+
+def get_socket(node_tree, node_name, identifier="Value"):
+    node = SimpleNamespace(name=node_name, id_data=node_tree)
+    return SimpleNamespace(node=node, identifier=identifier)
+
+
+def get_scene(map_material_to_sockets):
+    collection = [
+        SimpleNamespace(name=mat_str, candidate_sockets=list_sockets)
+        for mat_str, list_sockets in map_material_to_sockets.items()
+    ]
+    return SimpleNamespace(
+        socket_props_per_material=SimpleNamespace(collection=collection)
+    )
+
+
+def get_material_node_tree():
+    # the node trees of materials are embedded data, all with
+    # the same name
+    return SimpleNamespace(name="Shader Nodetree", is_embedded_data=True)
+
+
+def test_same_node_names_in_different_materials():
+    sckt_a = get_socket(get_material_node_tree(), "RandomValue")
+    sckt_b = get_socket(get_material_node_tree(), "RandomValue")
+
+    key_a = shared_sockets.get_socket_target_key(sckt_a, "MaterialA")
+    key_b = shared_sockets.get_socket_target_key(sckt_b, "MaterialB")
+    assert key_a != key_b
+
+    cs = get_scene({"MaterialA": [sckt_a], "MaterialB": [sckt_b]})
+    map_socket_to_materials = shared_sockets.get_materials_per_socket(cs)
+    assert map_socket_to_materials == {
+        key_a: ["MaterialA"],
+        key_b: ["MaterialB"],
+    }
+
+
+def test_socket_in_shared_node_group():
+    node_group = SimpleNamespace(name="NodeGroup", is_embedded_data=False)
+    sckt = get_socket(node_group, "RandomValue")
+
+    assert shared_sockets.get_socket_target_key(
+        sckt, "MaterialA"
+    ) == shared_sockets.get_socket_target_key(sckt, "MaterialB")
+
+    cs = get_scene({"MaterialA": [sckt], "MaterialB": [sckt]})
+    map_socket_to_materials = shared_sockets.get_materials_per_socket(cs)
+    assert list(map_socket_to_materials.values()) == [
+        ["MaterialA", "MaterialB"]
+    ]
+
+
+def test_report_shared_sockets(capsys):
+    key_shared = ("NODE_GROUP", "NodeGroup", "RandomValue", "Value")
+    key_own = ("MATERIAL", "MaterialA", "RandomValue", "Value")
+    map_socket_to_materials = {
+        key_shared: ["MaterialA", "MaterialB"],
+        key_own: ["MaterialA"],
+    }
+    map_socket_to_owner = {key_shared: "MaterialB", key_own: "MaterialA"}
+
+    shared_sockets.report_shared_sockets(
+        map_socket_to_owner, map_socket_to_materials
+    )
+    out = capsys.readouterr().out
+    assert out.count("\n") == 1
+    assert "NodeGroup" in out and "MaterialA, MaterialB" in out
+
+    # not printed again if unchanged
+    shared_sockets.report_shared_sockets(
+        map_socket_to_owner, map_socket_to_materials
+    )
+    assert capsys.readouterr().out == ""
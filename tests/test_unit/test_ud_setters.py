@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from utils import ud_setters
+
+
+def get_targets(n_targets):
+    return [
+        SimpleNamespace(owner=SimpleNamespace(value=None), attr="value")
+        for _ in range(n_targets)
+    ]
+
+
+@pytest.mark.parametrize(
+    "attr_str, values, expected",
+    [
+        ("float_1d", np.array([0.5, -1.5]), [0.5, -1.5]),
+        ("int_1d", np.array([1.6, -2.2]), [2, -2]),
+        ("bool_1d", np.array([0.0, 1.0]), [False, True]),
+        ("float_3d", np.arange(6.0), [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]),
+        ("euler", np.array([180.0, 0, 90]), [[np.pi, 0, np.pi / 2]]),
+    ],
+)
+def test_setters(attr_str, values, expected):
+    list_targets = get_targets(len(expected))
+    ud_setters.MAP_ATTR_TO_SETTER[attr_str](list_targets, values)
+
+    for target, value in zip(list_targets, expected):
+        np.testing.assert_allclose(target.owner.value, value)
+        assert type(target.owner.value) is type(value)
+
+
+def test_setters_cover_all_kinds():
+    assert set(ud_setters.MAP_ATTR_TO_SETTER) == set(
+        ud_setters.MAP_ATTR_TO_KIND
+    )